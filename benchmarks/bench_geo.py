@@ -0,0 +1,71 @@
+"""Viewport query latency of the geo index against scanning every point.
+
+Run from the repository root: python benchmarks/bench_geo.py [--sizes 100000,500000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geo_index import GeoIndex
+from synthetic import disaster_rows
+
+
+def viewports(count, seed=5):
+    # A 1024x768 map centred somewhere over the synthetic data, at zoom 3 to 15.
+    rng = random.Random(seed)
+    for _ in range(count):
+        zoom = rng.randint(3, 15)
+        width, height = 360.0 / 2 ** zoom * 4, 360.0 / 2 ** zoom * 3
+        lat, lon = rng.uniform(8, 37), rng.uniform(68, 97)
+        yield lon - width / 2, lat - height / 2, lon + width / 2, lat + height / 2, zoom
+
+
+def full_scan(index, lats, lons, box):
+    # Filter every row, then group what is left into the same grid cells.
+    west, south, east, north, zoom = box
+    inside = (lats >= south) & (lats <= north) & (lons >= west) & (lons <= east)
+    keys = index._keys(lats[inside], lons[inside], min(zoom, index.max_cluster_zoom))
+    return np.unique(keys, return_counts=True)
+
+
+def percentiles(fn, items):
+    latencies = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - started)
+    return np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='100000,500000')
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    boxes = list(viewports(args.queries))
+    for size in (int(s) for s in args.sizes.split(',')):
+        rows = [(row['id'], row['latitude'], row['longitude'], row['type']) for row in disaster_rows(size)]
+        index = GeoIndex()
+        started = time.perf_counter()
+        index.add_many(rows)
+        index.query(-180, -90, 180, 90, 0)
+        build = time.perf_counter() - started
+        lats = np.array([row[1] for row in rows])
+        lons = np.array([row[2] for row in rows])
+
+        p50, p99 = percentiles(lambda box: index.query(*box), boxes)
+        scan = percentiles(lambda box: full_scan(index, lats, lons, box), boxes)
+        print(f'{size:>8} points  build {build:>5.1f}s  '
+              f'index p50 {p50:>6.2f} ms p99 {p99:>6.2f} ms  '
+              f'full scan p50 {scan[0]:>6.2f} ms p99 {scan[1]:>6.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Throughput of the keyword matcher against the per-keyword substring scans it replaced.
+
+Run from the repository root: python benchmarks/bench_keywords.py [--items N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_matcher import KeywordMatcher
+from news_scraper import (NDMA_DISASTER_TYPES, SEVERITY_INDICATORS, INDIAN_STATES,
+                          NDMA_MATCHER, US_STATES, DISASTER_TYPES)
+
+NEWS_MATCHER = (KeywordMatcher()
+                .add_table('disaster_type', DISASTER_TYPES, allow_suffix=True)
+                .add_table('us_state', {state: [state] for state in US_STATES}, case_sensitive=True)
+                .compile())
+
+FILLER = ('officials said the district administration has deployed relief teams '
+          'while residents were moved to shelters and roads remain closed').split()
+
+
+def legacy_disaster_type(content):
+    content = content.lower()
+    for dtype, keywords in NDMA_DISASTER_TYPES.items():
+        if any(keyword in content for keyword in keywords):
+            return dtype
+    return 'Other'
+
+
+def legacy_severity(content):
+    content = content.lower()
+    for severity, indicators in SEVERITY_INDICATORS.items():
+        if any(indicator in content for indicator in indicators):
+            return severity
+    return 'Medium'
+
+
+def legacy_location(content):
+    content = content.lower()
+    for state in INDIAN_STATES:
+        if state.lower() in content:
+            return state
+    return 'India'
+
+
+def legacy_ndma(text):
+    return legacy_disaster_type(text), legacy_location(text), legacy_severity(text)
+
+
+def matcher_ndma(text):
+    matches = NDMA_MATCHER.scan(text)
+    return (matches.best('disaster_type') or 'Other',
+            matches.best('state') or 'India',
+            matches.best('severity') or 'Medium')
+
+
+def legacy_news(text):
+    lowered = text.lower()
+    disaster_type = next((d for d in DISASTER_TYPES if d in lowered), None)
+    for word in text.upper().split():
+        if word in US_STATES:
+            return word, disaster_type
+    return 'Unknown', disaster_type
+
+
+def matcher_news(text):
+    matches = NEWS_MATCHER.scan(text)
+    states = matches.labels('us_state')
+    return (states[0] if states else 'Unknown'), matches.best('disaster_type')
+
+
+def place_names(count, seed=7):
+    rng = random.Random(seed)
+    syllables = ['pur', 'nag', 'gar', 'bad', 'ka', 'ra', 'mu', 'li', 'sha', 'ven', 'dor', 'tal']
+    names = set()
+    while len(names) < count:
+        names.add(''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(names)
+
+
+def make_corpus(items, words, seed=42):
+    rng = random.Random(seed)
+    terms = ([t for ts in NDMA_DISASTER_TYPES.values() for t in ts]
+             + [t for ts in SEVERITY_INDICATORS.values() for t in ts]
+             + [t for ts in DISASTER_TYPES.values() for t in ts]
+             + INDIAN_STATES)
+    corpus = []
+    for _ in range(items):
+        text = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(3):
+            text.insert(rng.randrange(len(text)), rng.choice(terms))
+        corpus.append(' '.join(text))
+    return corpus
+
+
+def measure(fn, corpus):
+    started = time.perf_counter()
+    for text in corpus:
+        fn(text)
+    elapsed = time.perf_counter() - started
+    return len(corpus) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=5000)
+    args = parser.parse_args()
+
+    for name, before_fn, after_fn in (('NDMASpider', legacy_ndma, matcher_ndma),
+                                      ('NewsCollector', legacy_news, matcher_news)):
+        for words in (50, 200, 1000):
+            corpus = make_corpus(args.items, words)
+            before = measure(before_fn, corpus)
+            after = measure(after_fn, corpus)
+            print(f'{name:<14} {words:>5} words/item: legacy {before:>10.0f} items/s, '
+                  f'matcher {after:>10.0f} items/s ({after / before:.1f}x)')
+
+    # Substring scans grow with the table; the matcher does one pass regardless.
+    corpus = make_corpus(args.items, 200)
+    for size in (50, 200, 800):
+        places = place_names(size)
+        matcher = KeywordMatcher().add_table('place', {p: [p] for p in places}).compile()
+        before = measure(lambda text: next((p for p in places if p in text.lower()), None), corpus)
+        after = measure(lambda text: matcher.scan(text).best('place'), corpus)
+        print(f'{size:>5} place names, 200 words/item: legacy {before:>10.0f} items/s, '
+              f'matcher {after:>10.0f} items/s ({after / before:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Severity prediction under concurrent load: one forest pass per request versus micro-batching.
+
+Run from the repository root: python benchmarks/bench_predict.py [--clients 32 --requests 50]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from disaster_manager import build_full_model
+from micro_batcher import MicroBatcher
+from synthetic import disaster_rows
+
+
+def train(rows):
+    vectorizer, classifier = build_full_model()
+    encoder = LabelEncoder().fit([row['severity'] for row in rows])
+    classifier.fit(vectorizer.fit_transform([row['description'] for row in rows]),
+                   encoder.transform([row['severity'] for row in rows]))
+    return vectorizer, classifier
+
+
+def predict_batch(model, descriptions):
+    vectorizer, classifier = model
+    return classifier.predict_proba(vectorizer.transform(descriptions)).argmax(axis=1)
+
+
+def run_clients(call, texts, clients, requests):
+    latencies = []
+    lock = threading.Lock()
+
+    def client(offset):
+        mine = []
+        for i in range(requests):
+            started = time.perf_counter()
+            call(texts[(offset * requests + i) % len(texts)])
+            mine.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--max-wait-ms', type=float, default=5)
+    args = parser.parse_args()
+
+    model = train(list(disaster_rows(5000)))
+    texts = [row['description'] for row in disaster_rows(2000, seed=1)]
+
+    lock = threading.Lock()
+
+    def per_request(text):
+        # Serialised like the batcher's single worker, so both variants score on one thread.
+        with lock:
+            return predict_batch(model, [text])[0]
+
+    rate, p50, p99 = run_clients(per_request, texts, args.clients, args.requests)
+    print(f'per-request          {rate:>8.0f} req/s  p50 {p50:>7.1f} ms  p99 {p99:>7.1f} ms')
+
+    for max_batch in (8, 32, 128):
+        batcher = MicroBatcher(lambda items: predict_batch(model, items),
+                               max_batch_size=max_batch, max_wait=args.max_wait_ms / 1000)
+        rate, p50, p99 = run_clients(lambda text: batcher.submit(text).result(),
+                                     texts, args.clients, args.requests)
+        stats = batcher.stats()
+        print(f'batched (max {max_batch:>3})    {rate:>8.0f} req/s  p50 {p50:>7.1f} ms  '
+              f'p99 {p99:>7.1f} ms  mean batch {stats["mean_batch_size"]:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Query latency of the in-process search index against a LIKE-style substring scan.
+
+Run from the repository root: python benchmarks/bench_search.py [--sizes 100000,1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import SearchIndex
+from synthetic import disaster_rows, LOCATIONS, SEVERITY_WORDS, TYPES
+
+
+def queries(count, seed=3):
+    rng = random.Random(seed)
+    words = TYPES + LOCATIONS + [w for ws in SEVERITY_WORDS.values() for w in ws]
+    return [' '.join(rng.sample(words, rng.randint(1, 3))) for _ in range(count)]
+
+
+def like_scan(texts, query):
+    # What `description LIKE '%term%'` for each term amounts to, without ranking.
+    terms = query.lower().split()
+    return [i for i, text in enumerate(texts) if all(term in text for term in terms)]
+
+
+def percentiles(fn, items):
+    latencies = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - started)
+    return np.percentile(latencies, 50) * 1000, np.percentile(latencies, 99) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='100000,1000000')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--scan-queries', type=int, default=20)
+    args = parser.parse_args()
+
+    sample = queries(args.queries)
+    for size in (int(s) for s in args.sizes.split(',')):
+        index = SearchIndex()
+        texts = []
+        started = time.perf_counter()
+        for row in disaster_rows(size):
+            text = ' '.join((row['type'], row['location'], row['description']))
+            index.add('disaster', row['id'], text, row['type'], row['date'])
+            texts.append(text.lower())
+        build = time.perf_counter() - started
+
+        p50, p99 = percentiles(lambda q: index.search(q, limit=20), sample)
+        filtered = percentiles(lambda q: index.search(q, limit=20, types=['flood'],
+                                                      date_from='2024-03-01', date_to='2024-06-30'), sample)
+        scan = percentiles(lambda q: like_scan(texts, q), sample[:args.scan_queries])
+        print(f'{size:>8} docs  build {build:>6.1f}s  '
+              f'search p50 {p50:>7.2f} ms p99 {p99:>7.2f} ms  '
+              f'filtered p50 {filtered[0]:>7.2f} ms  '
+              f'LIKE scan p50 {scan[0]:>8.1f} ms p99 {scan[1]:>8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
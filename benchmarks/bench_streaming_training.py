@@ -0,0 +1,88 @@
+"""Wall time and peak RSS of the in-memory full retrain versus the streaming, parallel one.
+
+Each run happens in a fresh interpreter so peak RSS is not shared between them.
+
+Run from the repository root: python benchmarks/bench_streaming_training.py [--sizes 10000,100000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from disaster_manager import build_full_model, fit_streaming, peak_rss_mb
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder
+from synthetic import disaster_rows, SEVERITY_WORDS
+
+
+def legacy(size, chunk_size):
+    # Mirrors DisasterManager.train(): every description in a list, one core.
+    rows = [(row['description'], row['severity']) for row in disaster_rows(size)]
+    descriptions = [row[0] for row in rows]
+    severities = [row[1] for row in rows]
+    vectorizer, classifier = build_full_model()
+    X = vectorizer.fit_transform(descriptions)
+    y = LabelEncoder().fit_transform(severities)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    classifier.fit(X_train, y_train)
+    return classifier.score(X_test, y_test)
+
+
+def chunks(size, chunk_size):
+    batch = []
+    for row in disaster_rows(size):
+        batch.append(row)
+        if len(batch) == chunk_size:
+            yield [r['id'] for r in batch], [r['description'] for r in batch], [r['severity'] for r in batch]
+            batch = []
+    if batch:
+        yield [r['id'] for r in batch], [r['description'] for r in batch], [r['severity'] for r in batch]
+
+
+def streaming(size, chunk_size, max_samples=None):
+    return fit_streaming(chunks(size, chunk_size), sorted(SEVERITY_WORDS),
+                         max_samples=max_samples)[3]['test_score']
+
+
+def worker(mode, size, chunk_size, max_samples):
+    started = time.perf_counter()
+    if mode == 'legacy':
+        score = legacy(size, chunk_size)
+    else:
+        score = streaming(size, chunk_size, max_samples if mode == 'capped' else None)
+    print(json.dumps({'seconds': time.perf_counter() - started, 'test_score': score,
+                      'peak_rss_mb': peak_rss_mb()}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--max-samples', type=int, default=50000,
+                        help='per-tree sample for the capped streaming run')
+    parser.add_argument('--worker', choices=('legacy', 'streaming', 'capped'), help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.size, args.chunk_size, args.max_samples)
+        return
+
+    for size in (int(s) for s in args.sizes.split(',')):
+        for mode in ('legacy', 'streaming', 'capped'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--worker', mode, '--size', str(size),
+                 '--chunk-size', str(args.chunk_size), '--max-samples', str(args.max_samples)],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{size:>8} rows  {mode:<10} {result['seconds']:>8.1f}s  "
+                  f"peak RSS {result['peak_rss_mb']:>7.0f} MB  test accuracy {result['test_score']:.3f}")
+
+
+if __name__ == '__main__':
+    main()
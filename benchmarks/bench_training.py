@@ -0,0 +1,88 @@
+"""Full retrain versus incremental partial_fit training of the severity model.
+
+For each size the full model is refit on every row, while the incremental
+model resumes from a checkpoint covering all but the newest ``--new``
+fraction and only learns those rows. Both are scored on the same holdout.
+
+Run from the repository root: python benchmarks/bench_training.py [--sizes 10000,100000]
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.metrics import accuracy_score
+from sklearn.preprocessing import LabelEncoder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from disaster_manager import build_full_model, build_incremental_model
+from synthetic import disaster_rows
+
+
+def load(count, seed):
+    rows = list(disaster_rows(count, seed=seed))
+    return [row['description'] for row in rows], [row['severity'] for row in rows]
+
+
+def full_retrain(texts, labels, encoder):
+    vectorizer, classifier = build_full_model()
+    classifier.fit(vectorizer.fit_transform(texts), encoder.transform(labels))
+    return vectorizer, classifier
+
+
+def incremental(texts, labels, encoder, vectorizer, classifier, batch_size):
+    classes = np.arange(len(encoder.classes_))
+    for start in range(0, len(texts), batch_size):
+        X = vectorizer.transform(texts[start:start + batch_size])
+        classifier.partial_fit(X, encoder.transform(labels[start:start + batch_size]), classes=classes)
+    return vectorizer, classifier
+
+
+def score(model, texts, labels, encoder):
+    vectorizer, classifier = model
+    return accuracy_score(encoder.transform(labels), classifier.predict(vectorizer.transform(texts)))
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--new', type=float, default=0.01, help='fraction of rows new since the checkpoint')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--skip-full-above', type=int, default=None,
+                        help='skip the full retrain for larger sizes (it dominates the runtime)')
+    args = parser.parse_args()
+
+    test_texts, test_labels = load(5000, seed=1)
+    for size in (int(s) for s in args.sizes.split(',')):
+        texts, labels = load(size, seed=42)
+        encoder = LabelEncoder().fit(labels)
+        split = int(size * (1 - args.new))
+
+        if args.skip_full_above is None or size <= args.skip_full_above:
+            model, seconds = timed(full_retrain, texts, labels, encoder)
+            print(f'{size:>8} rows  full retrain        {seconds:>8.2f}s  '
+                  f'accuracy {score(model, test_texts, test_labels, encoder):.3f}')
+
+        model, seconds = timed(incremental, texts, labels, encoder, *build_incremental_model(), args.batch_size)
+        print(f'{size:>8} rows  incremental, cold   {seconds:>8.2f}s  '
+              f'accuracy {score(model, test_texts, test_labels, encoder):.3f}')
+
+        vectorizer, classifier = incremental(texts[:split], labels[:split], encoder,
+                                             *build_incremental_model(), args.batch_size)
+        model, seconds = timed(incremental, texts[split:], labels[split:], encoder,
+                               vectorizer, copy.deepcopy(classifier), args.batch_size)
+        print(f'{size:>8} rows  incremental, +{size - split:<6} {seconds:>7.2f}s  '
+              f'accuracy {score(model, test_texts, test_labels, encoder):.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""SQLite stand-in for MySQL, for running the benchmark suite without a server.
+
+``install(path)`` creates the schema in a SQLite file and points
+``mysql.connector.connect`` at it. Queries are rewritten for the few MySQL
+constructs the application uses; anything else is passed through as is.
+Timings are only comparable with other runs on the same backend.
+"""
+from datetime import datetime
+import re
+import sqlite3
+
+import mysql.connector
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS disasters (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT, location TEXT, severity TEXT, date TEXT, description TEXT, source TEXT,
+        confidence REAL, latitude REAL, longitude REAL,
+        updated_at TEXT DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now'))
+    );
+    CREATE TRIGGER IF NOT EXISTS disasters_updated_at AFTER UPDATE ON disasters
+    WHEN NEW.updated_at IS OLD.updated_at BEGIN
+        UPDATE disasters SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now') WHERE id = NEW.id;
+    END;
+    CREATE INDEX IF NOT EXISTS idx_disasters_date_id ON disasters (date, id);
+    CREATE INDEX IF NOT EXISTS idx_disasters_type_date ON disasters (type, date);
+    CREATE INDEX IF NOT EXISTS idx_disasters_severity_date ON disasters (severity, date);
+    CREATE INDEX IF NOT EXISTS idx_disasters_location_date ON disasters (location, date);
+    CREATE INDEX IF NOT EXISTS idx_disasters_updated_at ON disasters (updated_at);
+    CREATE TABLE IF NOT EXISTS news_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL, content TEXT, url TEXT UNIQUE NOT NULL, source TEXT NOT NULL,
+        published_date TEXT, location TEXT, location_confidence REAL, disaster_type TEXT,
+        cleaned_content TEXT, duplicate_of TEXT, collected_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT, email TEXT, password TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+"""
+
+REWRITES = [
+    (re.compile(r'NOW\(\)\s*-\s*INTERVAL\s+(\d+)\s+(DAY|HOUR)', re.I), r"datetime('now', 'localtime', '-\1 \2')"),
+    (re.compile(r'\bLEFT\(', re.I), 'substr_left('),
+    (re.compile(r'ON DUPLICATE KEY UPDATE id = id', re.I), 'ON CONFLICT DO NOTHING'),
+    (re.compile(r'ON DUPLICATE KEY UPDATE', re.I), 'ON CONFLICT DO UPDATE SET'),
+    (re.compile(r'\bVALUES\((\w+)\)', re.I), r'excluded.\1'),
+    (re.compile(r'\bFOR UPDATE\b', re.I), ''),
+    (re.compile(r'TRUNCATE TABLE', re.I), 'DELETE FROM'),
+    (re.compile(r'INSERT IGNORE', re.I), 'INSERT OR IGNORE'),
+    (re.compile(r'%s'), '?'),
+]
+CREATE_TABLE_RE = re.compile(r'^\s*CREATE TABLE IF NOT EXISTS (\w+)', re.I)
+# sqlite3 messages -> the MySQL error numbers the application checks for
+ERRNOS = [('no such table', 1146), ('index .* already exists', 1061),
+          ('already exists', 1050), ('UNIQUE constraint failed', 1062), ('duplicate column name', 1060),
+          ('no such column', 1054)]
+
+
+def translate(query):
+    for pattern, replacement in REWRITES:
+        query = pattern.sub(replacement, query)
+    return query
+
+
+def date_format(value, fmt):
+    if value is None:
+        return None
+    try:
+        moment = datetime.fromisoformat(str(value)[:19])
+    except ValueError:
+        return None
+    return moment.strftime(fmt.replace('%i', '%M'))
+
+
+def mysql_error(error):
+    message = str(error)
+    errno = next((number for pattern, number in ERRNOS if re.search(pattern, message)), None)
+    return mysql.connector.Error(msg=message, errno=errno)
+
+
+class Cursor:
+    def __init__(self, connection, dictionary=False):
+        self._connection = connection
+        self._cursor = connection._db.cursor()
+        self._dictionary = dictionary
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def _run(self, method, query, params):
+        table = CREATE_TABLE_RE.match(query)
+        if table and self._connection.has_table(table.group(1)):
+            return
+        try:
+            method(translate(query), params)
+        except sqlite3.Error as e:
+            raise mysql_error(e) from e
+
+    def execute(self, query, params=None):
+        self._run(self._cursor.execute, query, tuple(params or ()))
+
+    def executemany(self, query, rows):
+        self._run(self._cursor.executemany, query, [tuple(row) for row in rows])
+
+    def _convert(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {column[0]: value for column, value in zip(self._cursor.description, row)}
+
+    def fetchone(self):
+        return self._convert(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._convert(row) for row in self._cursor.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._convert(row) for row in self._cursor.fetchall()]
+
+    def close(self):
+        self._cursor.close()
+
+
+class Connection:
+    def __init__(self, path):
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.create_function('DATE_FORMAT', 2, date_format, deterministic=True)
+        self._db.create_function('CONCAT_WS', -1, lambda sep, *parts: sep.join(
+            str(part) for part in parts if part is not None), deterministic=True)
+        self._db.create_function('substr_left', 2, lambda text, n: None if text is None else str(text)[:n],
+                                 deterministic=True)
+
+    @property
+    def in_transaction(self):
+        return self._db.in_transaction
+
+    def has_table(self, name):
+        return self._db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                (name,)).fetchone() is not None
+
+    def cursor(self, dictionary=False, **kwargs):
+        return Cursor(self, dictionary)
+
+    def commit(self):
+        self._db.commit()
+
+    def rollback(self):
+        self._db.rollback()
+
+    def ping(self, **kwargs):
+        pass
+
+    def close(self):
+        self._db.close()
+
+
+def install(path):
+    """Create the schema in ``path`` and route every MySQL connection to it"""
+    db = sqlite3.connect(path)
+    db.execute('PRAGMA journal_mode = WAL')
+    db.executescript(SCHEMA)
+    db.close()
+    mysql.connector.connect = lambda **config: Connection(path)
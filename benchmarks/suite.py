@@ -0,0 +1,213 @@
+"""End-to-end benchmark suite over seeded synthetic data.
+
+For each size the disasters table (and news_data, scaled by --news-ratio)
+is filled from generated dumps through bulk_io, then the dashboard, the
+/api/dashboard-data endpoint, the news collector and the severity model
+are timed. Results are written as JSON; pass an earlier file as
+--baseline to print the change per benchmark.
+
+By default everything runs against a SQLite stand-in. With --backend mysql
+the tables of the RTDMS_DB_NAME database are truncated and refilled, so
+point it at a scratch database.
+
+Run from the repository root: python benchmarks/suite.py [--sizes 10000,100000] [--output results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_io import BulkLoader
+from disaster_manager import DisasterManager
+from news_scraper import NewsCollector
+import sqlite_backend
+from synthetic import news_rows, write_dumps
+
+
+def timings(fn, repeat):
+    seconds = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        fn(i)
+        seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+class Suite:
+    def __init__(self, workdir, seed=42, news_ratio=0.1, train_max_rows=100000, method='auto'):
+        self.workdir = workdir
+        self.seed = seed
+        self.news_ratio = news_ratio
+        self.train_max_rows = train_max_rows
+        self.method = method
+        self.results = []
+
+    def record(self, name, rows, value, unit, higher_is_better=False):
+        """Keep one result; ``rows`` is the size of the disasters table it ran against"""
+        self.results.append({'benchmark': name, 'rows': rows, 'value': round(value, 3),
+                             'unit': unit, 'higher_is_better': higher_is_better})
+        print(f'{rows:>9} rows  {name:<32} {value:>12,.3f} {unit}')
+
+    def populate(self, size):
+        news = max(int(size * self.news_ratio), 1)
+        write_dumps(self.workdir, disasters=size, news=news, seed=self.seed)
+        loader = BulkLoader(self.method)
+        for table, rows in (('disasters', size), ('news_data', news)):
+            started = time.perf_counter()
+            with contextlib.redirect_stderr(io.StringIO()):
+                loader.import_table(table, os.path.join(self.workdir, f'{table}.csv'), truncate=True)
+            self.record(f'populate_{table}', size, rows / (time.perf_counter() - started),
+                        'rows/s', higher_is_better=True)
+        return news
+
+    def dashboard(self, size):
+        # main builds its dashboard on import, so only once the backend is in place.
+        import main
+        dashboard = main.dashboard
+        # Background index builds would otherwise compete with the timings.
+        for thread in threading.enumerate():
+            if thread.name in ('search-index-build', 'geo-index-load'):
+                thread.join()
+        dashboard.last_seen_id = None
+
+        def cold(_):
+            dashboard.cache.invalidate()
+            dashboard.get_dashboard_data()
+        self.record('dashboard_summary_cold', size, statistics.median(timings(cold, 5)) * 1000, 'ms')
+        warm = timings(lambda _: dashboard.get_dashboard_data(), 1000)
+        self.record('dashboard_summary_warm', size, statistics.median(warm) * 1e6, 'us')
+
+        client = main.app.test_client()
+        # A distinct query string misses the snapshot cache, so the page is rebuilt and encoded.
+        uncached = timings(lambda i: client.get(f'/api/dashboard-data?limit=50&run={i}'), 50)
+        self.record('api_dashboard_data_uncached', size, statistics.median(uncached) * 1000, 'ms')
+        cached = timings(lambda _: client.get('/api/dashboard-data?limit=50'), 200)
+        self.record('api_dashboard_data_cached', size, statistics.median(cached) * 1000, 'ms')
+
+    def news(self, size, stored):
+        items = list(news_rows(min(size, 20000), seed=self.seed + 1, start_id=stored + 1))
+        texts = [item['content'] for item in items]
+        seconds = {}
+        # The collector reports every batch it stores on stdout.
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            collector = NewsCollector(index_path=os.path.join(self.workdir, 'near_duplicates.npz'))
+            seconds['startup'] = time.perf_counter() - started
+
+            def store_all():
+                for item in items:
+                    collector.store_item(item)
+                collector.close()
+
+            for name, step in (('clean_text', lambda: [collector.clean_text(text) for text in texts]),
+                               ('extract_location', lambda: [collector.extract_location(text) for text in texts]),
+                               ('store_item', store_all)):
+                started = time.perf_counter()
+                step()
+                seconds[name] = time.perf_counter() - started
+        self.record('news_collector_startup', size, seconds.pop('startup'), 's')
+        for name, elapsed in seconds.items():
+            self.record(f'news_{name}', size, len(items) / elapsed, 'items/s', higher_is_better=True)
+
+    def model(self, size):
+        if size > self.train_max_rows:
+            print(f'{size:>9} rows  skipping train/predict (above --train-max-rows)')
+            return
+        manager = DisasterManager()
+        started = time.perf_counter()
+        if not manager.train():
+            return
+        self.record('model_train', size, time.perf_counter() - started, 's')
+        texts = [item['content'] for item in news_rows(1000, seed=self.seed + 2)]
+        single = timings(lambda i: manager.predict_severity(texts[i]), 200)
+        self.record('model_predict_single', size, statistics.median(single) * 1000, 'ms')
+        started = time.perf_counter()
+        manager.predict_severity_batch(texts)
+        self.record('model_predict_batch', size, len(texts) / (time.perf_counter() - started),
+                    'rows/s', higher_is_better=True)
+
+    def run(self, size):
+        stored = self.populate(size)
+        self.dashboard(size)
+        self.news(size, stored)
+        self.model(size)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as handle:
+        baseline = {(r['benchmark'], r['rows']): r for r in json.load(handle)['results']}
+    print(f'\nChange against {baseline_path}:')
+    for result in results:
+        old = baseline.get((result['benchmark'], result['rows']))
+        if not old or not old['value']:
+            continue
+        change = (result['value'] - old['value']) / old['value'] * 100
+        better = (change > 0) == result['higher_is_better']
+        print(f"{result['rows']:>9} rows  {result['benchmark']:<32} {old['value']:>12,.3f} -> "
+              f"{result['value']:>12,.3f} {result['unit']:<7} {change:+6.1f}% "
+              f"{'better' if better else 'worse'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000', help='disaster rows per run, e.g. 10000,1000000,10000000')
+    parser.add_argument('--backend', choices=('sqlite', 'mysql'), default='sqlite')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--news-ratio', type=float, default=0.1, help='news_data rows per disaster row')
+    parser.add_argument('--train-max-rows', type=int, default=100000,
+                        help='skip model training above this size; a full retrain is slow')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix='rtdms-bench-')
+    # Models trained here must not replace the ones the application serves.
+    os.environ['RTDMS_MODEL_DIR'] = os.path.join(workdir, 'models')
+    if args.backend == 'sqlite':
+        sqlite_backend.install(os.path.join(workdir, 'bench.sqlite3'))
+
+    suite = Suite(workdir, seed=args.seed, news_ratio=args.news_ratio, train_max_rows=args.train_max_rows,
+                  method='insert' if args.backend == 'sqlite' else 'auto')
+    for size in (int(s) for s in args.sizes.split(',')):
+        suite.run(size)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'backend': args.backend,
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'results': suite.results,
+    }
+    with open(args.output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    print(f'Results written to {args.output}')
+    if args.baseline:
+        compare(suite.results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
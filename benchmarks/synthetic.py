@@ -0,0 +1,119 @@
+"""Seeded synthetic disaster and news rows shared by the benchmarks.
+
+Run from the repository root to write data_mysql-style dumps that
+bulk_io.py can import: python benchmarks/synthetic.py --disasters 1000000 --dir seed
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_io import TABLES, write_rows
+
+TYPES = ['flood', 'earthquake', 'cyclone', 'wildfire', 'landslide', 'drought', 'storm', 'heat wave']
+LOCATIONS = ['Assam', 'Kerala', 'Odisha', 'Gujarat', 'Bihar', 'Maharashtra', 'California',
+             'Texas', 'Florida', 'Uttarakhand', 'Tamil Nadu', 'West Bengal']
+SEVERITY_WORDS = {
+    'High': ['dead', 'killed', 'massive', 'devastating', 'evacuated', 'collapsed', 'missing'],
+    'Medium': ['injured', 'damaged', 'displaced', 'disrupted', 'flooded', 'stranded'],
+    'Low': ['minor', 'alert', 'warning', 'precaution', 'advisory', 'watch'],
+}
+US_LOCATIONS = ['California', 'Texas', 'Florida', 'Louisiana', 'Oklahoma', 'Oregon']
+NEWS_SOURCES = ['http://rss.cnn.com/rss/cnn_latest.rss', 'https://www.weather.gov/rss_page.php',
+                'https://www.fema.gov/about/news-multimedia/rss', 'https://reliefweb.int/updates/rss.xml']
+FILLER = ('officials said the district administration has deployed relief teams while '
+          'residents were moved to shelters and roads remain closed after heavy rain').split()
+
+
+def disaster_rows(count, seed=42, start_id=1):
+    """Yield disaster dicts whose description vocabulary correlates with severity"""
+    rng = random.Random(seed)
+    severities = list(SEVERITY_WORDS)
+    start = datetime(2024, 1, 1)
+    for offset in range(count):
+        severity = rng.choices(severities, weights=(2, 5, 3))[0]
+        disaster_type = rng.choice(TYPES)
+        location = rng.choice(LOCATIONS)
+        words = [rng.choice(FILLER) for _ in range(rng.randint(15, 40))]
+        # Some noise keeps the task from being trivially separable.
+        for _ in range(3):
+            label = severity if rng.random() < 0.7 else rng.choice(severities)
+            words.insert(rng.randrange(len(words)), rng.choice(SEVERITY_WORDS[label]))
+        words.insert(0, disaster_type)
+        words.insert(rng.randrange(len(words)), location)
+        yield {
+            'id': start_id + offset,
+            'type': disaster_type,
+            'location': location,
+            'date': start + timedelta(minutes=rng.randrange(60 * 24 * 365)),
+            'description': ' '.join(words),
+            'severity': severity,
+            'url': f'https://example.org/disasters/{start_id + offset}',
+            'latitude': round(rng.uniform(8.0, 37.0), 4),
+            'longitude': round(rng.uniform(68.0, 97.0), 4),
+        }
+
+
+def news_rows(count, seed=7, start_id=1):
+    """Yield news_data dicts; about a third mention no disaster and a tenth are reposts"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    stories = []
+    for offset in range(count):
+        if stories and rng.random() < 0.1:
+            # A repost of an earlier story with a word or two changed.
+            words = list(rng.choice(stories))
+            words[rng.randrange(len(words))] = rng.choice(FILLER)
+        else:
+            words = [rng.choice(FILLER) for _ in range(rng.randint(20, 60))]
+            if rng.random() < 0.7:
+                words.insert(rng.randrange(len(words)), rng.choice(TYPES))
+            words.insert(rng.randrange(len(words)), rng.choice(['in', 'near', 'at']))
+            words.insert(rng.randrange(len(words)), rng.choice(US_LOCATIONS + LOCATIONS))
+            stories.append(words)
+            if len(stories) > 1000:
+                stories.pop(rng.randrange(len(stories)))
+        content = ' '.join(words)
+        collected = start + timedelta(seconds=rng.randrange(86400 * 365))
+        yield {
+            'id': start_id + offset,
+            'title': ' '.join(words[:8]).capitalize(),
+            'content': content,
+            'url': f'https://example.org/news/{start_id + offset}',
+            'source': rng.choice(NEWS_SOURCES),
+            'published_date': collected.strftime('%a, %d %b %Y %H:%M:%S GMT'),
+            'location': 'Unknown',
+            'location_confidence': 0.0,
+            'disaster_type': 'other',
+            'cleaned_content': content,
+            'collected_at': collected,
+        }
+
+
+def write_dumps(directory, disasters=0, news=0, seed=42):
+    """Write disasters.csv and news_data.csv in the data_mysql dump format"""
+    os.makedirs(directory, exist_ok=True)
+    for table, count, rows in (('disasters', disasters, disaster_rows),
+                               ('news_data', news, news_rows)):
+        if count:
+            path = os.path.join(directory, f'{table}.csv')
+            with open(path, 'w', newline='', encoding='utf-8') as handle:
+                write_rows(handle, ([row.get(column) for column in TABLES[table]]
+                                    for row in rows(count, seed=seed)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--disasters', type=int, default=100000)
+    parser.add_argument('--news', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--dir', default='seed')
+    args = parser.parse_args()
+    write_dumps(args.dir, args.disasters, args.news, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""Bulk import and export of the data_mysql table dumps.
+
+The dumps use MySQL's ``SELECT ... INTO OUTFILE`` format: no header, every
+value enclosed in double quotes, backslash escapes and an unquoted ``\\N``
+for NULL. Files are streamed in chunks, so their size is not limited by
+memory.
+"""
+import argparse
+import csv
+import os
+import re
+import sys
+import tempfile
+import time
+import mysql.connector
+from db_pool import DB_CONFIG, get_pool
+import rollups
+
+# Columns in the order the dumps store them.
+TABLES = {
+    'users': ('id', 'username', 'email', 'password', 'created_at'),
+    'disasters': ('id', 'type', 'location', 'severity', 'date', 'description', 'source',
+                  'latitude', 'longitude'),
+    'news_data': ('id', 'title', 'content', 'url', 'source', 'published_date', 'location',
+                  'location_confidence', 'disaster_type', 'cleaned_content', 'collected_at'),
+}
+DUPLICATE_MODES = {'error': '', 'ignore': 'IGNORE', 'replace': 'REPLACE'}
+# LOAD DATA LOCAL refused by the server (1148, 3948) or the client (2068).
+LOCAL_INFILE_REFUSED = (1148, 2068, 3948)
+
+# Literal backslashes are always doubled, so a backslash-N between separators is a NULL.
+NULL_RE = re.compile(r'(?<![^,\n])\\N(?=[,\r\n]|$)')
+NULL_MARK = '\ue000'
+ESCAPED_RE = re.compile(r'\\.', re.S)
+DIALECT = {'delimiter': ',', 'quotechar': '"', 'escapechar': '\\', 'doublequote': False}
+
+
+def read_records(path):
+    """Yield the raw text of each record; quoted values may span lines"""
+    with open(path, newline='', encoding='utf-8') as handle:
+        record, quoted = [], False
+        for line in handle:
+            record.append(line)
+            if ESCAPED_RE.sub('', line).count('"') % 2:
+                quoted = not quoted
+            if not quoted:
+                yield ''.join(record)
+                record = []
+        if record:
+            yield ''.join(record)
+
+
+def parse_records(records):
+    """Split raw records into lists of values, with None for ``\\N``"""
+    lines = (NULL_RE.sub(NULL_MARK, record) for record in records)
+    for row in csv.reader(lines, strict=True, **DIALECT):
+        yield [None if value == NULL_MARK else value for value in row]
+
+
+def read_dump(path):
+    return parse_records(read_records(path))
+
+
+def dump_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\0', '\\0')
+    return f'"{text}"'
+
+
+def write_rows(handle, rows):
+    handle.writelines(','.join(dump_value(value) for value in row) + '\n' for row in rows)
+
+
+def chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Progress:
+    def __init__(self, label):
+        self.label = label
+        self.rows = 0
+        self.started = time.perf_counter()
+
+    def add(self, count):
+        self.rows += count
+        elapsed = time.perf_counter() - self.started
+        rate = self.rows / elapsed if elapsed else 0
+        print(f'\r{self.label}: {self.rows:,} rows  {rate:,.0f} rows/s', end='', file=sys.stderr, flush=True)
+
+    def done(self):
+        elapsed = time.perf_counter() - self.started
+        print(f'\r{self.label}: {self.rows:,} rows in {elapsed:.1f}s '
+              f'({self.rows / elapsed if elapsed else 0:,.0f} rows/s)', file=sys.stderr)
+
+
+class BulkLoader:
+    """Stream dump files into MySQL and tables back out to dump files.
+
+    Imports go through ``LOAD DATA LOCAL INFILE`` one chunk at a time, or
+    through multi-row INSERTs when the server or client refuses local
+    files. Every chunk is its own transaction. Exports page through the
+    table by id.
+    """
+
+    def __init__(self, method='auto', batch_size=50000, on_duplicate='error'):
+        if on_duplicate not in DUPLICATE_MODES:
+            raise ValueError(f'on_duplicate must be one of {tuple(DUPLICATE_MODES)}')
+        self.method = method
+        self.batch_size = batch_size
+        self.on_duplicate = on_duplicate
+        self.pool = get_pool(dict(DB_CONFIG, allow_local_infile=True))
+
+    def load_chunk(self, cursor, table, records):
+        columns = ', '.join(TABLES[table])
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8',
+                                         delete=False) as handle:
+            handle.writelines(records)
+        try:
+            cursor.execute(f"""
+                LOAD DATA LOCAL INFILE %s {DUPLICATE_MODES[self.on_duplicate]}
+                INTO TABLE {table} CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY ',' ENCLOSED BY '"' ESCAPED BY '\\\\'
+                LINES TERMINATED BY '\\n'
+                ({columns})
+            """, (handle.name,))
+        finally:
+            os.remove(handle.name)
+
+    def insert_chunk(self, cursor, table, records, rows_per_statement=1000):
+        columns = TABLES[table]
+        chunk = list(parse_records(records))
+        verb = 'REPLACE' if self.on_duplicate == 'replace' else f'INSERT {DUPLICATE_MODES[self.on_duplicate]}'
+        placeholders = f"({', '.join(['%s'] * len(columns))})"
+        # Statements stay well under max_allowed_packet even for long news texts.
+        for start in range(0, len(chunk), rows_per_statement):
+            part = chunk[start:start + rows_per_statement]
+            cursor.execute(f"""
+                {verb} INTO {table} ({', '.join(columns)})
+                VALUES {', '.join([placeholders] * len(part))}
+            """, [value for row in part for value in row])
+
+    def import_table(self, table, path, truncate=False):
+        progress = Progress(f'import {table}')
+        method = self.method
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if truncate:
+                    cursor.execute(f'TRUNCATE TABLE {table}')
+                # Records are passed through unparsed unless they have to be INSERTed.
+                for chunk in chunks(read_records(path), self.batch_size):
+                    if method != 'insert':
+                        try:
+                            self.load_chunk(cursor, table, chunk)
+                        except mysql.connector.Error as err:
+                            if method == 'load' or err.errno not in LOCAL_INFILE_REFUSED:
+                                raise
+                            print(f'\nLOAD DATA LOCAL refused ({err}); using batched INSERTs', file=sys.stderr)
+                            method = 'insert'
+                    if method == 'insert':
+                        self.insert_chunk(cursor, table, chunk)
+                    conn.commit()
+                    progress.add(len(chunk))
+                if table == 'disasters':
+                    self.rebuild_rollups(cursor)
+                    conn.commit()
+            except mysql.connector.Error:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        progress.done()
+        return progress.rows
+
+    @staticmethod
+    def rebuild_rollups(cursor):
+        try:
+            rollups.backfill(cursor)
+        except mysql.connector.Error as err:
+            # The rollup tables only exist once migration 3 has run.
+            if err.errno != rollups.NO_SUCH_TABLE:
+                raise
+
+    def export_table(self, table, path):
+        progress = Progress(f'export {table}')
+        columns = ', '.join(TABLES[table])
+        tmp_path = f'{path}.tmp'
+        with self.pool.connection() as conn, open(tmp_path, 'w', newline='', encoding='utf-8') as handle:
+            cursor = conn.cursor()
+            try:
+                last_id = 0
+                while True:
+                    cursor.execute(f"""
+                        SELECT {columns} FROM {table}
+                        WHERE id > %s ORDER BY id LIMIT %s
+                    """, (last_id, self.batch_size))
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    write_rows(handle, rows)
+                    last_id = rows[-1][0]
+                    progress.add(len(rows))
+            finally:
+                cursor.close()
+        os.replace(tmp_path, path)
+        progress.done()
+        return progress.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk import/export the data_mysql table dumps')
+    parser.add_argument('action', choices=('import', 'export'))
+    parser.add_argument('tables', nargs='*', help=f"tables to process (default: {' '.join(TABLES)})")
+    parser.add_argument('--dir', default='data_mysql', help='directory holding <table>.csv')
+    parser.add_argument('--method', choices=('auto', 'load', 'insert'), default='auto',
+                        help='LOAD DATA LOCAL INFILE, batched INSERTs, or LOAD DATA with fallback')
+    parser.add_argument('--batch-size', type=int, default=50000, help='rows per chunk/transaction')
+    parser.add_argument('--on-duplicate', choices=tuple(DUPLICATE_MODES), default='error',
+                        help='what to do with rows whose key already exists')
+    parser.add_argument('--truncate', action='store_true', help='empty each table before importing')
+    args = parser.parse_args()
+    unknown = set(args.tables) - set(TABLES)
+    if unknown:
+        parser.error(f"unknown tables: {', '.join(sorted(unknown))}")
+
+    loader = BulkLoader(args.method, args.batch_size, args.on_duplicate)
+    for table in args.tables or list(TABLES):
+        path = os.path.join(args.dir, f'{table}.csv')
+        if args.action == 'import':
+            loader.import_table(table, path, truncate=args.truncate)
+        else:
+            loader.export_table(table, path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+from collections import deque
+import threading
+import time
+import logging
+
+ROW_FIELDS = ('id', 'type', 'location', 'severity', 'date', 'description', 'source')
+
+
+class ChangeEvent:
+    __slots__ = ('id', 'op', 'row', 'summary')
+
+    def __init__(self, event_id, op, row, summary):
+        self.id = event_id
+        self.op = op
+        self.row = row
+        self.summary = summary
+
+    def to_dict(self):
+        return {'op': self.op, 'row': self.row, 'summary': self.summary}
+
+
+class ChangeFeed:
+    """Bounded in-memory log of disaster changes shared by every stream client.
+
+    Writers call ``publish``; each connected dashboard calls ``wait`` with the
+    id of the last event it saw. Clients whose id has already been evicted
+    from the log are told to reset and refetch instead of silently missing
+    changes.
+    """
+
+    def __init__(self, capacity: int = 1000, poll_interval: float = 5.0):
+        self.capacity = capacity
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+        self._events = deque(maxlen=capacity)
+        self._next_id = 1
+        self._cond = threading.Condition()
+        self._summary = None
+        self._poller = None
+        self._poll_lock = threading.Lock()
+        self._last_poll = 0.0
+
+    def set_summary_provider(self, summary):
+        self._summary = summary
+
+    def set_poller(self, poller):
+        """Register a callable that picks up rows written by other processes."""
+        self._poller = poller
+
+    @property
+    def last_id(self) -> int:
+        with self._cond:
+            return self._next_id - 1
+
+    def publish(self, op, row):
+        summary = self._summary() if self._summary else None
+        payload = {field: row.get(field) for field in ROW_FIELDS}
+        if payload['date'] is not None:
+            payload['date'] = str(payload['date'])[:10]
+        with self._cond:
+            event = ChangeEvent(self._next_id, op, payload, summary)
+            self._next_id += 1
+            self._events.append(event)
+            self._cond.notify_all()
+        return event
+
+    def _events_after(self, last_id):
+        if last_id >= self._next_id:
+            return None
+        if self._events and last_id < self._events[0].id - 1:
+            return None
+        return [event for event in self._events if event.id > last_id]
+
+    def poll(self):
+        if self._poller is None:
+            return
+        if time.monotonic() - self._last_poll < self.poll_interval:
+            return
+        # One client polls on behalf of everyone; the others just wait.
+        if not self._poll_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_poll = time.monotonic()
+            self._poller()
+        except Exception as e:
+            self.logger.error(f'Error polling for disaster changes: {e}')
+        finally:
+            self._poll_lock.release()
+
+    def wait(self, last_id: int, timeout: float = 15.0):
+        """Block until there are events after ``last_id``.
+
+        Returns ``None`` when ``last_id`` can no longer be resumed from,
+        otherwise a (possibly empty, on timeout) list of events.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self.poll()
+            with self._cond:
+                events = self._events_after(last_id)
+                if events is None or events:
+                    return events
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._cond.wait(min(remaining, self.poll_interval))
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,192 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+import threading
+import time
+import logging
+from metrics import registry
+
+CACHE_LOOKUPS = registry.counter(
+    'rtdms_dashboard_cache_lookups_total', 'Dashboard counter reads, by whether a reload was needed', ('result',))
+
+
+class DashboardCache:
+    """In-process aggregate store behind the dashboard counters.
+
+    The counters are loaded once through ``loader`` and then adjusted from
+    the write paths (``record_insert``/``record_update``/``record_delete``).
+    Writes made by other processes are picked up when the snapshot is older
+    than ``max_staleness`` seconds or after an explicit ``invalidate()``;
+    ``version`` changes with every write and with any reload that finds the
+    counters or the loader's change stamp moved.
+    Row listings are not cached here; they are paged straight from SQL.
+    Listeners registered with ``add_listener`` are told about every write.
+    """
+
+    def __init__(self, max_staleness: float = 60.0):
+        self.max_staleness = max_staleness
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._loader = None
+        self._loaded_at = None
+        self._listeners = []
+        self.version = 0
+        self._reset()
+
+    def _reset(self):
+        self.total = 0
+        self.max_id = 0
+        self.changed_at = None
+        self.severity_counts = defaultdict(int)
+        self.type_counts = defaultdict(int)
+        self.location_counts = defaultdict(int)
+        self.date_counts = defaultdict(int)
+
+    def set_loader(self, loader):
+        """Register a callable returning the counters as (key, count) pairs.
+
+        The loader returns a dict with ``total``, ``max_id``, ``changed_at``
+        (a stamp that moves when rows are edited, e.g. ``MAX(updated_at)``) and
+        ``severity_counts``, ``type_counts``, ``location_counts`` and
+        ``date_counts`` lists.
+        """
+        with self._lock:
+            self._loader = loader
+            self._loaded_at = None
+
+    def add_listener(self, listener):
+        """Register ``listener(op, row)``, called after every recorded write."""
+        self._listeners.append(listener)
+
+    def _notify(self, op, row):
+        for listener in self._listeners:
+            try:
+                listener(op, row)
+            except Exception as e:
+                self.logger.error(f'Error notifying cache listener: {e}')
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+            # The caller changed rows in ways the counters may not show.
+            self.version += 1
+
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def _ensure_fresh(self):
+        if self._loader is None:
+            raise RuntimeError('DashboardCache has no loader configured')
+        if (self._loaded_at is None
+                or time.monotonic() - self._loaded_at > self.max_staleness):
+            CACHE_LOOKUPS.inc('reload')
+            self._reload()
+        else:
+            CACHE_LOOKUPS.inc('hit')
+
+    def _state(self):
+        return (self.total, self.max_id, self.changed_at, dict(self.severity_counts), dict(self.type_counts),
+                dict(self.location_counts), dict(self.date_counts))
+
+    def _reload(self):
+        aggregates = self._loader()
+        previous = self._state() if self.is_loaded() else None
+        self._reset()
+        self.total = aggregates['total']
+        self.max_id = aggregates['max_id']
+        self.changed_at = aggregates.get('changed_at')
+        for severity, count in aggregates['severity_counts']:
+            self.severity_counts[severity.lower() if severity else 'unknown'] += count
+        for key in ('type_counts', 'location_counts'):
+            counts = getattr(self, key)
+            for value, count in aggregates[key]:
+                counts[value or 'Unknown'] += count
+        for value, count in aggregates['date_counts']:
+            key = self._date_key(value)
+            if key is not None:
+                self.date_counts[key] += count
+        self._loaded_at = time.monotonic()
+        # Periodic reloads usually find nothing new; keeping the version keeps the snapshots.
+        if self._state() != previous:
+            self.version += 1
+            self.logger.info(f'Dashboard cache loaded with {self.total} disasters')
+
+    def _apply(self, row, sign):
+        severity = row.get('severity')
+        self.version += 1
+        self.total += sign
+        if sign > 0 and row.get('id') is not None:
+            self.max_id = max(self.max_id, row['id'])
+        self._bump(self.severity_counts, severity.lower() if severity else 'unknown', sign)
+        self._bump(self.type_counts, row.get('type') or 'Unknown', sign)
+        self._bump(self.location_counts, row.get('location') or 'Unknown', sign)
+        key = self._date_key(row.get('date'))
+        if key is not None:
+            self._bump(self.date_counts, key, sign)
+
+    @staticmethod
+    def _date_key(value):
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, date):
+            return datetime.combine(value, datetime.min.time())
+        try:
+            return datetime.fromisoformat(str(value)[:19]) if value else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _bump(counts, key, sign):
+        counts[key] += sign
+        if counts[key] <= 0:
+            del counts[key]
+
+    def record_insert(self, row):
+        with self._lock:
+            if self.is_loaded():
+                self._apply(row, 1)
+        self._notify('insert', row)
+
+    def record_update(self, disaster_id, old_row, new_row):
+        with self._lock:
+            if self.is_loaded():
+                if old_row is None:
+                    self._loaded_at = None
+                else:
+                    self._apply(old_row, -1)
+                    self._apply(new_row, 1)
+        self._notify('update', dict(new_row, id=disaster_id))
+
+    def record_delete(self, disaster_id, old_row=None):
+        with self._lock:
+            if self.is_loaded():
+                if old_row is None:
+                    self._loaded_at = None
+                else:
+                    self._apply(old_row, -1)
+        self._notify('delete', dict(old_row or {}, id=disaster_id))
+
+    def last_24h_count(self, now=None) -> int:
+        cutoff = (now or datetime.now()) - timedelta(days=1)
+        return sum(count for moment, count in self.date_counts.items() if moment > cutoff)
+
+    def current_version(self) -> int:
+        """Monotonic stamp that changes whenever the dashboard dataset may have."""
+        with self._lock:
+            self._ensure_fresh()
+            return self.version
+
+    def summary(self):
+        with self._lock:
+            self._ensure_fresh()
+            top_locations = sorted(self.location_counts.items(),
+                                   key=lambda x: x[1], reverse=True)[:5]
+            return {
+                'total_disasters': self.total,
+                'last_24h_disasters': self.last_24h_count(),
+                'severity_breakdown': dict(self.severity_counts),
+                'disaster_types': dict(self.type_counts),
+                'top_locations': dict(top_locations),
+            }
+
+
+dashboard_cache = DashboardCache()
@@ -0,0 +1,257 @@
+from contextlib import contextmanager
+from mysql.connector.errors import PoolError
+import mysql.connector
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from metrics import registry
+
+DB_CONFIG = {
+    'host': os.environ.get('RTDMS_DB_HOST', 'localhost'),
+    'user': os.environ.get('RTDMS_DB_USER', 'root'),
+    'password': os.environ.get('RTDMS_DB_PASSWORD', 'root'),
+    'database': os.environ.get('RTDMS_DB_NAME', 'disaster')
+}
+
+QUERY_SECONDS = registry.histogram(
+    'rtdms_sql_query_duration_seconds', 'Time spent in execute()/executemany() per statement', ('query',))
+QUERY_FETCH_SECONDS = registry.counter(
+    'rtdms_sql_fetch_seconds_total', 'Time spent fetching result rows per statement', ('query',))
+QUERY_ERRORS = registry.counter(
+    'rtdms_sql_query_errors_total', 'Statements that raised a database error', ('query',))
+_query_labels = {}
+
+
+def _query_label(frame) -> str:
+    """Name a statement after the code that executes it, e.g. ``main.DisasterDashboard.load_aggregates:182``"""
+    key = (frame.f_code, frame.f_lineno)
+    label = _query_labels.get(key)
+    if label is None:
+        module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+        # co_qualname is new in Python 3.11; older versions only have the bare name.
+        name = getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+        label = _query_labels[key] = f'{module}.{name}:{frame.f_lineno}'
+    return label
+
+
+class TimedCursor:
+    """Cursor wrapper recording the latency of every statement it runs"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._label = None
+
+    def _timed(self, method, args, kwargs):
+        # The statement is named after whoever called execute(), two frames up.
+        label = self._label = _query_label(sys._getframe(2))
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except mysql.connector.Error:
+            QUERY_ERRORS.inc(label)
+            raise
+        finally:
+            QUERY_SECONDS.observe(time.perf_counter() - started, label)
+
+    def execute(self, *args, **kwargs):
+        return self._timed(self._cursor.execute, args, kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._timed(self._cursor.executemany, args, kwargs)
+
+    def _fetch(self, method, args=(), kwargs=None):
+        # Unbuffered cursors read the rows here rather than in execute().
+        started = time.perf_counter()
+        try:
+            return method(*args, **(kwargs or {}))
+        finally:
+            QUERY_FETCH_SECONDS.inc(self._label, amount=time.perf_counter() - started)
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._fetch(self._cursor.fetchmany, args, kwargs)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class TimedConnection:
+    """Connection wrapper handing out ``TimedCursor``s; everything else is passed through"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._connection.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+class ConnectionPool:
+    """Thread-safe pool of MySQL connections.
+
+    At most ``size`` connections are checked out at once; callers wait up to
+    ``timeout`` seconds for one before a ``PoolError`` is raised. Idle
+    connections are pinged before reuse once they have been idle for more
+    than ``health_check_interval`` seconds.
+    """
+
+    def __init__(self, config=None, size=None, timeout=None, health_check_interval=30.0):
+        self.config = dict(config or DB_CONFIG)
+        self.size = size or int(os.environ.get('RTDMS_DB_POOL_SIZE', 10))
+        self.timeout = timeout or float(os.environ.get('RTDMS_DB_POOL_TIMEOUT', 5))
+        self.health_check_interval = health_check_interval
+        self.logger = logging.getLogger(__name__)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._metrics = {
+            'connections_created': 0,
+            'checkouts': 0,
+            'checkout_timeouts': 0,
+            'health_check_failures': 0,
+            'in_use': 0,
+            'wait_seconds_total': 0.0,
+        }
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self._metrics[name] += value
+
+    def _connect(self):
+        connection = mysql.connector.connect(**self.config)
+        self._count('connections_created')
+        return connection
+
+    def _is_healthy(self, connection, idle_since) -> bool:
+        if time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            connection.ping(reconnect=True, attempts=1)
+            return True
+        except mysql.connector.Error as err:
+            self.logger.warning(f'Discarding unhealthy pooled connection: {err}')
+            self._count('health_check_failures')
+            return False
+
+    def acquire(self):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.timeout):
+            self._count('checkout_timeouts')
+            raise PoolError(f'No database connection available within {self.timeout}s')
+        try:
+            connection = None
+            while connection is None:
+                try:
+                    candidate, idle_since = self._idle.get_nowait()
+                except queue.Empty:
+                    connection = self._connect()
+                    break
+                if self._is_healthy(candidate, idle_since):
+                    connection = candidate
+                else:
+                    self._close_quietly(candidate)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._metrics['checkouts'] += 1
+            self._metrics['in_use'] += 1
+            self._metrics['wait_seconds_total'] += time.monotonic() - started
+        return connection
+
+    def release(self, connection):
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            self._idle.put((connection, time.monotonic()))
+        except mysql.connector.Error:
+            self._close_quietly(connection)
+        finally:
+            self._count('in_use', -1)
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        try:
+            yield TimedConnection(connection)
+        finally:
+            self.release(connection)
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except mysql.connector.Error:
+            pass
+
+    def close_idle(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close_quietly(connection)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+        stats['size'] = self.size
+        stats['idle'] = self._idle.qsize()
+        return stats
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(config=None, **kwargs) -> ConnectionPool:
+    """Return the process-wide pool for ``config``, creating it on first use."""
+    key = tuple(sorted((config or DB_CONFIG).items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(config, **kwargs)
+        return _pools[key]
+
+
+POOL_STATS = {
+    'connections_created': ('rtdms_db_pool_connections_created_total', 'counter', 'Connections opened'),
+    'checkouts': ('rtdms_db_pool_checkouts_total', 'counter', 'Connections handed out'),
+    'checkout_timeouts': ('rtdms_db_pool_checkout_timeouts_total', 'counter', 'Checkouts that timed out'),
+    'health_check_failures': ('rtdms_db_pool_health_check_failures_total', 'counter',
+                              'Idle connections discarded after a failed ping'),
+    'wait_seconds_total': ('rtdms_db_pool_wait_seconds_total', 'counter', 'Time spent waiting for a connection'),
+    'in_use': ('rtdms_db_pool_connections_in_use', 'gauge', 'Connections currently checked out'),
+    'idle': ('rtdms_db_pool_connections_idle', 'gauge', 'Open connections waiting in the pool'),
+    'size': ('rtdms_db_pool_size', 'gauge', 'Maximum connections per pool'),
+}
+
+
+def _pool_stat(name):
+    def collect():
+        with _pools_lock:
+            pools = list(_pools.values())
+        # Separate pools on one database (e.g. bulk_io's local-infile pool) are summed.
+        values = {}
+        for pool in pools:
+            key = (pool.config.get('database'),)
+            values[key] = values.get(key, 0) + pool.stats()[name]
+        return values
+    return collect
+
+
+for _name, (_metric, _kind, _documentation) in POOL_STATS.items():
+    registry.callback(_metric, _documentation, _kind, _pool_stat(_name), ('database',))
@@ -1,13 +1,113 @@
 import mysql.connector
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import logging
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import SGDClassifier
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-import joblib
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import FunctionTransformer, LabelEncoder
+import argparse
+import copy
 import os
+import time
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+from dashboard_cache import dashboard_cache
+from db_pool import DB_CONFIG, get_pool
+from model_registry import ModelRegistry
+import profiling
+import rollups
+
+def build_full_model():
+    return (TfidfVectorizer(max_features=5000, stop_words='english'),
+            RandomForestClassifier(n_estimators=100, random_state=42))
+
+# Registry pointer for the online model, kept apart from CURRENT so that
+# incremental runs never change the model being served.
+INCREMENTAL_CHECKPOINT = 'INCREMENTAL'
+
+def build_incremental_model():
+    # Hashing is stateless, so new rows never require refitting a vocabulary.
+    return (HashingVectorizer(n_features=2 ** 18, alternate_sign=False, stop_words='english'),
+            SGDClassifier(loss='log_loss', random_state=42))
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def select_columns(X, columns):
+    return X[:, columns]
+
+def fit_streaming(chunks, classes: List[str], n_jobs: int = -1, holdout: int = 5,
+                  max_features: int = 5000, max_samples: Optional[int] = None):
+    """Fit the TF-IDF forest from (ids, descriptions, severities) chunks.
+
+    Descriptions are hashed chunk by chunk, so only the sparse matrix is kept
+    in memory, never the raw text. As with ``max_features`` in train(), only
+    the most frequent hashed terms are kept. Rows whose id is a multiple of
+    ``holdout`` are set aside for testing. Unpruned trees grow with their
+    sample, so ``max_samples`` caps the rows drawn per tree to keep the
+    forest's size fixed as the table grows. Returns (vectorizer, classifier,
+    label_encoder, stats), or None when there are no training rows; raises
+    ValueError when the training rows contain no terms.
+    """
+    stats = {}
+    started = time.perf_counter()
+    hasher = HashingVectorizer(n_features=2 ** 18, alternate_sign=False, stop_words='english',
+                               norm=None, dtype=np.float32)
+    label_encoder = LabelEncoder().fit(classes)
+    parts = {False: ([], []), True: ([], [])}
+    for ids, descriptions, severities in chunks:
+        is_test = np.asarray(ids) % holdout == 0
+        X = hasher.transform(descriptions)
+        y = label_encoder.transform(severities)
+        for flag, (matrices, labels) in parts.items():
+            matrices.append(X[is_test == flag])
+            labels.append(y[is_test == flag])
+    (train_X, train_y), (test_X, test_y) = [
+        (sparse.vstack(matrices, format='csr') if matrices else None,
+         np.concatenate(labels) if labels else None)
+        for matrices, labels in (parts[False], parts[True])
+    ]
+    if train_X is None or train_X.shape[0] == 0:
+        return None
+    # The forest's split search grows with the column count, so keep it small.
+    counts = np.asarray(train_X.sum(axis=0)).ravel()
+    if not counts.any():
+        raise ValueError('empty vocabulary; the training descriptions only contain stop words')
+    columns = np.sort(np.argsort(-counts, kind='stable')[:min(max_features, np.count_nonzero(counts))])
+    selector = FunctionTransformer(select_columns, kw_args={'columns': columns}, accept_sparse=True)
+    train_X, test_X = train_X[:, columns], test_X[:, columns]
+    tfidf = TfidfTransformer().fit(train_X)
+    train_X = tfidf.transform(train_X, copy=False)
+    stats['vectorize_seconds'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if max_samples is not None:
+        max_samples = min(max_samples, train_X.shape[0])
+    classifier = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs,
+                                        max_samples=max_samples)
+    classifier.fit(train_X, train_y)
+    stats['fit_seconds'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    stats['train_score'] = classifier.score(train_X, train_y)
+    stats['test_score'] = None
+    if test_X.shape[0]:
+        stats['test_score'] = classifier.score(tfidf.transform(test_X, copy=False), test_y)
+    stats['evaluate_seconds'] = time.perf_counter() - started
+
+    # Serving scores small batches, where spawning workers costs more than it saves.
+    classifier.set_params(n_jobs=None)
+    stats.update(rows=train_X.shape[0] + test_X.shape[0], peak_rss_mb=peak_rss_mb())
+    return make_pipeline(hasher, selector, tfidf), classifier, label_encoder, stats
 
 class DisasterManager:
     def __init__(self):
@@ -15,22 +115,16 @@ class DisasterManager:
         self.setup_predictor()
         
     def setup_database(self):
-        self.db_config = {
-            'host': 'localhost',
-            'user': 'root',
-            'password': 'root',
-            'database': 'disaster'
-        }
+        self.db_config = DB_CONFIG
         self.setup_logging()
         self.initialize_connection()
         self.setup_tables()
     
     def setup_predictor(self):
-        self.vectorizer = TfidfVectorizer(max_features=5000, stop_words='english')
-        self.classifier = RandomForestClassifier(n_estimators=100, random_state=42)
+        self.vectorizer, self.classifier = build_full_model()
         self.label_encoder = LabelEncoder()
-        self.model_path = 'models/severity_model.joblib'
-        self.vectorizer_path = 'models/vectorizer.joblib'
+        self.registry = ModelRegistry(os.environ.get('RTDMS_MODEL_DIR', 'models'))
+        self.model_version = None
     
     def setup_logging(self):
         logging.basicConfig(
@@ -41,64 +135,118 @@ class DisasterManager:
 
     def initialize_connection(self):
         try:
-            self.connection = mysql.connector.connect(**self.db_config)
-            self.logger.info('Database connection initialized successfully')
+            self.pool = get_pool(self.db_config)
+            with self.pool.connection():
+                self.logger.info('Database connection initialized successfully')
         except mysql.connector.Error as err:
             self.logger.error(f'Error initializing connection: {err}')
             raise
 
-    def get_connection(self):
-        if not self.connection or not self.connection.is_connected():
-            self.initialize_connection()
-        return self.connection
-
     def setup_tables(self):
-        connection = self.get_connection()
-        cursor = connection.cursor()
-        try:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS disasters (
-                    id INTEGER PRIMARY KEY AUTO_INCREMENT,
-                    type TEXT,
-                    location TEXT,
-                    severity TEXT,
-                    date TEXT,
-                    description TEXT,
-                    source TEXT,
-                    confidence FLOAT
-                )
-            """)
-            connection.commit()
-            self.logger.info('Database tables created successfully')
-        except mysql.connector.Error as err:
-            self.logger.error(f'Error setting up database: {err}')
-            raise
-        finally:
-            cursor.close()
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS disasters (
+                        id INTEGER PRIMARY KEY AUTO_INCREMENT,
+                        type VARCHAR(100),
+                        location VARCHAR(255),
+                        severity VARCHAR(50),
+                        date DATETIME,
+                        description TEXT,
+                        source TEXT,
+                        confidence FLOAT,
+                        latitude DOUBLE,
+                        longitude DOUBLE,
+                        updated_at TIMESTAMP(6) NOT NULL
+                            DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+                        INDEX idx_disasters_date_id (date, id),
+                        INDEX idx_disasters_type_date (type, date),
+                        INDEX idx_disasters_severity_date (severity, date),
+                        INDEX idx_disasters_location_date (location, date),
+                        INDEX idx_disasters_updated_at (updated_at)
+                    )
+                """)
+                connection.commit()
+                self.logger.info('Database tables created successfully')
+            except mysql.connector.Error as err:
+                self.logger.error(f'Error setting up database: {err}')
+                raise
+            finally:
+                cursor.close()
 
     def get_training_data(self) -> tuple:
-        connection = self.get_connection()
-        cursor = connection.cursor()
-        try:
-            cursor.execute("""
-                SELECT description, severity 
-                FROM disasters 
-                WHERE severity IS NOT NULL
-            """)
-            data = cursor.fetchall()
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("""
+                    SELECT description, severity 
+                    FROM disasters 
+                    WHERE severity IS NOT NULL
+                """)
+                data = cursor.fetchall()
             
-            if not data:
-                return None, None
+                if not data:
+                    return None, None
                 
-            descriptions = [row[0] for row in data]
-            severities = [row[1] for row in data]
+                descriptions = [row[0] for row in data]
+                severities = [row[1] for row in data]
             
-            return descriptions, severities
+                return descriptions, severities
+            except mysql.connector.Error as err:
+                self.logger.error(f'Error fetching training data: {err}')
+                return None, None
+            finally:
+                cursor.close()
+
+    def iter_training_chunks(self, chunk_size: int = 10000):
+        """Yield (ids, descriptions, severities) lists of at most ``chunk_size`` rows"""
+        with self.pool.connection() as connection:
+            # Unbuffered, so the server streams rows as fetchmany asks for them.
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute("""
+                    SELECT id, description, severity 
+                    FROM disasters 
+                    WHERE severity IS NOT NULL AND description IS NOT NULL
+                """)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows]
+            finally:
+                cursor.close()
+
+    def train_streaming(self, chunk_size: int = 10000, n_jobs: int = -1,
+                        max_samples: Optional[int] = None) -> bool:
+        """Full retrain that streams rows in chunks and fits the forest on all cores"""
+        started = time.perf_counter()
+        try:
+            classes = self.get_severity_classes()
+            fitted = None
+            if classes:
+                fitted = fit_streaming(self.iter_training_chunks(chunk_size), classes,
+                                       n_jobs=n_jobs, max_samples=max_samples)
         except mysql.connector.Error as err:
             self.logger.error(f'Error fetching training data: {err}')
-            return None, None
-        finally:
-            cursor.close()
+            return False
+        except ValueError as err:
+            self.logger.error(f'Error during training: {err}')
+            return False
+        if fitted is None:
+            self.logger.warning("No training data available")
+            return False
+
+        self.vectorizer, self.classifier, self.label_encoder, stats = fitted
+        stats['wall_seconds'] = time.perf_counter() - started
+        self.logger.info(f"Training accuracy: {stats['train_score']:.2f}")
+        if stats['test_score'] is not None:
+            self.logger.info(f"Testing accuracy: {stats['test_score']:.2f}")
+        peak = 'n/a' if stats['peak_rss_mb'] is None else f"{stats['peak_rss_mb']:.0f} MB"
+        self.logger.info(f"Trained on {stats['rows']} rows in {stats['wall_seconds']:.1f}s, peak RSS {peak}")
+        self.save_model(dict(stats, kind='streaming_forest'))
+        return True
 
     def train(self) -> bool:
         try:
@@ -117,62 +265,210 @@ class DisasterManager:
             
             self.classifier.fit(X_train, y_train)
             
-            os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
-            
-            joblib.dump(self.classifier, self.model_path)
-            joblib.dump(self.vectorizer, self.vectorizer_path)
-            
             train_score = self.classifier.score(X_train, y_train)
             test_score = self.classifier.score(X_test, y_test)
             
             self.logger.info(f"Training accuracy: {train_score:.2f}")
             self.logger.info(f"Testing accuracy: {test_score:.2f}")
             
+            self.save_model({
+                'kind': 'random_forest',
+                'rows': len(descriptions),
+                'train_score': train_score,
+                'test_score': test_score
+            })
             return True
         except Exception as e:
             self.logger.error(f"Error during training: {str(e)}")
             return False
 
+    def get_severity_classes(self) -> List[str]:
+        rows = self._fetch_all("""
+            SELECT DISTINCT severity FROM disasters WHERE severity IS NOT NULL
+        """)
+        return sorted(row[0] for row in rows)
+
+    def load_incremental_checkpoint(self, classes: List[str]):
+        """Return (vectorizer, classifier, label_encoder, metadata) to resume from"""
+        version = self.registry.current_version(INCREMENTAL_CHECKPOINT)
+        model = None
+        if version is not None:
+            try:
+                model = self.registry.load(version)
+            except (OSError, ValueError) as err:
+                self.logger.warning(f'Could not load incremental checkpoint {version}: {err}')
+        if model is not None:
+            known = list(model['label_encoder'].classes_)
+            if set(classes) <= set(known):
+                # Loaded arrays are read-only memory maps; partial_fit updates in place.
+                return (model['vectorizer'], copy.deepcopy(model['classifier']),
+                        model['label_encoder'], model.metadata)
+            self.logger.warning('New severity labels found; restarting incremental training')
+        label_encoder = LabelEncoder().fit(classes)
+        vectorizer, classifier = build_incremental_model()
+        return vectorizer, classifier, label_encoder, {'last_id': 0, 'rows': 0}
+
+    def train_incremental(self, batch_size: int = 5000, activate: bool = False) -> bool:
+        """Update the online model with rows added since the last checkpoint.
+
+        Rows are consumed in id order, so relabelled older rows are only
+        picked up by a full train(). The checkpoint is saved under its own
+        registry pointer; pass ``activate`` to also serve it.
+        """
+        classes = self.get_severity_classes()
+        if not classes:
+            self.logger.warning("No training data available")
+            return False
+        vectorizer, classifier, label_encoder, checkpoint = self.load_incremental_checkpoint(classes)
+        class_ids = np.arange(len(label_encoder.classes_))
+        last_id, rows = checkpoint['last_id'], checkpoint['rows']
+        correct = seen = 0
+        new_labels = False
+
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("""
+                    SELECT id, description, severity 
+                    FROM disasters 
+                    WHERE severity IS NOT NULL AND description IS NOT NULL AND id > %s
+                    ORDER BY id
+                """, (last_id,))
+                while True:
+                    batch = cursor.fetchmany(batch_size)
+                    if not batch:
+                        break
+                    try:
+                        y = label_encoder.transform([row[2] for row in batch])
+                    except ValueError:
+                        # Labelled after get_severity_classes() ran; start over with it,
+                        # draining the unbuffered result so the cursor can be closed.
+                        new_labels = True
+                        while cursor.fetchmany(batch_size):
+                            pass
+                        break
+                    X = vectorizer.transform([row[1] for row in batch])
+                    if rows:
+                        # Progressive validation: score each batch before learning from it.
+                        correct += int((classifier.predict(X) == y).sum())
+                        seen += len(y)
+                    classifier.partial_fit(X, y, classes=class_ids)
+                    last_id = batch[-1][0]
+                    rows += len(batch)
+            except mysql.connector.Error as err:
+                self.logger.error(f'Error fetching training data: {err}')
+                return False
+            finally:
+                cursor.close()
+
+        if new_labels:
+            return self.train_incremental(batch_size, activate)
+        if last_id == checkpoint['last_id']:
+            self.logger.info('No new rows since the last checkpoint')
+            if activate and last_id:
+                self.registry.activate(self.registry.current_version(INCREMENTAL_CHECKPOINT))
+            return True
+        if seen:
+            self.logger.info(f"Progressive accuracy on new rows: {correct / seen:.2f}")
+
+        version = self.registry.save({
+            'classifier': classifier,
+            'vectorizer': vectorizer,
+            'label_encoder': label_encoder
+        }, {
+            'kind': 'incremental',
+            'last_id': last_id,
+            'rows': rows,
+            'progressive_accuracy': correct / seen if seen else None
+        }, pointer=INCREMENTAL_CHECKPOINT)
+        if activate:
+            self.registry.activate(version)
+        return True
+
+    def save_model(self, metadata: Dict[str, Any]) -> str:
+        self.model_version = self.registry.save({
+            'classifier': self.classifier,
+            'vectorizer': self.vectorizer,
+            'label_encoder': self.label_encoder
+        }, metadata)
+        return self.model_version
+
+    def ensure_model(self) -> None:
+        """Use the registry's current model, swapping in newer versions as they appear"""
+        model = self.registry.get()
+        if model is None:
+            if self.model_version is None:
+                raise RuntimeError('No trained severity model available; run train() first')
+            return
+        if model.version != self.model_version:
+            self.classifier = model['classifier']
+            self.vectorizer = model['vectorizer']
+            self.label_encoder = model['label_encoder']
+            self.model_version = model.version
+            self.logger.info(f'Using severity model version {model.version}')
+
     def predict_severity(self, description: str) -> Dict[str, Any]:
-        X = self.vectorizer.transform([description])
-        severity_encoded = self.classifier.predict(X)[0]
-        severity = self.label_encoder.inverse_transform([severity_encoded])[0]
-        proba = np.max(self.classifier.predict_proba(X)[0])
+        return self.predict_severity_batch([description])[0]
+
+    def predict_severity_batch(self, descriptions: List[str]) -> List[Dict[str, Any]]:
+        self.ensure_model()
+        X = self.vectorizer.transform(descriptions)
+        # predict() is argmax over predict_proba(), so one forest pass gives both.
+        proba = self.classifier.predict_proba(X)
+        best = proba.argmax(axis=1)
+        severities = self.label_encoder.inverse_transform(self.classifier.classes_[best])
+        confidences = proba[np.arange(len(best)), best]
         
-        return {
-            'severity': severity,
-            'confidence': float(proba)
-        }
-
-    def update_database_severities(self) -> None:
-        connection = self.get_connection()
-        cursor = connection.cursor()
-        try:
-            cursor.execute("""
-                SELECT id, description 
-                FROM disasters 
-                WHERE severity IS NULL
-            """)
-            
-            disasters = cursor.fetchall()
+        return [
+            {'severity': str(severity), 'confidence': float(confidence)}
+            for severity, confidence in zip(severities, confidences)
+        ]
+
+    def update_database_severities(self, batch_size: int = 1000) -> int:
+        updated = 0
+        with self.pool.connection() as read_connection, self.pool.connection() as write_connection:
+            read_cursor = read_connection.cursor()
+            write_cursor = write_connection.cursor()
+            try:
+                read_cursor.execute("""
+                    SELECT id, description, type, location, date
+                    FROM disasters 
+                    WHERE severity IS NULL
+                      AND description IS NOT NULL AND description <> ''
+                """)
             
-            for disaster_id, description in disasters:
-                if description:
-                    prediction = self.predict_severity(description)
+                while True:
+                    disasters = read_cursor.fetchmany(batch_size)
+                    if not disasters:
+                        break
                     
-                    cursor.execute("""
+                    ids = [row[0] for row in disasters]
+                    predictions = self.predict_severity_batch([row[1] for row in disasters])
+                    
+                    write_cursor.executemany("""
                         UPDATE disasters 
                         SET severity = %s, confidence = %s 
                         WHERE id = %s
-                    """, (prediction['severity'], prediction['confidence'], disaster_id))
+                    """, [(p['severity'], p['confidence'], disaster_id)
+                          for p, disaster_id in zip(predictions, ids)])
+                    # These rows were counted under an empty severity until now.
+                    labelled = [{'type': row[2], 'location': row[3], 'date': row[4]} for row in disasters]
+                    rollups.record(write_cursor, labelled, -1)
+                    rollups.record(write_cursor, [dict(row, severity=p['severity'])
+                                                  for row, p in zip(labelled, predictions)])
+                    write_connection.commit()
+                    updated += len(ids)
+                    self.logger.info(f'Updated severities for {updated} disasters')
             
-            connection.commit()
-            self.logger.info('Updated database with severity predictions')
-        except mysql.connector.Error as err:
-            self.logger.error(f'Error updating severities: {err}')
-            connection.rollback()
-        finally:
-            cursor.close()
+                dashboard_cache.invalidate()
+                self.logger.info('Updated database with severity predictions')
+            except mysql.connector.Error as err:
+                self.logger.error(f'Error updating severities: {err}')
+                write_connection.rollback()
+            finally:
+                read_cursor.close()
+                write_cursor.close()
+        return updated
 
     def insert_disaster(self, disaster_data: Dict[str, Any]) -> bool:
         query = """
@@ -180,12 +476,17 @@ class DisasterManager:
             (type, location, severity, date, description, source)
             VALUES (%s, %s, %s, %s, %s, %s)
         """
-        return self._execute_query(
+        written = self._write_disaster(
             query,
             (disaster_data['type'], disaster_data['location'],
              disaster_data['severity'], disaster_data['date'],
-             disaster_data['description'], disaster_data['source'])
+             disaster_data['description'], disaster_data['source']),
+            new_row=disaster_data
         )
+        if written is None:
+            return False
+        dashboard_cache.record_insert(dict(disaster_data, id=written[0]))
+        return True
 
     def get_all_disasters(self) -> List[tuple]:
         query = "SELECT * FROM disasters"
@@ -203,55 +504,107 @@ class DisasterManager:
                 date = %s, description = %s, source = %s
             WHERE id = %s
         """
-        return self._execute_query(
+        written = self._write_disaster(
             query,
             (disaster_data['type'], disaster_data['location'],
              disaster_data['severity'], disaster_data['date'],
              disaster_data['description'], disaster_data['source'],
-             disaster_id)
+             disaster_id),
+            disaster_id=disaster_id,
+            new_row=disaster_data
         )
+        if written is None:
+            return False
+        dashboard_cache.record_update(disaster_id, written[1], disaster_data)
+        return True
 
     def delete_disaster(self, disaster_id: int) -> bool:
         query = "DELETE FROM disasters WHERE id = %s"
-        return self._execute_query(query, (disaster_id,))
-
-    def _execute_query(self, query: str, params: tuple = None) -> bool:
-        connection = self.get_connection()
-        cursor = connection.cursor()
-        try:
-            cursor.execute(query, params)
-            connection.commit()
-            return True
-        except mysql.connector.Error as err:
-            self.logger.error(f'Error executing query: {err}')
-            connection.rollback()
+        written = self._write_disaster(query, (disaster_id,), disaster_id=disaster_id)
+        if written is None:
             return False
-        finally:
-            cursor.close()
+        dashboard_cache.record_delete(disaster_id, written[1])
+        return True
+
+    def _write_disaster(self, query: str, params: tuple, disaster_id: Optional[int] = None,
+                        new_row: Optional[Dict[str, Any]] = None
+                        ) -> Optional[Tuple[int, Optional[Dict[str, Any]]]]:
+        """Write one disaster row and adjust the trend rollups in the same transaction.
+
+        Returns the new id for inserts, or ``disaster_id`` and the row as it was
+        before the write for updates and deletes. Returns None when the write
+        failed or changed no row.
+        """
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                old_row = None
+                if disaster_id is not None:
+                    old_row = rollups.lock_row(cursor, disaster_id)
+                    if old_row is None:
+                        connection.rollback()
+                        return None
+                cursor.execute(query, params)
+                if cursor.rowcount == 0:
+                    connection.rollback()
+                    return None
+                if old_row is not None:
+                    rollups.record(cursor, [old_row], -1)
+                if new_row is not None:
+                    rollups.record(cursor, [new_row])
+                connection.commit()
+                if disaster_id is None:
+                    return cursor.lastrowid, None
+                return disaster_id, old_row
+            except mysql.connector.Error as err:
+                self.logger.error(f'Error writing disaster: {err}')
+                connection.rollback()
+                return None
+            finally:
+                cursor.close()
 
     def _fetch_all(self, query: str, params: tuple = None) -> List[tuple]:
-        connection = self.get_connection()
-        cursor = connection.cursor()
-        try:
-            cursor.execute(query, params)
-            return cursor.fetchall()
-        except mysql.connector.Error as err:
-            self.logger.error(f'Error fetching data: {err}')
-            return []
-        finally:
-            cursor.close()
+        with self.pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            except mysql.connector.Error as err:
+                self.logger.error(f'Error fetching data: {err}')
+                return []
+            finally:
+                cursor.close()
 
     def close(self):
-        if self.connection:
-            self.connection.close()
-            self.logger.info('Database connection closed')
+        self.pool.close_idle()
+        self.logger.info('Database connections closed')
 
+@profiling.profile_cli('disaster_manager')
 def main():
+    parser = argparse.ArgumentParser(description='Train the severity model and label new disasters')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--incremental', action='store_true',
+                      help='update the online model with rows added since the last checkpoint')
+    mode.add_argument('--streaming', action='store_true',
+                      help='retrain from scratch, streaming rows in chunks and fitting on all cores')
+    parser.add_argument('--activate', action='store_true',
+                        help='with --incremental, serve the updated online model')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--max-samples', type=int,
+                        help='rows drawn per tree with --streaming, bounding the model size')
+    args = parser.parse_args()
+
     manager = DisasterManager()
     
 
     print("Training severity prediction model...")
-    if manager.train():
+    if args.incremental:
+        trained = manager.train_incremental(activate=args.activate)
+    elif args.streaming:
+        trained = manager.train_streaming(args.chunk_size, max_samples=args.max_samples)
+    else:
+        trained = manager.train()
+    if trained and manager.registry.current_version() is not None:
         print("\nUpdating database with severity predictions...")
         manager.update_database_severities()
         print("Done!")
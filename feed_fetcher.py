@@ -0,0 +1,148 @@
+from concurrent.futures import ProcessPoolExecutor
+from http.client import HTTPException
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
+import asyncio
+import gzip
+import json
+import os
+import threading
+import time
+import feedparser
+
+ENTRY_FIELDS = ('title', 'description', 'link', 'published')
+
+
+def parse_feed(body):
+    """Parse a feed body into plain entry dicts (runs in a worker process)"""
+    feed = feedparser.parse(body)
+    return [{field: entry.get(field, '') for field in ENTRY_FIELDS} for entry in feed.entries]
+
+
+class FeedResult:
+    def __init__(self, url):
+        self.url = url
+        self.status = None
+        self.entries = []
+        self.error = None
+        self.fetch_seconds = 0.0
+        self.parse_seconds = 0.0
+
+    @property
+    def not_modified(self):
+        return self.status == 304
+
+    def __repr__(self):
+        return (f"FeedResult({self.url!r}, status={self.status}, entries={len(self.entries)}, "
+                f"fetch={self.fetch_seconds:.2f}s, parse={self.parse_seconds:.2f}s)")
+
+
+class FeedFetcher:
+    """Fetch RSS feeds concurrently with conditional GETs.
+
+    ETag/Last-Modified validators are kept in ``state_path`` between runs,
+    so unchanged feeds cost a 304 instead of a full download. At most
+    ``per_host_limit`` requests run against one host at a time, and bodies
+    are parsed in a pool of ``workers`` processes.
+    """
+
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+    def __init__(self, feeds, state_path='feed_state.json', per_host_limit=2,
+                 timeout=20.0, workers=None):
+        self.feeds = list(feeds)
+        self.state_path = state_path
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.state = self.load_state()
+        self._state_lock = threading.Lock()
+
+    def load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self):
+        tmp_path = f'{self.state_path}.tmp'
+        with self._state_lock, open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _remember(self, url, headers):
+        with self._state_lock:
+            self.state[url] = {
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+            }
+
+    def _download(self, url):
+        headers = {'User-Agent': self.USER_AGENT, 'Accept-Encoding': 'gzip'}
+        validators = self.state.get(url, {})
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        try:
+            with urlopen(Request(url, headers=headers), timeout=self.timeout) as response:
+                body = response.read()
+                if response.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                return response.status, response.headers, body
+        except HTTPError as e:
+            if e.code == 304:
+                return 304, e.headers, None
+            raise
+
+    async def _fetch(self, url, host_limits, pool):
+        result = FeedResult(url)
+        limit = host_limits.setdefault(urlparse(url).netloc, asyncio.Semaphore(self.per_host_limit))
+        started = time.perf_counter()
+        try:
+            async with limit:
+                status, headers, body = await asyncio.to_thread(self._download, url)
+            result.status = status
+            result.fetch_seconds = time.perf_counter() - started
+            if status == 304:
+                return result
+            self._remember(url, headers)
+            started = time.perf_counter()
+            result.entries = await asyncio.get_running_loop().run_in_executor(pool, parse_feed, body)
+            result.parse_seconds = time.perf_counter() - started
+        except (HTTPError, URLError, HTTPException, OSError, ValueError) as e:
+            result.status = getattr(e, 'code', None)
+            result.error = str(e)
+            result.fetch_seconds = time.perf_counter() - started
+        return result
+
+    def fetch_one(self, url):
+        """Fetch and parse one feed in the calling thread, keeping its validators"""
+        result = FeedResult(url)
+        started = time.perf_counter()
+        try:
+            result.status, headers, body = self._download(url)
+            result.fetch_seconds = time.perf_counter() - started
+            if result.status == 304:
+                return result
+            self._remember(url, headers)
+            started = time.perf_counter()
+            result.entries = parse_feed(body)
+            result.parse_seconds = time.perf_counter() - started
+        except (HTTPError, URLError, HTTPException, OSError, ValueError) as e:
+            result.status = getattr(e, 'code', None)
+            result.error = str(e)
+            result.fetch_seconds = time.perf_counter() - started
+        return result
+
+    async def collect(self):
+        host_limits = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            results = await asyncio.gather(*(self._fetch(url, host_limits, pool) for url in self.feeds))
+        self.save_state()
+        return results
+
+    def run(self):
+        return asyncio.run(self.collect())
@@ -0,0 +1,199 @@
+import logging
+import math
+import threading
+import numpy as np
+
+
+class GeoIndex:
+    """In-process grid index of geocoded disasters for map viewports.
+
+    Every zoom level up to ``max_cluster_zoom`` has a grid of square cells,
+    ``cells_per_tile`` to a side of a 256px map tile, and a pre-aggregated
+    table (cell key, count, summed coordinates, smallest id) sorted by key.
+    A viewport query turns its bounding box into one key range per grid row
+    and reads them with ``searchsorted``, so the cost depends on the cells
+    on screen, not on how many points the table holds. Above
+    ``max_cluster_zoom`` individual points are returned from the finest grid.
+    A response holds at most ``max_points`` points or clusters; wider views
+    are answered from coarser grids.
+
+    New points are buffered and folded into the tables once
+    ``merge_threshold`` of them have accumulated; removals mark the tables
+    for a rebuild on the next query.
+    """
+
+    def __init__(self, max_cluster_zoom: int = 12, cells_per_tile: int = 4,
+                 merge_threshold: int = 5000, max_points: int = 2000):
+        self.max_cluster_zoom = max_cluster_zoom
+        self.cells_per_tile = cells_per_tile
+        self.merge_threshold = merge_threshold
+        self.max_points = max_points
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._points = {}
+        self._pending = []
+        self._dirty = False
+        self._levels = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lats = np.empty(0)
+        self._lons = np.empty(0)
+        self._fine_keys = np.empty(0, dtype=np.int64)
+        self._labels = []
+
+    def __len__(self):
+        return len(self._points)
+
+    def cell_size(self, zoom):
+        return 360.0 / (2 ** zoom * self.cells_per_tile)
+
+    def _columns(self, size):
+        return int(math.ceil(360.0 / size)) + 1
+
+    def _keys(self, lats, lons, zoom):
+        size = self.cell_size(zoom)
+        rows = np.floor((lats + 90.0) / size).astype(np.int64)
+        cols = np.floor((lons + 180.0) / size).astype(np.int64)
+        return rows * self._columns(size) + cols
+
+    @staticmethod
+    def valid(lat, lon):
+        try:
+            return -90.0 <= float(lat) <= 90.0 and -180.0 <= float(lon) <= 180.0
+        except (TypeError, ValueError):
+            return False
+
+    def add(self, point_id, lat, lon, label=None):
+        """Index a point, replacing any earlier position for ``point_id``"""
+        if not self.valid(lat, lon):
+            self.remove(point_id)
+            return False
+        with self._lock:
+            if point_id in self._points:
+                self._dirty = True
+            else:
+                self._pending.append(point_id)
+            self._points[point_id] = (float(lat), float(lon), label)
+            return True
+
+    def add_many(self, rows):
+        """Bulk-load (id, lat, lon, label) rows and rebuild the tables once"""
+        with self._lock:
+            for point_id, lat, lon, label in rows:
+                if self.valid(lat, lon):
+                    self._points[point_id] = (float(lat), float(lon), label)
+            self._dirty = True
+
+    def remove(self, point_id):
+        with self._lock:
+            if self._points.pop(point_id, None) is not None:
+                self._dirty = True
+
+    def _rebuild(self):
+        ids = np.fromiter(self._points, dtype=np.int64, count=len(self._points))
+        coords = np.array([self._points[i][:2] for i in ids.tolist()], dtype=float).reshape(-1, 2)
+        self._ids, self._lats, self._lons = ids, coords[:, 0], coords[:, 1]
+        self._labels = [self._points[i][2] for i in ids.tolist()]
+        for zoom in range(self.max_cluster_zoom + 1):
+            keys = self._keys(self._lats, self._lons, zoom)
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+            boundaries = np.ones(len(sorted_keys), dtype=bool)
+            boundaries[1:] = sorted_keys[1:] != sorted_keys[:-1]
+            starts = np.flatnonzero(boundaries)
+            self._levels[zoom] = (
+                sorted_keys[starts],
+                np.diff(np.r_[starts, len(order)]),
+                np.add.reduceat(self._lats[order], starts) if len(order) else np.empty(0),
+                np.add.reduceat(self._lons[order], starts) if len(order) else np.empty(0),
+                np.minimum.reduceat(self._ids[order], starts) if len(order) else np.empty(0, dtype=np.int64),
+            )
+            if zoom == self.max_cluster_zoom:
+                self._fine_order, self._fine_keys = order, sorted_keys
+        self._pending = []
+        self._dirty = False
+        self.logger.info(f'Geo index rebuilt with {len(ids)} points')
+
+    def _ensure_fresh(self):
+        if self._dirty or len(self._pending) >= self.merge_threshold or not self._levels:
+            self._rebuild()
+
+    def _ranges(self, keys, west, south, east, north, zoom):
+        """Index ranges of ``keys`` (sorted) that fall inside the bounding box"""
+        size = self.cell_size(zoom)
+        columns = self._columns(size)
+        rows = np.arange(int((south + 90.0) // size), int((north + 90.0) // size) + 1, dtype=np.int64)
+        spans = ([(west, east)] if west <= east else [(west, 180.0), (-180.0, east)])
+        lows, highs = [], []
+        for span_west, span_east in spans:
+            first = int((span_west + 180.0) // size)
+            last = int((span_east + 180.0) // size)
+            lows.append(np.searchsorted(keys, rows * columns + first, 'left'))
+            highs.append(np.searchsorted(keys, rows * columns + last, 'right'))
+        lows, highs = np.concatenate(lows), np.concatenate(highs)
+        keep = highs > lows
+        if not keep.any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(lo, hi) for lo, hi in zip(lows[keep], highs[keep])])
+
+    def _pending_in(self, west, south, east, north):
+        found = []
+        for point_id in self._pending:
+            lat, lon, label = self._points[point_id]
+            inside_lon = west <= lon <= east if west <= east else (lon >= west or lon <= east)
+            if south <= lat <= north and inside_lon:
+                found.append((point_id, lat, lon, label))
+        return found
+
+    def query(self, west, south, east, north, zoom):
+        """Clusters (or points, when zoomed in far enough) inside the bounding box"""
+        zoom = max(0, int(zoom))
+        south, north = max(south, -90.0), min(north, 90.0)
+        west, east = max(west, -180.0), min(east, 180.0)
+        with self._lock:
+            self._ensure_fresh()
+            pending = self._pending_in(west, south, east, north)
+            if zoom > self.max_cluster_zoom:
+                picked = self._fine_order[self._ranges(self._fine_keys, west, south, east, north,
+                                                       self.max_cluster_zoom)]
+                lons = self._lons[picked]
+                inside = (self._lats[picked] >= south) & (self._lats[picked] <= north)
+                inside &= ((lons >= west) & (lons <= east)) if west <= east else ((lons >= west) | (lons <= east))
+                picked = picked[inside]
+                if len(picked) + len(pending) <= self.max_points:
+                    points = [{'id': int(self._ids[i]), 'lat': float(self._lats[i]),
+                               'lon': float(self._lons[i]), 'label': self._labels[i]}
+                              for i in picked.tolist()]
+                    points.extend({'id': point_id, 'lat': lat, 'lon': lon, 'label': label}
+                                  for point_id, lat, lon, label in pending)
+                    return {'zoom': zoom, 'clusters': [], 'points': points}
+                zoom = self.max_cluster_zoom
+
+            # A wide viewport at a high zoom can hold a cell per point; coarsen until it fits.
+            while True:
+                keys, counts, lat_sums, lon_sums, min_ids = self._levels[zoom]
+                picked = self._ranges(keys, west, south, east, north, zoom)
+                if zoom == 0 or len(picked) + len(pending) <= self.max_points:
+                    break
+                zoom -= 1
+            clusters = {}
+            for i in picked.tolist():
+                clusters[int(keys[i])] = [int(counts[i]), float(lat_sums[i]), float(lon_sums[i]), int(min_ids[i])]
+            if pending:
+                pending_keys = self._keys(np.array([p[1] for p in pending]),
+                                          np.array([p[2] for p in pending]), zoom)
+                for key, (point_id, lat, lon, _) in zip(pending_keys.tolist(), pending):
+                    cluster = clusters.setdefault(key, [0, 0.0, 0.0, point_id])
+                    cluster[0] += 1
+                    cluster[1] += lat
+                    cluster[2] += lon
+                    cluster[3] = min(cluster[3], point_id)
+            return {
+                'zoom': zoom,
+                'clusters': [{'lat': lat_sum / count, 'lon': lon_sum / count, 'count': count,
+                              'id': min_id if count == 1 else None}
+                             for count, lat_sum, lon_sum, min_id in clusters.values()],
+                'points': [],
+            }
+
+
+geo_index = GeoIndex()
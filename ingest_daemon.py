@@ -0,0 +1,246 @@
+"""Resident news ingest daemon.
+
+One Twisted reactor runs for the life of the process: the scrapy spiders
+are started through a ``CrawlerRunner`` and the RSS feeds are fetched in
+the reactor's thread pool, each source on its own schedule. A source that
+keeps returning new items is polled more often, one that does not is
+polled less often, and failures back off exponentially. At most
+``--max-concurrent`` sources run at once.
+
+Run from the repository root: python ingest_daemon.py [--max-concurrent 3]
+"""
+import argparse
+import logging
+import os
+import random
+import time
+
+from scrapy import signals
+from scrapy.crawler import CrawlerRunner
+from scrapy.utils.log import configure_logging
+from scrapy.utils.reactor import install_reactor
+from twisted.internet import defer, task, threads
+
+from feed_fetcher import FeedFetcher
+import metrics
+from news_scraper import RSS_FEEDS, NDMASpider, NewsCollector, NewsWebSpider, RSSFeedSpider, count_scraped_item
+import pipelines
+from seen_urls import seen_urls
+
+SCRAPY_SETTINGS = {
+    'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'ROBOTSTXT_OBEY': True,
+    'CONCURRENT_REQUESTS': 8,
+    'DOWNLOAD_DELAY': 1,
+    'COOKIES_ENABLED': False,
+    'ITEM_PIPELINES': {'pipelines.DatabaseWriterPipeline': 300},
+    'DOWNLOADER_MIDDLEWARES': {'seen_urls.SeenUrlMiddleware': 50},
+    'LOG_LEVEL': 'INFO',
+    'TWISTED_REACTOR': 'twisted.internet.asyncioreactor.AsyncioSelectorReactor',
+}
+# (initial, min, max) poll interval in seconds
+FEED_INTERVALS = (300, 60, 3600)
+SPIDER_INTERVALS = (1800, 600, 6 * 3600)
+# Saving rewrites the whole seen-URL file, so it is done less often than flushing.
+SEEN_URLS_SAVE_INTERVAL = 300
+
+SOURCE_RUNS = metrics.registry.counter(
+    'rtdms_ingest_source_runs_total', 'Scheduled source runs, by outcome', ('source', 'result'))
+SOURCE_RUN_SECONDS = metrics.registry.histogram(
+    'rtdms_ingest_source_run_duration_seconds', 'Time taken by each source run', ('source',),
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800))
+LOOP_ERRORS = metrics.registry.counter(
+    'rtdms_ingest_loop_errors_total', 'Failed runs of the daemon\'s periodic tasks', ('loop',))
+
+
+class SourceFailed(Exception):
+    pass
+
+
+class Source:
+    """One feed or spider with an adaptive poll interval.
+
+    ``run()`` returns a Deferred firing with the URLs of the items seen,
+    or None when the source reported that nothing changed.
+    """
+
+    def __init__(self, name, run, intervals):
+        self.name = name
+        self.run = run
+        self.interval, self.min_interval, self.max_interval = intervals
+        self.failures = 0
+        self.next_run = 0.0
+        self.running = False
+        self.last_urls = None
+
+    def succeeded(self, urls, now):
+        self.failures = 0
+        if urls is None:
+            changed = False
+        else:
+            # The first run has nothing to compare against.
+            changed = self.last_urls is not None and bool(urls - self.last_urls)
+            self.last_urls = urls
+        if changed:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * 1.5)
+        self._schedule(now, self.interval)
+        return changed
+
+    def failed(self, now):
+        self.failures += 1
+        self._schedule(now, min(self.max_interval, self.interval * 2 ** self.failures))
+
+    def _schedule(self, now, delay):
+        # Jitter keeps sources that started together from staying in lockstep.
+        self.next_run = now + delay * random.uniform(0.9, 1.1)
+
+
+class CrawlWatch:
+    """Collects the URLs of the items one crawl produced"""
+
+    def __init__(self):
+        self.urls = set()
+
+    def item_scraped(self, item, response, spider):
+        self.urls.add(item.get('url') or response.url)
+
+
+class IngestDaemon:
+    def __init__(self, collector, max_concurrent=3, tick=1.0, feeds=None, spiders=None):
+        self.logger = logging.getLogger(__name__)
+        self.collector = collector
+        # Spider items reach the collector through the pipeline's writer thread.
+        pipelines.use_collector(collector)
+        self.max_concurrent = max_concurrent
+        self.tick = tick
+        self.running = 0
+        self.fetcher = FeedFetcher(feeds or RSS_FEEDS)
+        self.runner = CrawlerRunner(SCRAPY_SETTINGS)
+        self.sources = []
+        for url in self.fetcher.feeds:
+            self.sources.append(Source(f'feed:{url}', lambda url=url: self.fetch_feed(url), FEED_INTERVALS))
+        for spider_cls in spiders or (RSSFeedSpider, NewsWebSpider, NDMASpider):
+            self.sources.append(Source(f'spider:{spider_cls.name}', lambda cls=spider_cls: self.crawl(cls),
+                                       SPIDER_INTERVALS))
+        self._loops = []
+        metrics.registry.callback('rtdms_ingest_source_interval_seconds', 'Current poll interval per source',
+                                  'gauge', lambda: {(s.name,): s.interval for s in self.sources}, ('source',))
+
+    def fetch_feed(self, url):
+        return threads.deferToThread(self._fetch_and_store, url)
+
+    def _fetch_and_store(self, url):
+        # Runs in the reactor's thread pool; the collector serializes writers itself.
+        result = self.fetcher.fetch_one(url)
+        if not self.collector.store_feed_result(result):
+            raise SourceFailed(result.error)
+        if result.not_modified:
+            return None
+        return {entry['link'] for entry in result.entries}
+
+    @defer.inlineCallbacks
+    def crawl(self, spider_cls):
+        watch = CrawlWatch()
+        crawler = self.runner.create_crawler(spider_cls)
+        crawler.signals.connect(watch.item_scraped, signal=signals.item_scraped, weak=False)
+        crawler.signals.connect(count_scraped_item, signal=signals.item_scraped)
+        yield self.runner.crawl(crawler)
+        stats = crawler.stats.get_stats()
+        if stats.get('finish_reason') != 'finished' or not stats.get('response_received_count'):
+            raise SourceFailed(f"finish_reason={stats.get('finish_reason')}, "
+                               f"responses={stats.get('response_received_count', 0)}")
+        return watch.urls
+
+    def schedule(self):
+        """Start the sources that are due, oldest first, within the concurrency budget"""
+        now = time.monotonic()
+        due = sorted((s for s in self.sources if not s.running and s.next_run <= now),
+                     key=lambda s: s.next_run)
+        for source in due[:max(self.max_concurrent - self.running, 0)]:
+            self.start(source)
+
+    def start(self, source):
+        source.running = True
+        self.running += 1
+        started = time.monotonic()
+
+        def succeeded(urls):
+            changed = source.succeeded(urls, time.monotonic())
+            SOURCE_RUNS.inc(source.name, 'changed' if changed else 'unchanged')
+            self.logger.info(f'{source.name}: {"new items" if changed else "no change"}, '
+                             f'next run in {source.interval:.0f}s')
+
+        def failed(failure):
+            source.failed(time.monotonic())
+            SOURCE_RUNS.inc(source.name, 'error')
+            self.logger.warning(f'{source.name} failed ({failure.getErrorMessage()}), '
+                                f'retrying in {source.next_run - time.monotonic():.0f}s')
+
+        def finished(_):
+            source.running = False
+            self.running -= 1
+            SOURCE_RUN_SECONDS.observe(time.monotonic() - started, source.name)
+
+        d = defer.maybeDeferred(source.run)
+        d.addCallbacks(succeeded, failed)
+        d.addBoth(finished)
+        return d
+
+    def start_loops(self, reactor):
+        for name, interval, fn in (('schedule', self.tick, self.schedule),
+                                   ('flush', self.collector.flush_interval, self.flush),
+                                   ('save_seen_urls', SEEN_URLS_SAVE_INTERVAL,
+                                    lambda: threads.deferToThread(seen_urls.save))):
+            loop = task.LoopingCall(self._guarded, name, fn)
+            loop.clock = reactor
+            loop.start(interval)
+            self._loops.append(loop)
+        reactor.addSystemEventTrigger('before', 'shutdown', self.stop)
+
+    def _guarded(self, name, fn):
+        # A LoopingCall stops for good once a run fails, so failures are logged and swallowed.
+        def failed(failure):
+            LOOP_ERRORS.inc(name)
+            self.logger.error(f'{name} failed: {failure.getErrorMessage()}')
+
+        return defer.maybeDeferred(fn).addErrback(failed)
+
+    def flush(self):
+        # Items from slow trickles would otherwise wait for the next batch to fill up.
+        return threads.deferToThread(self._flush)
+
+    def _flush(self):
+        self.collector.flush()
+        self.fetcher.save_state()
+
+    @defer.inlineCallbacks
+    def stop(self):
+        self.logger.info('Stopping ingest daemon')
+        for loop in self._loops:
+            if loop.running:
+                loop.stop()
+        yield self.runner.stop()
+        self.fetcher.save_state()
+        self.collector.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-concurrent', type=int, default=3, help='sources allowed to run at the same time')
+    args = parser.parse_args()
+
+    configure_logging(SCRAPY_SETTINGS)
+    install_reactor(SCRAPY_SETTINGS['TWISTED_REACTOR'])
+    from twisted.internet import reactor
+
+    if os.environ.get('RTDMS_METRICS_PORT'):
+        metrics.serve(int(os.environ['RTDMS_METRICS_PORT']))
+    daemon = IngestDaemon(NewsCollector(), max_concurrent=args.max_concurrent)
+    daemon.start_loops(reactor)
+    reactor.run()
+
+
+if __name__ == '__main__':
+    main()
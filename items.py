@@ -0,0 +1,22 @@
+import scrapy
+
+
+class NewsItem(scrapy.Item):
+    title = scrapy.Field()
+    content = scrapy.Field()
+    url = scrapy.Field()
+    source = scrapy.Field()
+    published_date = scrapy.Field()
+    location = scrapy.Field()
+
+
+class DisasterItem(scrapy.Item):
+    type = scrapy.Field()
+    location = scrapy.Field()
+    severity = scrapy.Field()
+    date = scrapy.Field()
+    description = scrapy.Field()
+    source = scrapy.Field()
+    url = scrapy.Field()
+    latitude = scrapy.Field()
+    longitude = scrapy.Field()
@@ -0,0 +1,152 @@
+import re
+
+# Every ASCII character that is not a regex word character, mapped to a space.
+WORD_BREAKS = str.maketrans({char: ' ' for char in map(chr, range(128)) if not (char.isalnum() or char == '_')})
+WORD_EDGES = re.compile(r'\w(?:.*\w)?', re.S)
+
+
+class KeywordMatches:
+    """Result of one scan: (start, table, label) hits in text order"""
+
+    def __init__(self, hits, priorities):
+        self.hits = hits
+        self._priorities = priorities
+
+    def labels(self, table, start=0):
+        """Distinct labels of ``table`` in the order they first occur"""
+        seen = []
+        for position, hit_table, label in self.hits:
+            if hit_table == table and position >= start and label not in seen:
+                seen.append(label)
+        return seen
+
+    def best(self, table, start=0):
+        """The found label that comes first in the table definition, if any"""
+        found = self.labels(table, start)
+        if not found:
+            return None
+        return min(found, key=self._priorities[table].index)
+
+
+def trie_pattern(terms):
+    """Regex alternation of ``terms`` factored by common prefix.
+
+    The regex engine tries alternatives one by one, so sharing prefixes keeps
+    the work at each word start close to one branch per character.
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if '' in node else group
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Match several keyword tables against a text in a single regex pass.
+
+    Each table maps a label to its terms. Terms match case-insensitively at
+    a word start unless the table is ``case_sensitive``; with
+    ``allow_suffix`` a term also matches longer words (``flood`` in
+    ``flooding``), otherwise it must be a whole word.
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._priorities = {}
+        self._pattern = None
+
+    def add_table(self, name, mapping, allow_suffix=False, case_sensitive=False):
+        self._priorities[name] = list(mapping)
+        for label, terms in mapping.items():
+            for term in terms:
+                self._entries.append((term.lower(), name, label, allow_suffix, term if case_sensitive else None))
+        self._pattern = None
+        return self
+
+    def compile(self):
+        terms = sorted({entry[0] for entry in self._entries})
+        # Optional tails are greedy, so a phrase wins over its own prefix.
+        self._pattern = re.compile(r'\b(' + trie_pattern(terms) + r')(\w*)')
+        # Testing \b at every character is most of the cost of a scan. With every non-word
+        # character turned into a space, re finds the word starts with a fast search for a
+        # literal space instead (see _occurrences).
+        spaced = {term.translate(WORD_BREAKS): term for term in terms}
+        self._spaced = None
+        if len(spaced) == len(terms) and all(term.isascii() and WORD_EDGES.fullmatch(term) for term in terms):
+            self._spaced = re.compile(r' (' + trie_pattern(spaced) + r')(\w*)')
+            self._unspaced = spaced
+        self._exact = {term: [] for term in terms}
+        self._suffixed = {term: [] for term in terms}
+        for term in terms:
+            for keyword, table, label, allow_suffix, case in self._entries:
+                if not term.startswith(keyword):
+                    continue
+                hit = (table, label, case)
+                if keyword == term:
+                    self._exact[term].append(hit)
+                    if allow_suffix:
+                        self._suffixed[term].append(hit)
+                elif allow_suffix or not term[len(keyword)].isalnum():
+                    # A shorter keyword swallowed by a longer alternative still counts.
+                    self._exact[term].append(hit)
+                    self._suffixed[term].append(hit)
+            self._exact[term] = list(dict.fromkeys(self._exact[term]))
+            self._suffixed[term] = list(dict.fromkeys(self._suffixed[term]))
+        return self
+
+    def _occurrences(self, text):
+        """(start, term, suffix) for each match of the pattern in ``text``"""
+        lowered = text.lower()
+        if self._spaced is None:
+            return [(match.start(), *match.groups()) for match in self._pattern.finditer(lowered)]
+        # Non-ASCII characters become one '?' each, so offsets are kept and every word start
+        # follows a space. The leading space lets a term at index 0 match and shifts offsets
+        # by one: a match's leading space sits at the term's index in ``lowered``.
+        if not lowered.isascii():
+            lowered_ascii = lowered.encode('ascii', 'replace').decode('ascii')
+        else:
+            lowered_ascii = lowered
+        spaced = ' ' + lowered_ascii.translate(WORD_BREAKS)
+        found, position = [], 0
+        while True:
+            match = self._spaced.search(spaced, position)
+            if match is None:
+                return found
+            start, end = match.start(), match.end() - 1
+            term = self._unspaced[match.group(1)]
+            if (lowered.startswith(term, start) and (start == 0 or lowered[start - 1].isascii())
+                    and (end == len(lowered) or lowered[end].isascii())):
+                found.append((start, term, match.group(2)))
+                position = match.end()
+                continue
+            # Matched across punctuation (``tamil-nadu``) or next to a non-ASCII character,
+            # which may be a letter; take what \b finds there.
+            match = self._pattern.match(lowered, start)
+            if match is None:
+                position = start + 1
+            else:
+                found.append((start, *match.groups()))
+                position = match.end()
+
+    def scan(self, text):
+        if self._pattern is None:
+            self.compile()
+        hits = []
+        if text:
+            for start, term, suffix in self._occurrences(text):
+                for table, label, case in (self._suffixed if suffix else self._exact)[term]:
+                    if case is None or text.startswith(case, start):
+                        hits.append((start, table, label))
+        return KeywordMatches(hits, self._priorities)
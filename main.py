@@ -1,53 +1,198 @@
-from flask import Flask, render_template, jsonify, request, redirect, url_for, session
+from flask import Flask, render_template, jsonify, request, redirect, url_for, session, Response, stream_with_context, g
 from flask_cors import CORS
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import deque
+from concurrent.futures import wait as wait_futures
 import logging
 import mysql.connector
 import hashlib
+import hmac
+import base64
+import json
+import math
+import os
+import random
+import threading
+import time
+from dashboard_cache import dashboard_cache
+from change_feed import change_feed
+from snapshots import snapshot_cache
+from search_index import search_index
+from geo_index import geo_index
+from db_pool import get_pool
+from disaster_manager import DisasterManager
+from micro_batcher import MicroBatcher, BatcherBusy
+import rollups
+import metrics
+import profiling
 
 app = Flask(__name__, template_folder='.', static_folder='.')
 app.secret_key = 'your-secret-key-here'  
 CORS(app)
 
+REQUEST_SECONDS = metrics.registry.histogram(
+    'rtdms_http_request_duration_seconds', 'Time to build each response, by route',
+    ('route', 'method', 'status'))
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def observe_request(response):
+    started = g.get('request_started')
+    if started is not None:
+        # The rule template ('/api/map'), not the path, keeps the series bounded.
+        # Streamed responses (/api/stream) are timed up to their first byte.
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route, request.method, response.status_code)
+    return response
+
+# Profiling is opt-in: an X-Profile header or ?profile= flag from a user listed in
+# RTDMS_PROFILE_USERS (or carrying RTDMS_PROFILE_TOKEN), or a random sample of requests.
+PROFILE_USERS = {user.strip() for user in os.environ.get('RTDMS_PROFILE_USERS', '').split(',') if user.strip()}
+PROFILE_TOKEN = os.environ.get('RTDMS_PROFILE_TOKEN')
+PROFILE_SAMPLE_RATE = float(os.environ.get('RTDMS_PROFILE_SAMPLE_RATE', 0))
+
+def profile_requested():
+    flag = request.headers.get('X-Profile') or request.args.get('profile')
+    if flag:
+        if PROFILE_TOKEN and hmac.compare_digest(flag.encode(), PROFILE_TOKEN.encode()):
+            return True
+        return session.get('username') in PROFILE_USERS
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+@app.before_request
+def start_profile():
+    if profile_requested():
+        profiler = profiling.Profiler(f'{request.method} {request.endpoint or request.path}')
+        if profiler.start():
+            g.profiler = profiler
+
+@app.after_request
+def finish_profile(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        base = profiler.stop()
+        if base:
+            response.headers['X-Profile-Id'] = os.path.basename(base)
+    return response
+
+@app.teardown_request
+def abandon_profile(exc):
+    # Views that raise skip after_request; still write what was captured.
+    profiler = g.pop('profiler', None)
+    if profiler is not None and profiler.running:
+        profiler.stop()
+
 class DisasterDashboard:
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 500
+    FILTER_COLUMNS = ('type', 'severity', 'location')
+    MAX_SEARCH_RESULTS = 100
+    MAX_MAP_ZOOM = 22
+    TREND_WINDOWS = {'24h': timedelta(hours=24), '7d': timedelta(days=7), '30d': timedelta(days=30)}
+    MAX_TREND_BUCKETS = 2000
+
     def __init__(self):
         self.setup_logging()
         self.setup_database()
+        self.cache = dashboard_cache
+        self.cache.set_loader(self.load_aggregates)
+        self.last_seen_id = None
+        self.recent_insert_ids = deque(maxlen=1000)
+        self.cache.add_listener(self.track_insert)
+        self.cache.add_listener(change_feed.publish)
+        change_feed.set_summary_provider(self.get_dashboard_data)
+        change_feed.set_poller(self.poll_new_disasters)
+        self.setup_search()
+        self.setup_map()
     
     def setup_database(self):
         try:
-            self.db = mysql.connector.connect(
-                host="localhost",
-                user="root",
-                password="root",
-                database="disaster"
-            )
-            self.logger.info('Database connected successfully')
+            self.pool = get_pool()
+            with self.pool.connection():
+                self.logger.info('Database connected successfully')
         except mysql.connector.Error as err:
             self.logger.error(f'Error connecting to database: {err}')
             raise
     
-    def get_connection(self):
-        if not self.db.is_connected():
-            self.db.reconnect()
-        return self.db
-    
-    def get_all_disasters(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    @staticmethod
+    def encode_cursor(date, disaster_id):
+        raw = json.dumps([str(date) if date is not None else None, disaster_id])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
         try:
-            cursor.execute("""
-                SELECT id, type, location, severity, 
-                       DATE_FORMAT(date, '%Y-%m-%d') as date, 
-                       description, source 
-                FROM disasters 
-                ORDER BY date DESC
-            """)
-            disasters = cursor.fetchall()
-            return disasters
-        finally:
-            cursor.close()
+            date, disaster_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return date, int(disaster_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f'Invalid cursor: {cursor}') from e
+
+    def build_filters(self, filters):
+        clauses, params = [], []
+        for column in self.FILTER_COLUMNS:
+            if filters.get(column):
+                clauses.append(f'{column} = %s')
+                params.append(filters[column])
+        if filters.get('date_from'):
+            clauses.append('date >= %s')
+            params.append(filters['date_from'].strftime('%Y-%m-%d'))
+        if filters.get('date_to'):
+            clauses.append('date < %s')
+            params.append((filters['date_to'] + timedelta(days=1)).strftime('%Y-%m-%d'))
+        return clauses, params
+
+    def get_disasters_page(self, limit=None, cursor=None, filters=None):
+        """Return one page of disasters ordered by (date, id) descending.
+
+        Pages are addressed with an opaque keyset cursor instead of an
+        offset, so fetching a late page costs the same as the first one.
+        """
+        limit = min(max(limit or self.PAGE_SIZE, 1), self.MAX_PAGE_SIZE)
+        clauses, params = self.build_filters(filters or {})
+        if cursor:
+            cursor_date, cursor_id = self.decode_cursor(cursor)
+            if cursor_date is None:
+                clauses.append('(date IS NULL AND id < %s)')
+                params.append(cursor_id)
+            else:
+                clauses.append('(date < %s OR (date = %s AND id < %s) OR date IS NULL)')
+                params.extend([cursor_date, cursor_date, cursor_id])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        params.append(limit + 1)
+
+        with self.pool.connection() as conn:
+            db_cursor = conn.cursor()
+            try:
+                db_cursor.execute(f"""
+                    SELECT id, type, location, severity,
+                           DATE_FORMAT(date, '%Y-%m-%d') as day,
+                           description, source, date
+                    FROM disasters
+                    {where}
+                    ORDER BY date DESC, id DESC
+                    LIMIT %s
+                """, tuple(params))
+                rows = db_cursor.fetchall()
+            finally:
+                db_cursor.close()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1][7], rows[-1][0])
+        disasters = [{
+            'id': row[0],
+            'type': row[1],
+            'location': row[2],
+            'severity': row[3],
+            'date': row[4],
+            'description': row[5],
+            'source': row[6]
+        } for row in rows]
+        return disasters, next_cursor
     
     def setup_logging(self):
         logging.basicConfig(
@@ -56,81 +201,262 @@ class DisasterDashboard:
         )
         self.logger = logging.getLogger(__name__)
     
+    def load_aggregates(self):
+        """Compute the dashboard counters with indexed GROUP BY/range queries."""
+        aggregates = {}
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                try:
+                    cursor.execute("SELECT COUNT(*), COALESCE(MAX(id), 0), MAX(updated_at) FROM disasters")
+                except mysql.connector.Error as err:
+                    # disasters.updated_at only exists once migration 4 has run.
+                    if err.errno != 1054:
+                        raise
+                    cursor.execute("SELECT COUNT(*), COALESCE(MAX(id), 0), NULL FROM disasters")
+                aggregates['total'], aggregates['max_id'], aggregates['changed_at'] = cursor.fetchone()
+                for key, column in (('severity_counts', 'severity'),
+                                    ('type_counts', 'type'),
+                                    ('location_counts', 'location')):
+                    cursor.execute(f"SELECT {column}, COUNT(*) FROM disasters GROUP BY {column}")
+                    aggregates[key] = cursor.fetchall()
+                # Older rows can never re-enter the 24h window, so only recent ones are kept.
+                cursor.execute("""
+                    SELECT date, COUNT(*) FROM disasters
+                    WHERE date > NOW() - INTERVAL 2 DAY
+                    GROUP BY date
+                """)
+                aggregates['date_counts'] = cursor.fetchall()
+            finally:
+                cursor.close()
+        return aggregates
+
     def get_dashboard_data(self):
-        disasters = self.get_all_disasters()
-        now = datetime.now()
-        last_24h = now - timedelta(days=1)
-        
-        formatted_disasters = []
-        severity_counts = defaultdict(int)
-        type_counts = defaultdict(int)
-        location_counts = defaultdict(int) 
-        
-        for disaster in disasters:
+        return self.cache.summary()
+
+    def track_insert(self, op, row):
+        if op == 'insert' and row.get('id') is not None:
+            self.recent_insert_ids.append(row['id'])
+
+    def poll_new_disasters(self):
+        """Feed rows inserted by other processes (e.g. the scrapers) into the cache."""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
             try:
-                formatted_disaster = {
-                    'id': disaster[0],
-                    'type': disaster[1],
-                    'location': disaster[2],
-                    'severity': disaster[3],
-                    'date': disaster[4],
-                    'description': disaster[5],
-                    'source': disaster[6]
-                }
-                
-                formatted_disasters.append(formatted_disaster)
-                severity_counts[disaster[3].lower() if disaster[3] else 'unknown'] += 1
-                type_counts[disaster[1]] += 1
-                location_counts[disaster[2]] += 1
-            except (ValueError, IndexError) as e:
-                self.logger.error(f'Error processing disaster data: {e}')
+                if self.last_seen_id is None:
+                    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM disasters")
+                    self.last_seen_id = cursor.fetchone()[0]
+                    return
+                cursor.execute("""
+                    SELECT id, type, location, severity,
+                           DATE_FORMAT(date, '%Y-%m-%d') as day,
+                           description, source, latitude, longitude
+                    FROM disasters
+                    WHERE id > %s
+                    ORDER BY id
+                    LIMIT 500
+                """, (self.last_seen_id,))
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+
+        for row in rows:
+            self.last_seen_id = max(self.last_seen_id, row[0])
+            if row[0] in self.recent_insert_ids:
                 continue
-        
-        top_locations = sorted(location_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        return {
-            'total_disasters': len(formatted_disasters),
-            'last_24h_disasters': sum(1 for d in formatted_disasters 
-                                    if d['date'] and datetime.strptime(d['date'], '%Y-%m-%d') > last_24h),
-            'severity_breakdown': dict(severity_counts),
-            'disaster_types': dict(type_counts),
-            'top_locations': dict(top_locations),
-            'disasters': formatted_disasters
-        }
+            self.cache.record_insert({
+                'id': row[0],
+                'type': row[1],
+                'location': row[2],
+                'severity': row[3],
+                'date': row[4],
+                'description': row[5],
+                'source': row[6],
+                'latitude': row[7],
+                'longitude': row[8]
+            })
+
+    def setup_search(self):
+        self.search = search_index
+        self.search.set_source('disaster', self.fetch_disasters_for_search)
+        self.search.set_source('news', self.fetch_news_for_search)
+        self.cache.add_listener(self.index_disaster_change)
+        # Build the index in the background; searches see partial results until it finishes.
+        threading.Thread(target=self.search.refresh, kwargs={'force': True},
+                         name='search-index-build', daemon=True).start()
+
+    @staticmethod
+    def disaster_search_text(row):
+        return ' '.join(value for value in (row.get('type'), row.get('location'),
+                                            row.get('description')) if value)
+
+    def index_disaster_change(self, op, row):
+        if op == 'delete':
+            self.search.remove('disaster', row['id'])
+        elif row.get('id') is not None:
+            self.search.add('disaster', row['id'], self.disaster_search_text(row),
+                            row.get('type'), row.get('date'))
+
+    def fetch_disasters_for_search(self, last_id, limit):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute("""
+                    SELECT id, type, location, date, description
+                    FROM disasters
+                    WHERE id > %s
+                    ORDER BY id
+                    LIMIT %s
+                """, (last_id, limit))
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        for row in rows:
+            row['text'] = self.disaster_search_text(row)
+        return rows
+
+    def fetch_news_for_search(self, last_id, limit):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute("""
+                    SELECT id, disaster_type AS type, collected_at AS date,
+                           CONCAT_WS(' ', title, title, cleaned_content) AS text
+                    FROM news_data
+                    WHERE id > %s
+                    ORDER BY id
+                    LIMIT %s
+                """, (last_id, limit))
+                return cursor.fetchall()
+            except mysql.connector.Error as err:
+                # news_data only exists once the news collector has run.
+                if err.errno == 1146:
+                    return []
+                raise
+            finally:
+                cursor.close()
+
+    def hydrate_search_results(self, results):
+        """Replace (source, id) hits with their rows, keeping the ranking order"""
+        ids = {'disaster': [], 'news': []}
+        for hit in results:
+            ids[hit['source']].append(hit['id'])
+        rows = {}
+        with self.pool.connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                if ids['disaster']:
+                    placeholders = ', '.join(['%s'] * len(ids['disaster']))
+                    cursor.execute(f"""
+                        SELECT id, type, location, severity,
+                               DATE_FORMAT(date, '%Y-%m-%d') as date,
+                               description, source
+                        FROM disasters WHERE id IN ({placeholders})
+                    """, ids['disaster'])
+                    rows.update((('disaster', row['id']), row) for row in cursor.fetchall())
+                if ids['news']:
+                    placeholders = ', '.join(['%s'] * len(ids['news']))
+                    cursor.execute(f"""
+                        SELECT id, title, url, source, location, disaster_type AS type,
+                               DATE_FORMAT(collected_at, '%Y-%m-%d') as date,
+                               LEFT(cleaned_content, 300) AS description
+                        FROM news_data WHERE id IN ({placeholders})
+                    """, ids['news'])
+                    rows.update((('news', row['id']), row) for row in cursor.fetchall())
+            finally:
+                cursor.close()
+        # Rows deleted by another process since they were indexed are dropped.
+        return [dict(rows[(hit['source'], hit['id'])], kind=hit['source'], score=round(hit['score'], 4))
+                for hit in results if (hit['source'], hit['id']) in rows]
+
+    def search_disasters(self, query, limit=20, offset=0, types=None, sources=None,
+                         date_from=None, date_to=None):
+        self.search.refresh()
+        limit = min(max(limit or 20, 1), self.MAX_SEARCH_RESULTS)
+        found = self.search.search(query, limit=limit, offset=offset, types=types,
+                                   sources=sources, date_from=date_from, date_to=date_to)
+        found['results'] = self.hydrate_search_results(found['results'])
+        return found
+
+    def setup_map(self):
+        self.geo = geo_index
+        self.cache.add_listener(self.index_disaster_location)
+        threading.Thread(target=self.load_map_points, name='geo-index-load', daemon=True).start()
+
+    def index_disaster_location(self, op, row):
+        if op == 'delete':
+            self.geo.remove(row['id'])
+        elif row.get('id') is not None and 'latitude' in row and 'longitude' in row:
+            self.geo.add(row['id'], row['latitude'], row['longitude'], row.get('type'))
+
+    def load_map_points(self, batch_size=10000):
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("""
+                    SELECT id, latitude, longitude, type
+                    FROM disasters
+                    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+                """)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    self.geo.add_many(rows)
+            except mysql.connector.Error as err:
+                self.logger.error(f'Error loading map points: {err}')
+            finally:
+                cursor.close()
+
+    def get_trends(self, start, end, interval=None, filters=None):
+        """Disaster counts over [start, end) from the hourly/daily rollups"""
+        if end <= start:
+            raise ValueError('the window must end after it starts')
+        interval = interval or ('hour' if end - start <= timedelta(days=2) else 'day')
+        if interval not in rollups.ROLLUPS:
+            raise ValueError(f'interval must be one of {", ".join(rollups.ROLLUPS)}')
+        if (end - start) / rollups.ROLLUPS[interval][2] > self.MAX_TREND_BUCKETS:
+            raise ValueError(f'more than {self.MAX_TREND_BUCKETS} {interval} buckets requested')
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                return rollups.query_trends(cursor, start, end, interval, filters)
+            finally:
+                cursor.close()
 
     def create_user(self, username, email, password):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
 
-            hashed_password = hashlib.sha256(password.encode()).hexdigest()
+                hashed_password = hashlib.sha256(password.encode()).hexdigest()
             
-            cursor.execute("""
-                INSERT INTO users (username, email, password)
-                VALUES (%s, %s, %s)
-            """, (username, email, hashed_password))
-            conn.commit()
-            return True
-        except mysql.connector.Error as err:
-            self.logger.error(f'Error creating user: {err}')
-            return False
-        finally:
-            cursor.close()
+                cursor.execute("""
+                    INSERT INTO users (username, email, password)
+                    VALUES (%s, %s, %s)
+                """, (username, email, hashed_password))
+                conn.commit()
+                return True
+            except mysql.connector.Error as err:
+                self.logger.error(f'Error creating user: {err}')
+                return False
+            finally:
+                cursor.close()
 
     def verify_user(self, username, password):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        try:
-            hashed_password = hashlib.sha256(password.encode()).hexdigest()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                hashed_password = hashlib.sha256(password.encode()).hexdigest()
             
-            cursor.execute("""
-                SELECT id FROM users
-                WHERE username = %s AND password = %s
-            """, (username, hashed_password))
-            user = cursor.fetchone()
-            return user is not None
-        finally:
-            cursor.close()
+                cursor.execute("""
+                    SELECT id FROM users
+                    WHERE username = %s AND password = %s
+                """, (username, hashed_password))
+                user = cursor.fetchone()
+                return user is not None
+            finally:
+                cursor.close()
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -162,8 +488,9 @@ def index():
     if not session.get('logged_in'):
         return redirect(url_for('login'))
     dashboard_data = dashboard.get_dashboard_data()
+    disasters, _ = dashboard.get_disasters_page()
     return render_template('index.html', 
-                         disasters=dashboard_data['disasters'],
+                         disasters=disasters,
                          total_disasters=dashboard_data['total_disasters'],
                          last_24h_disasters=dashboard_data['last_24h_disasters'],
                          severity_breakdown=dashboard_data['severity_breakdown'],
@@ -172,10 +499,200 @@ def index():
                          now=datetime.now(),
                          timedelta=timedelta)
 
+def parse_date_arg(name):
+    value = request.args.get(name)
+    return datetime.strptime(value, '%Y-%m-%d') if value else None
+
+def parse_datetime_arg(name):
+    value = datetime.fromisoformat(request.args[name])
+    # Stored dates are naive server-local times, so offsets are converted, not compared.
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+def snapshot_response(build):
+    """Serve ``build()`` as JSON, cached and compressed once per dataset version."""
+    change_feed.poll()
+    version = dashboard.cache.current_version()
+    key = f'{request.path}?{sorted(request.args.items(multi=True))}'
+    snapshot = snapshot_cache.get(version, key, lambda: app.json.dumps(build()).encode())
+
+    if request.if_none_match.contains(snapshot.etag):
+        response = Response(status=304)
+    else:
+        encoding = request.accept_encodings.best_match(
+            snapshot_cache.supported_encodings(), default='identity')
+        response = Response(snapshot.encoded(encoding), mimetype='application/json')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(snapshot.etag)
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
 @app.route('/api/dashboard-data')
 def get_dashboard_api():
-    dashboard_data = dashboard.get_dashboard_data()
-    return jsonify(dashboard_data)
+    cursor = request.args.get('cursor')
+    try:
+        filters = {column: request.args.get(column)
+                   for column in DisasterDashboard.FILTER_COLUMNS}
+        filters['date_from'] = parse_date_arg('from')
+        filters['date_to'] = parse_date_arg('to')
+        if cursor:
+            dashboard.decode_cursor(cursor)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    def build():
+        disasters, next_cursor = dashboard.get_disasters_page(
+            limit=request.args.get('limit', type=int),
+            cursor=cursor,
+            filters=filters
+        )
+        response = {'disasters': disasters, 'next_cursor': next_cursor}
+        if not cursor:
+            response['summary'] = dashboard.get_dashboard_data()
+        return response
+
+    return snapshot_response(build)
+
+@app.route('/api/dashboard-summary')
+def get_dashboard_summary_api():
+    return snapshot_response(dashboard.get_dashboard_data)
+
+def format_sse(event_id, event, data):
+    message = f'event: {event}\ndata: {json.dumps(data, default=str)}\n\n'
+    return f'id: {event_id}\n{message}' if event_id is not None else message
+
+@app.route('/api/stream')
+def stream_api():
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_id = None
+
+    def generate():
+        cursor = last_id
+        if cursor is None:
+            cursor = change_feed.last_id
+            yield format_sse(cursor, 'summary', dashboard.get_dashboard_data())
+        while True:
+            events = change_feed.wait(cursor)
+            if events is None:
+                cursor = change_feed.last_id
+                yield format_sse(cursor, 'reset', dashboard.get_dashboard_data())
+                continue
+            if not events:
+                yield ': keep-alive\n\n'
+                continue
+            for event in events:
+                yield format_sse(event.id, event.op, event.to_dict())
+            cursor = events[-1].id
+
+    return Response(stream_with_context(generate()),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/search')
+def search_api():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+    try:
+        date_from = parse_date_arg('from')
+        date_to = parse_date_arg('to')
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    found = dashboard.search_disasters(
+        query,
+        limit=request.args.get('limit', type=int),
+        offset=max(request.args.get('offset', 0, type=int), 0),
+        types=request.args.getlist('type') or None,
+        sources=request.args.getlist('source') or None,
+        date_from=date_from,
+        date_to=date_to
+    )
+    return jsonify(dict(found, query=query))
+
+@app.route('/api/map')
+def map_api():
+    try:
+        west, south, east, north = (float(v) for v in request.args.get('bbox', '').split(','))
+        zoom = min(request.args.get('zoom', 5, type=int), DisasterDashboard.MAX_MAP_ZOOM)
+        if not all(math.isfinite(v) for v in (west, south, east, north)):
+            raise ValueError('coordinates must be finite numbers')
+        if south > north:
+            raise ValueError('south must not exceed north')
+    except ValueError as e:
+        return jsonify({'error': f'bbox must be west,south,east,north: {e}'}), 400
+    change_feed.poll()
+    return jsonify(dashboard.geo.query(west, south, east, north, zoom))
+
+@app.route('/api/trends')
+def trends_api():
+    try:
+        window = request.args.get('window')
+        if window:
+            if window not in DisasterDashboard.TREND_WINDOWS:
+                raise ValueError(f'window must be one of {", ".join(DisasterDashboard.TREND_WINDOWS)}')
+            end = datetime.now()
+            start = end - DisasterDashboard.TREND_WINDOWS[window]
+        elif request.args.get('from'):
+            start = parse_datetime_arg('from')
+            end = parse_datetime_arg('to') if request.args.get('to') else datetime.now()
+        else:
+            raise ValueError('window or from is required')
+        filters = {column: request.args.get(column) for column in rollups.DIMENSIONS}
+        trends = dashboard.get_trends(start, end, request.args.get('interval'), filters)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(trends)
+
+@app.route('/api/pool-stats')
+def pool_stats_api():
+    return jsonify(dashboard.pool.stats())
+
+@app.route('/metrics')
+def metrics_api():
+    return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/predict-severity', methods=['POST'])
+def predict_severity_api():
+    if not session.get('logged_in'):
+        return jsonify({'error': 'Login required'}), 401
+    payload = request.get_json(silent=True) or {}
+    single = 'descriptions' not in payload
+    descriptions = [payload.get('description')] if single else payload['descriptions']
+    if (not isinstance(descriptions, list) or not descriptions
+            or not all(isinstance(d, str) and d.strip() for d in descriptions)):
+        return jsonify({'error': 'description must be a non-empty string'}), 400
+    if len(descriptions) > PREDICT_MAX_DESCRIPTIONS:
+        return jsonify({'error': f'At most {PREDICT_MAX_DESCRIPTIONS} descriptions per request'}), 400
+
+    futures = []
+    try:
+        for description in descriptions:
+            futures.append(severity_batcher.submit(description))
+        # One deadline for the whole request; items the worker has not started are cancelled.
+        _, pending = wait_futures(futures, timeout=PREDICT_TIMEOUT)
+    except BatcherBusy as e:
+        for future in futures:
+            future.cancel()
+        return jsonify({'error': str(e)}), 503
+    if pending:
+        for future in futures:
+            future.cancel()
+        return jsonify({'error': 'Prediction timed out'}), 503
+    try:
+        predictions = [future.result() for future in futures]
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 503
+
+    if single:
+        return jsonify(dict(predictions[0], model_version=severity_model.model_version))
+    return jsonify({'predictions': predictions, 'model_version': severity_model.model_version})
+
+@app.route('/api/predict-severity/stats')
+def predict_severity_stats_api():
+    return jsonify(dict(severity_batcher.stats(), model_version=severity_model.model_version))
 
 @app.route('/logout')
 def logout():
@@ -184,5 +701,19 @@ def logout():
 
 dashboard = DisasterDashboard()
 
+PREDICT_TIMEOUT = float(os.environ.get('RTDMS_PREDICT_TIMEOUT', 2))
+PREDICT_MAX_DESCRIPTIONS = int(os.environ.get('RTDMS_PREDICT_MAX_DESCRIPTIONS', 100))
+severity_model = DisasterManager()
+severity_batcher = MicroBatcher(
+    severity_model.predict_severity_batch,
+    max_batch_size=int(os.environ.get('RTDMS_PREDICT_MAX_BATCH', 32)),
+    max_wait=float(os.environ.get('RTDMS_PREDICT_MAX_WAIT_MS', 5)) / 1000
+)
+try:
+    # Load the model and touch its pages now rather than on the first request.
+    severity_model.predict_severity_batch(['warm up'])
+except RuntimeError as e:
+    dashboard.logger.warning(f'Severity prediction unavailable until a model is trained: {e}')
+
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
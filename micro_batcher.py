@@ -0,0 +1,112 @@
+from collections import Counter, deque
+from concurrent.futures import Future
+import logging
+import queue
+import threading
+import time
+
+
+class BatcherBusy(Exception):
+    """Raised when the request queue is full"""
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into batched calls.
+
+    ``submit`` queues one item and returns a Future. A worker thread takes
+    the first waiting item, keeps collecting until ``max_batch_size`` items
+    are queued or ``max_wait`` seconds have passed, and calls
+    ``process(items)`` once; it must return one result per item. Only the
+    worker thread calls ``process``, so it needs no locking of its own.
+    """
+
+    def __init__(self, process, max_batch_size: int = 32, max_wait: float = 0.005,
+                 max_queue: int = 1000, window: int = 2048):
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.logger = logging.getLogger(__name__)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = Counter()
+        self._metrics = {
+            'requests': 0,
+            'batches': 0,
+            'rejected': 0,
+            'errors': 0,
+        }
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, item) -> Future:
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self._metrics['rejected'] += 1
+            raise BatcherBusy(f'More than {self._queue.maxsize} requests waiting')
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Callers that already gave up cancel their futures; skip them.
+            batch = [entry for entry in self._collect() if entry[1].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.process([item for item, _, _ in batch])
+            except Exception as e:
+                self.logger.error(f'Batch of {len(batch)} failed: {e}')
+                with self._lock:
+                    self._metrics['errors'] += 1
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finished = time.perf_counter()
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+            with self._lock:
+                self._metrics['requests'] += len(batch)
+                self._metrics['batches'] += 1
+                self._batch_sizes[len(batch)] += 1
+                self._latencies.extend(finished - submitted for _, _, submitted in batch)
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        """Nearest-rank percentile of sorted seconds, in milliseconds"""
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    def stats(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self._metrics)
+            sizes = dict(sorted(self._batch_sizes.items()))
+        stats.update({
+            'queued': self._queue.qsize(),
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'mean_batch_size': stats['requests'] / stats['batches'] if stats['batches'] else None,
+            'batch_sizes': sizes,
+            'latency_ms': {
+                'p50': self._percentile(latencies, 0.50),
+                'p99': self._percentile(latencies, 0.99),
+                'samples': len(latencies),
+            },
+        })
+        return stats
@@ -0,0 +1,230 @@
+import argparse
+import logging
+import mysql.connector
+from db_pool import get_pool
+import rollups
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+DATE_CASES = """
+    CASE
+        WHEN date REGEXP '^[0-9]{4}-[0-9]{2}-[0-9]{2}[ T][0-9]{2}:[0-9]{2}:[0-9]{2}'
+            THEN STR_TO_DATE(LEFT(REPLACE(date, 'T', ' '), 19), '%Y-%m-%d %H:%i:%s')
+        WHEN date REGEXP '^[0-9]{4}-[0-9]{2}-[0-9]{2}'
+            THEN STR_TO_DATE(LEFT(date, 10), '%Y-%m-%d')
+        WHEN date REGEXP '^[0-9]{2}-[0-9]{2}-[0-9]{4}$'
+            THEN STR_TO_DATE(date, '%d-%m-%Y')
+        WHEN date REGEXP '^[0-9]{2}/[0-9]{2}/[0-9]{4}$'
+            THEN STR_TO_DATE(date, '%d/%m/%Y')
+    END
+"""
+
+DISASTER_INDEXES = {
+    'idx_disasters_date_id': '(date, id)',
+    'idx_disasters_type_date': '(type, date)',
+    'idx_disasters_severity_date': '(severity, date)',
+    'idx_disasters_location_date': '(location, date)',
+}
+
+DISASTER_VARCHARS = {
+    'type': 100,
+    'location': 255,
+    'severity': 50,
+}
+
+
+def table_exists(cursor, table):
+    cursor.execute("""
+        SELECT 1 FROM INFORMATION_SCHEMA.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return cursor.fetchone() is not None
+
+
+def column_type(cursor, table, column):
+    cursor.execute("""
+        SELECT DATA_TYPE FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    row = cursor.fetchone()
+    return row[0].lower() if row else None
+
+
+def index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT 1 FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        LIMIT 1
+    """, (table, index))
+    return cursor.fetchone() is not None
+
+
+def add_missing_columns(cursor):
+    for column, definition in (('confidence', 'FLOAT'),
+                               ('latitude', 'DOUBLE'),
+                               ('longitude', 'DOUBLE')):
+        if column_type(cursor, 'disasters', column) is None:
+            cursor.execute(f'ALTER TABLE disasters ADD COLUMN {column} {definition}')
+            logger.info(f'Added disasters.{column}')
+
+
+def convert_dates(cursor):
+    if column_type(cursor, 'disasters', 'date') == 'datetime':
+        logger.info('disasters.date is already DATETIME')
+        return
+    if column_type(cursor, 'disasters', 'date_parsed') is None:
+        cursor.execute('ALTER TABLE disasters ADD COLUMN date_parsed DATETIME NULL')
+    cursor.execute(f'UPDATE disasters SET date_parsed = {DATE_CASES}')
+    cursor.execute("""
+        SELECT COUNT(*) FROM disasters
+        WHERE date IS NOT NULL AND date <> '' AND date_parsed IS NULL
+    """)
+    unparsed = cursor.fetchone()[0]
+    if unparsed:
+        logger.warning(f'{unparsed} disaster dates could not be parsed and will be NULL')
+    cursor.execute("""
+        ALTER TABLE disasters
+        DROP COLUMN date,
+        CHANGE COLUMN date_parsed date DATETIME NULL
+    """)
+    logger.info('Converted disasters.date to DATETIME')
+
+
+def convert_text_columns(cursor):
+    changes = []
+    for column, length in DISASTER_VARCHARS.items():
+        if column_type(cursor, 'disasters', column) == 'varchar':
+            continue
+        cursor.execute(f'SELECT COALESCE(MAX(CHAR_LENGTH({column})), 0) FROM disasters')
+        longest = cursor.fetchone()[0]
+        if longest > length:
+            raise ValueError(f'disasters.{column} has values of {longest} characters, '
+                             f'longer than VARCHAR({length})')
+        changes.append(f'MODIFY COLUMN {column} VARCHAR({length})')
+    if changes:
+        cursor.execute(f"ALTER TABLE disasters {', '.join(changes)}")
+        logger.info(f'Converted {len(changes)} disaster columns to VARCHAR')
+
+
+def add_disaster_indexes(cursor):
+    for index, columns in DISASTER_INDEXES.items():
+        if not index_exists(cursor, 'disasters', index):
+            cursor.execute(f'CREATE INDEX {index} ON disasters {columns}')
+            logger.info(f'Created index {index}')
+
+
+def typed_disasters(cursor):
+    add_missing_columns(cursor)
+    convert_dates(cursor)
+    convert_text_columns(cursor)
+    add_disaster_indexes(cursor)
+
+
+def news_duplicate_links(cursor):
+    # news_data is created by the news collector, possibly after this runs.
+    if not table_exists(cursor, 'news_data'):
+        logger.info('news_data does not exist yet; the collector creates it with duplicate_of')
+        return
+    if column_type(cursor, 'news_data', 'duplicate_of') is None:
+        cursor.execute('ALTER TABLE news_data ADD COLUMN duplicate_of VARCHAR(255)')
+        logger.info('Added news_data.duplicate_of')
+
+
+def disaster_rollups(cursor):
+    rollups.create_tables(cursor)
+    rollups.backfill(cursor)
+
+
+def disaster_change_stamps(cursor):
+    # Lets the dashboard notice edits that leave every counter unchanged.
+    if column_type(cursor, 'disasters', 'updated_at') is None:
+        cursor.execute("""
+            ALTER TABLE disasters ADD COLUMN updated_at TIMESTAMP(6) NOT NULL
+                DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+        """)
+        logger.info('Added disasters.updated_at')
+    if not index_exists(cursor, 'disasters', 'idx_disasters_updated_at'):
+        cursor.execute('CREATE INDEX idx_disasters_updated_at ON disasters (updated_at)')
+        logger.info('Created index idx_disasters_updated_at')
+
+
+# Applied in order; each step must be safe to re-run on a partially migrated table.
+MIGRATIONS = [
+    (1, 'typed_disasters', typed_disasters),
+    (2, 'news_duplicate_links', news_duplicate_links),
+    (3, 'disaster_rollups', disaster_rollups),
+    (4, 'disaster_change_stamps', disaster_change_stamps),
+]
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    cursor.execute('SELECT version FROM schema_migrations')
+    return {row[0] for row in cursor.fetchall()}
+
+
+def migrate(pool=None, target=None):
+    pool = pool or get_pool()
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            ensure_migrations_table(cursor)
+            done = applied_versions(cursor)
+            for version, name, step in MIGRATIONS:
+                if version in done or (target is not None and version > target):
+                    continue
+                logger.info(f'Applying migration {version}: {name}')
+                step(cursor)
+                cursor.execute(
+                    'INSERT INTO schema_migrations (version, name) VALUES (%s, %s)',
+                    (version, name)
+                )
+                conn.commit()
+        except (mysql.connector.Error, ValueError) as err:
+            logger.error(f'Migration failed: {err}')
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+def show_status(pool=None):
+    pool = pool or get_pool()
+    with pool.connection() as conn:
+        cursor = conn.cursor()
+        try:
+            ensure_migrations_table(cursor)
+            done = applied_versions(cursor)
+        finally:
+            cursor.close()
+    for version, name, _ in MIGRATIONS:
+        print(f"{version:>4} {name:<30} {'applied' if version in done else 'pending'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply RTDMS database schema migrations')
+    parser.add_argument('--status', action='store_true', help='list migrations and exit')
+    parser.add_argument('--target', type=int, help='stop after this migration version')
+    args = parser.parse_args()
+
+    if args.status:
+        show_status()
+    else:
+        migrate(target=args.target)
+
+
+if __name__ == '__main__':
+    main()
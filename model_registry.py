@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import joblib
+
+
+class LoadedModel:
+    def __init__(self, version: str, artifacts: Dict[str, Any], metadata: Dict[str, Any]):
+        self.version = version
+        self.artifacts = artifacts
+        self.metadata = metadata
+
+    def __getitem__(self, name):
+        return self.artifacts[name]
+
+
+class ModelRegistry:
+    """Versioned on-disk store for the severity model artifacts.
+
+    Each version lives in its own directory under ``root`` together with a
+    ``metadata.json``; the ``CURRENT`` file names the active one and is
+    replaced atomically. Other pointer files (e.g. the incremental training
+    checkpoint) name versions the same way without affecting serving.
+    Artifacts are loaded with memory-mapped arrays, so worker processes
+    loading the same version share its pages. ``get()``
+    re-reads ``CURRENT`` at most every ``check_interval`` seconds and swaps
+    to a newer version without a restart.
+    """
+
+    CURRENT = 'CURRENT'
+    METADATA = 'metadata.json'
+
+    def __init__(self, root: str = 'models', check_interval: float = 30.0):
+        self.root = root
+        self.check_interval = check_interval
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._loaded = None
+        self._checked_at = 0.0
+
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    def save(self, artifacts: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None,
+             pointer: str = CURRENT) -> str:
+        version = datetime.now().strftime('%Y%m%d%H%M%S%f')
+        staging = self._path(f'.{version}.tmp')
+        os.makedirs(staging)
+        try:
+            for name, artifact in artifacts.items():
+                # Uncompressed dumps are required for mmap_mode loading.
+                joblib.dump(artifact, os.path.join(staging, f'{name}.joblib'))
+            metadata = dict(metadata or {},
+                            version=version,
+                            created_at=datetime.now().isoformat(timespec='seconds'),
+                            artifacts=sorted(artifacts))
+            with open(os.path.join(staging, self.METADATA), 'w') as f:
+                json.dump(metadata, f, indent=2, default=str)
+            os.replace(staging, self._path(version))
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._write_pointer(pointer, version)
+        if pointer == self.CURRENT:
+            with self._lock:
+                self._loaded = LoadedModel(version, dict(artifacts), metadata)
+                self._checked_at = time.monotonic()
+        self.logger.info(f'Saved model version {version} as {pointer}')
+        return version
+
+    def _write_pointer(self, pointer: str, version: str):
+        tmp_path = self._path(f'{pointer}.tmp')
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, self._path(pointer))
+
+    def current_version(self, pointer: str = CURRENT) -> Optional[str]:
+        try:
+            with open(self._path(pointer)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def pointers(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isfile(self._path(name)) and not name.endswith('.tmp'))
+
+    def versions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root)
+                      if os.path.isfile(self._path(name, self.METADATA)))
+
+    def activate(self, version: str):
+        """Point CURRENT at an existing version, e.g. to roll back"""
+        if version not in self.versions():
+            raise ValueError(f'Unknown model version: {version}')
+        self._write_pointer(self.CURRENT, version)
+        with self._lock:
+            self._checked_at = 0.0
+
+    def load(self, version: str) -> LoadedModel:
+        with open(self._path(version, self.METADATA)) as f:
+            metadata = json.load(f)
+        artifacts = {
+            name: joblib.load(self._path(version, f'{name}.joblib'), mmap_mode='r')
+            for name in metadata['artifacts']
+        }
+        return LoadedModel(version, artifacts, metadata)
+
+    def get(self) -> Optional[LoadedModel]:
+        """Return the active model, loading or hot-swapping it when CURRENT changed"""
+        with self._lock:
+            if self._loaded is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._loaded
+            self._checked_at = time.monotonic()
+            version = self.current_version()
+            if version is not None and (self._loaded is None or self._loaded.version != version):
+                self._loaded = self.load(version)
+                self.logger.info(f'Loaded model version {version}')
+            return self._loaded
+
+    def prune(self, keep: int = 3):
+        pointed = {self.current_version(pointer) for pointer in self.pointers()}
+        for version in self.versions()[:-keep]:
+            if version not in pointed:
+                shutil.rmtree(self._path(version), ignore_errors=True)
@@ -0,0 +1,184 @@
+import os
+import re
+import zlib
+import numpy as np
+
+MERSENNE_PRIME = (1 << 61) - 1
+HASH_MAX = (1 << 32) - 1
+WORD_RE = re.compile(r'\w+')
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index of news texts, keyed by URL.
+
+    Each text is reduced to its set of ``shingle_size``-word shingles and a
+    ``num_perm`` value MinHash signature. Signatures are split into
+    ``bands`` bands; two texts sharing any band become candidates, and a
+    candidate counts as a near duplicate when the estimated Jaccard
+    similarity of the signatures reaches ``threshold``.
+
+    Bulk loads (``load``, ``catch_up``) go into sorted per-band arrays built
+    with numpy; single ``add`` calls go into a dict on top. Only signatures
+    are persisted, so a restart costs a file read plus the rows written
+    since ``last_id`` instead of re-shingling the whole table.
+    """
+
+    # Shingles hashed per numpy pass; each pass holds BLOCK_SHINGLES x num_perm uint64s.
+    BLOCK_SHINGLES = 8192
+
+    def __init__(self, num_perm=128, bands=32, shingle_size=3, threshold=0.7, seed=1):
+        if num_perm % bands:
+            raise ValueError('num_perm must be a multiple of bands')
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, HASH_MAX, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, HASH_MAX, size=num_perm, dtype=np.uint64)
+        # Odd multipliers folding each band's values into one 64-bit key.
+        self._band_mix = rng.randint(1, HASH_MAX, size=self.rows_per_band, dtype=np.uint64) | np.uint64(1)
+        self.signatures = {}
+        self.last_id = 0
+        self._bulk_keys = np.empty(0, dtype=object)
+        self._bulk_signatures = np.empty((0, num_perm), dtype=np.uint32)
+        self._bulk_hashes = np.empty((bands, 0), dtype=np.uint64)
+        self._bulk_order = np.empty((bands, 0), dtype=np.int64)
+        self._buckets = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __contains__(self, key):
+        return key in self.signatures
+
+    def shingles(self, text):
+        words = WORD_RE.findall((text or '').lower())
+        if len(words) < self.shingle_size:
+            return {' '.join(words)} if words else set()
+        return {' '.join(words[i:i + self.shingle_size])
+                for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature_matrix(self, texts):
+        """Signatures of ``texts`` as rows, plus a mask of texts that had any words"""
+        hashed = [[zlib.crc32(s.encode()) for s in self.shingles(text)] for text in texts]
+        present = np.array([bool(h) for h in hashed], dtype=bool)
+        counts = [len(h) for h in hashed if h]
+        if not counts:
+            return np.empty((0, self.num_perm), dtype=np.uint32), present
+        values = np.fromiter((v for h in hashed for v in h), dtype=np.uint64, count=sum(counts))
+        owners = np.repeat(np.arange(len(counts)), counts)
+        matrix = np.full((len(counts), self.num_perm), HASH_MAX, dtype=np.uint64)
+        # Long articles have thousands of shingles, so hash in blocks to bound memory.
+        for start in range(0, len(values), self.BLOCK_SHINGLES):
+            block = values[start:start + self.BLOCK_SHINGLES]
+            block_owners = owners[start:start + self.BLOCK_SHINGLES]
+            # (a * x + b) mod p for every permutation, then the minimum per text.
+            permuted = (np.outer(block, self._a) + self._b) % MERSENNE_PRIME & HASH_MAX
+            starts = np.flatnonzero(np.r_[True, block_owners[1:] != block_owners[:-1]])
+            rows = block_owners[starts]
+            matrix[rows] = np.minimum(matrix[rows], np.minimum.reduceat(permuted, starts, axis=0))
+        return matrix.astype(np.uint32), present
+
+    def signature(self, text):
+        matrix, present = self.signature_matrix([text])
+        return matrix[0] if present[0] else None
+
+    def _band_hashes(self, matrix):
+        bands = matrix.reshape(len(matrix), self.bands, self.rows_per_band).astype(np.uint64)
+        return (bands * self._band_mix).sum(axis=2).T
+
+    def add(self, key, text=None, signature=None):
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return
+        self.signatures[key] = signature
+        for band, band_hash in enumerate(self._band_hashes(signature[None, :])[:, 0].tolist()):
+            self._buckets.setdefault((band, band_hash), set()).add(key)
+
+    def add_many(self, keys, matrix):
+        """Index many signatures at once by rebuilding the sorted band arrays"""
+        if not len(keys):
+            return
+        self._bulk_keys = np.concatenate((self._bulk_keys, np.array(keys, dtype=object)))
+        self._bulk_signatures = np.concatenate((self._bulk_signatures, matrix))
+        hashes = self._band_hashes(self._bulk_signatures)
+        self._bulk_order = np.argsort(hashes, axis=1, kind='stable')
+        self._bulk_hashes = np.take_along_axis(hashes, self._bulk_order, axis=1)
+        self.signatures.update(zip(keys, matrix))
+
+    def remove(self, key):
+        # Stale bucket entries are harmless: candidates are checked against ``signatures``.
+        self.signatures.pop(key, None)
+
+    def candidates(self, signature):
+        found = set()
+        band_hashes = self._band_hashes(signature[None, :])[:, 0]
+        for band, band_hash in enumerate(band_hashes):
+            row = self._bulk_hashes[band]
+            lo = np.searchsorted(row, band_hash, 'left')
+            hi = np.searchsorted(row, band_hash, 'right')
+            found.update(self._bulk_keys[self._bulk_order[band, lo:hi]])
+            found.update(self._buckets.get((band, int(band_hash)), ()))
+        return found
+
+    def query(self, text=None, signature=None, exclude=None):
+        """Return (key, similarity) of the closest indexed near duplicate, or None"""
+        if signature is None:
+            signature = self.signature(text)
+        if signature is None:
+            return None
+        best = None
+        for key in self.candidates(signature):
+            indexed = self.signatures.get(key)
+            if key == exclude or indexed is None:
+                continue
+            similarity = float(np.mean(indexed == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def catch_up(self, cursor, batch_size=500):
+        """Index news_data rows written since ``last_id``, e.g. by other collectors"""
+        cursor.execute("""
+            SELECT id, url, cleaned_content FROM news_data
+            WHERE id > %s ORDER BY id
+        """, (self.last_id,))
+        keys, matrices, added = [], [], 0
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            matrix, present = self.signature_matrix([row[2] for row in rows])
+            keys.extend(row[1] for row, has_words in zip(rows, present) if has_words)
+            matrices.append(matrix)
+            self.last_id = rows[-1][0]
+            added += len(rows)
+        if keys:
+            self.add_many(keys, np.concatenate(matrices))
+        return added
+
+    def save(self, path):
+        keys = list(self.signatures)
+        matrix = (np.stack([self.signatures[key] for key in keys]) if keys
+                  else np.empty((0, self.num_perm), dtype=np.uint32))
+        tmp_path = f'{path}.tmp.npz'
+        np.savez(tmp_path, keys=np.array(keys, dtype=str), signatures=matrix,
+                 params=np.array([self.num_perm, self.bands, self.shingle_size, self.last_id]))
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        """Restore signatures saved with the same parameters; returns False otherwise"""
+        try:
+            with np.load(path) as data:
+                num_perm, bands, shingle_size, last_id = (int(v) for v in data['params'])
+                if (num_perm, bands, shingle_size) != (self.num_perm, self.bands, self.shingle_size):
+                    return False
+                keys, matrix = data['keys'].tolist(), data['signatures']
+        except (OSError, ValueError, KeyError):
+            return False
+        self.add_many(keys, matrix)
+        self.last_id = last_id
+        return True
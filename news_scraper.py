@@ -1,19 +1,65 @@
 import scrapy
+from scrapy import signals
 from scrapy.crawler import CrawlerProcess
 from scrapy.spiders import XMLFeedSpider, CrawlSpider, Rule
 from scrapy.linkextractors import LinkExtractor
 import mysql.connector
 from datetime import datetime
-import feedparser
 import os
-
-class NewsItem(scrapy.Item):
-    title = scrapy.Field()
-    content = scrapy.Field()
-    url = scrapy.Field()
-    source = scrapy.Field()
-    published_date = scrapy.Field()
-    location = scrapy.Field()
+import re
+import threading
+import time
+from db_pool import DB_CONFIG, get_pool
+from feed_fetcher import FeedFetcher
+from items import DisasterItem, NewsItem
+from keyword_matcher import KeywordMatcher
+import metrics
+import pipelines
+import profiling
+from near_duplicates import NearDuplicateIndex
+from seen_urls import seen_urls, url_key
+
+US_STATES = ['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY']
+
+DISASTER_TYPES = {
+    'earthquake': ['earthquake'],
+    'flood': ['flood'],
+    'hurricane': ['hurricane'],
+    'tornado': ['tornado'],
+    'wildfire': ['wildfire'],
+    'storm': ['storm', 'thunderstorm', 'windstorm', 'snowstorm', 'rainstorm'],
+    'drought': ['drought'],
+    'landslide': ['landslide'],
+    'tsunami': ['tsunami'],
+}
+
+RSS_FEEDS = [
+    'http://rss.cnn.com/rss/cnn_latest.rss',
+    'https://www.weather.gov/rss_page.php',
+    'https://www.fema.gov/about/news-multimedia/rss',
+]
+
+INGEST_ITEMS = metrics.registry.counter(
+    'rtdms_ingest_items_total', 'Items offered to the collector, by source and outcome', ('source', 'outcome'))
+STORED_ITEMS = metrics.registry.counter(
+    'rtdms_ingest_stored_total', 'Queued items after their batch was written', ('outcome',))
+FEED_FETCH_SECONDS = metrics.registry.histogram(
+    'rtdms_feed_fetch_duration_seconds', 'Time to download each RSS feed', ('feed',))
+FEED_FETCHES = metrics.registry.counter(
+    'rtdms_feed_fetches_total', 'RSS feed fetches, by result', ('feed', 'result'))
+SPIDER_ITEMS = metrics.registry.counter(
+    'rtdms_spider_items_total', 'Items scraped, by spider', ('spider',))
+
+
+def count_scraped_item(item, response, spider):
+    SPIDER_ITEMS.inc(spider.name)
+
+
+def crawl(process, spider_cls):
+    """Schedule ``spider_cls`` on ``process`` with its scraped items counted"""
+    crawler = process.create_crawler(spider_cls)
+    crawler.signals.connect(count_scraped_item, signal=signals.item_scraped)
+    return process.crawl(crawler)
 
 class RSSFeedSpider(XMLFeedSpider):
     name = 'rss_spider'
@@ -22,11 +68,8 @@ class RSSFeedSpider(XMLFeedSpider):
     
     def __init__(self, *args, **kwargs):
         super(RSSFeedSpider, self).__init__(*args, **kwargs)
-        self.feeds = [
-            'http://rss.cnn.com/rss/cnn_latest.rss',
-            'https://www.weather.gov/rss_page.php',
-            'https://www.fema.gov/about/news-multimedia/rss',
-        ]
+        self.feeds = RSS_FEEDS
+        self.start_urls = RSS_FEEDS
     
     def parse_node(self, response, node):
         item = NewsItem()
@@ -79,87 +122,185 @@ class NewsWebSpider(CrawlSpider):
         return 'Unknown'
 
 class NewsCollector:
-    def __init__(self):
-        self.db_config = {
-            'host': 'localhost',
-            'user': 'root',
-            'password': 'root',
-            'database': 'disaster'
-        }
+    INSERT_QUERY = """
+        INSERT INTO news_data 
+        (title, content, url, source, published_date, location, location_confidence, disaster_type,
+         cleaned_content, duplicate_of)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE id = id
+    """
+
+    DUPLICATE_MODES = ('skip', 'link', 'off')
+
+    def __init__(self, batch_size=200, flush_interval=5.0, near_duplicates='skip',
+                 index_path='near_duplicates.npz'):
+        if near_duplicates not in self.DUPLICATE_MODES:
+            raise ValueError(f'near_duplicates must be one of {self.DUPLICATE_MODES}')
+        self.db_config = DB_CONFIG
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = []
+        self.pending_index_keys = []
+        self.last_flush = time.monotonic()
+        self.ingest_stats = {'inserted': 0, 'duplicates': 0, 'near_duplicates': 0, 'failed': 0}
+        # The pipeline's writer thread and the feed path may both store items.
+        self.lock = threading.RLock()
         self.initialize_connection()
         self.setup_database()
+        self.duplicate_mode = near_duplicates
+        self.index_path = index_path
+        self.setup_near_duplicates()
+        self.setup_seen_urls()
         self.location_keywords = ['in', 'at', 'near', 'from', 'around', 'within']
-        self.us_states = ['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC', 'ND', 'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY']
-        self.disaster_types = ['earthquake', 'flood', 'hurricane', 'tornado', 'wildfire', 'storm', 'drought', 'landslide', 'tsunami']
+        self.us_states = list(US_STATES)
+        self.disaster_types = dict(DISASTER_TYPES)
+        self.build_matcher()
+
+    def build_matcher(self):
+        """Compile the keyword tables; call again after changing them"""
+        self.matcher = KeywordMatcher()
+        self.matcher.add_table('disaster_type', self.disaster_types, allow_suffix=True)
+        # Two-letter codes such as IN, OR and ME are ordinary words unless capitalized.
+        self.matcher.add_table('us_state', {state: [state] for state in self.us_states}, case_sensitive=True)
+        self.matcher.compile()
     
     def initialize_connection(self):
+        # The pool pings connections that sat idle, so a dropped one is replaced on checkout.
         try:
-            self.conn = mysql.connector.connect(**self.db_config)
-            self.cursor = self.conn.cursor()
-            print("Database connection initialized successfully")
+            self.pool = get_pool(self.db_config)
+            with self.pool.connection():
+                print("Database connection initialized successfully")
         except mysql.connector.Error as err:
             print(f"Error connecting to database: {err}")
             raise
 
     def setup_database(self):
-        try:
-            self.cursor.execute("""
-                CREATE TABLE IF NOT EXISTS news_data (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    title VARCHAR(255) NOT NULL,
-                    content TEXT,
-                    url VARCHAR(255) UNIQUE NOT NULL,
-                    source VARCHAR(255) NOT NULL,
-                    published_date VARCHAR(100),
-                    location VARCHAR(100),
-                    location_confidence FLOAT,
-                    disaster_type VARCHAR(50),
-                    cleaned_content TEXT,
-                    collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
             try:
-                self.cursor.execute('CREATE INDEX idx_location ON news_data(location)')
-                self.cursor.execute('CREATE INDEX idx_disaster_type ON news_data(disaster_type)')
-                self.cursor.execute('CREATE INDEX idx_published_date ON news_data(published_date)')
-                self.conn.commit()
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS news_data (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        title VARCHAR(255) NOT NULL,
+                        content TEXT,
+                        url VARCHAR(255) UNIQUE NOT NULL,
+                        source VARCHAR(255) NOT NULL,
+                        published_date VARCHAR(100),
+                        location VARCHAR(100),
+                        location_confidence FLOAT,
+                        disaster_type VARCHAR(50),
+                        cleaned_content TEXT,
+                        duplicate_of VARCHAR(255),
+                        collected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                try:
+                    # Tables created before near-duplicate links lack the column INSERT_QUERY writes.
+                    cursor.execute('ALTER TABLE news_data ADD COLUMN duplicate_of VARCHAR(255)')
+                    print("Added news_data.duplicate_of")
+                except mysql.connector.Error as err:
+                    if err.errno != 1060:
+                        raise
+        
+
+                try:
+                    cursor.execute('CREATE INDEX idx_location ON news_data(location)')
+                    cursor.execute('CREATE INDEX idx_disaster_type ON news_data(disaster_type)')
+                    cursor.execute('CREATE INDEX idx_published_date ON news_data(published_date)')
+                    conn.commit()
+                except mysql.connector.Error as err:
+                    if err.errno == 1061: 
+                        print("Indexes already exist, continuing...")
+                    else:
+                        raise
+                print("Database tables created successfully")
             except mysql.connector.Error as err:
-                if err.errno == 1061: 
-                    print("Indexes already exist, continuing...")
-                else:
-                    raise
-            print("Database tables created successfully")
-        except mysql.connector.Error as err:
-            print(f"Error setting up database: {err}")
-            raise
+                print(f"Error setting up database: {err}")
+                raise
+            finally:
+                cursor.close()
+
+    def setup_near_duplicates(self):
+        """Load the saved LSH index and add rows stored since it was written"""
+        self.near_duplicates = NearDuplicateIndex()
+        if self.duplicate_mode == 'off':
+            return
+        started = time.perf_counter()
+        loaded = self.near_duplicates.load(self.index_path)
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                added = self.near_duplicates.catch_up(cursor)
+            finally:
+                cursor.close()
+        print(f"Near-duplicate index ready: {len(self.near_duplicates)} items "
+              f"({'loaded' if loaded else 'rebuilt'}, {added} rows indexed) "
+              f"in {time.perf_counter() - started:.2f}s")
+
+    def setup_seen_urls(self):
+        """Add URLs stored since the seen-URL index was last saved"""
+        started = time.perf_counter()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                added = seen_urls.catch_up(cursor)
+            finally:
+                cursor.close()
+        print(f"Seen-URL index ready: {len(seen_urls)} URLs ({added} rows added) "
+              f"in {time.perf_counter() - started:.2f}s")
+
+    def check_near_duplicate(self, url, cleaned_content):
+        """Return the URL of an already stored near duplicate, indexing the item otherwise"""
+        if self.duplicate_mode == 'off':
+            return None
+        signature = self.near_duplicates.signature(cleaned_content)
+        if signature is None:
+            return None
+        match = self.near_duplicates.query(signature=signature, exclude=url)
+        if match:
+            self.ingest_stats['near_duplicates'] += 1
+            return match[0]
+        if url not in self.near_duplicates:
+            self.pending_index_keys.append(url)
+        self.near_duplicates.add(url, signature=signature)
+        return None
 
     def store_item(self, item):
-        try:
+        """Queue a news item for the next flush(); rows are written in batches.
 
+        Returns True when the item was queued and False when it was skipped as
+        empty, already seen or (in 'skip' mode) a near duplicate.
+        """
+        with self.lock:
             content = item['content']
-            source = item['source'].strip()
-            
+            source = (item['source'] or '').strip()
+        
 
             if not content or not source:
-                return
-            
+                INGEST_ITEMS.inc(source, 'empty')
+                return False
+            # Known articles skip cleaning and classification, not just the INSERT.
+            if url_key(item['url']) in seen_urls:
+                INGEST_ITEMS.inc(source, 'seen')
+                return False
+        
+            cleaned_content = self.clean_text(content)
+            duplicate_of = self.check_near_duplicate(item['url'], cleaned_content)
+            # Reposts of a stored story are not worth classifying again.
+            if duplicate_of and self.duplicate_mode == 'skip':
+                INGEST_ITEMS.inc(source, 'near_duplicate')
+                # Otherwise the repost is downloaded and compared again on every crawl.
+                seen_urls.add(url_key(item['url']))
+                return False
+            INGEST_ITEMS.inc(source, 'queued')
  
-            location, confidence = self.extract_location(content)
-            disaster_type = self.extract_disaster_type(item['title'] + ' ' + content)
-            
+            location, confidence, disaster_type = self.analyze(item['title'], content)
+        
 
             if not disaster_type:
                 disaster_type = 'other'
-            
-            insert_query = """
-                INSERT INTO news_data 
-                (title, content, url, source, published_date, location, location_confidence, disaster_type, cleaned_content)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """
-            
-            self.cursor.execute(insert_query, (
+        
+            self.pending.append((
                 item['title'],
                 content,
                 item['url'],
@@ -168,58 +309,112 @@ class NewsCollector:
                 location,
                 confidence,
                 disaster_type,
-                self.clean_text(content)
+                cleaned_content,
+                duplicate_of
             ))
-            self.conn.commit()
-            print(f"Successfully stored news item from {source}")
-        except mysql.connector.IntegrityError:
-
-            print(f"Duplicate entry found for URL: {item['url']}")
-        except mysql.connector.Error as err:
-            print(f"Database Error: {err}")
-            self.conn.rollback()
+            if (len(self.pending) >= self.batch_size
+                    or time.monotonic() - self.last_flush >= self.flush_interval):
+                self.flush()
+            return True
+
+    def flush(self):
+        """Write queued items in one multi-row INSERT and commit once"""
+        with self.lock:
+            self.last_flush = time.monotonic()
+            if not self.pending:
+                return 0, 0
+            batch, self.pending = self.pending, []
+            index_keys, self.pending_index_keys = self.pending_index_keys, []
+            try:
+                inserted = self.insert_batch(batch)
+                duplicates = len(batch) - inserted
+                for row in batch:
+                    seen_urls.add(url_key(row[2]))
+                self.ingest_stats['inserted'] += inserted
+                self.ingest_stats['duplicates'] += duplicates
+                STORED_ITEMS.inc('inserted', amount=inserted)
+                STORED_ITEMS.inc('duplicate', amount=duplicates)
+                print(f"Stored batch of {len(batch)} news items: {inserted} new, {duplicates} duplicates")
+                return inserted, duplicates
+            except mysql.connector.Error as err:
+                print(f"Database Error: {err}")
+                # Rows that were never stored must not suppress later copies.
+                for key in index_keys:
+                    self.near_duplicates.remove(key)
+                self.ingest_stats['failed'] += len(batch)
+                STORED_ITEMS.inc('failed', amount=len(batch))
+                return 0, 0
     
-    def collect_rss_feeds(self):
-        """Collect news from RSS feeds using feedparser"""
-        feeds = [
-            'http://rss.cnn.com/rss/cnn_latest.rss',
-            'https://www.weather.gov/rss_page.php',
-            'https://www.fema.gov/about/news-multimedia/rss',
-        ]
+    def insert_batch(self, batch):
+        """INSERT ``batch`` on a pooled connection and commit; returns the rows inserted"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                # Duplicate URLs hit the UNIQUE key and become no-ops (0 affected rows).
+                cursor.executemany(self.INSERT_QUERY, batch)
+                conn.commit()
+                return max(cursor.rowcount, 0)
+            except mysql.connector.Error:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    def collect_rss_feeds(self, feeds=None, state_path='feed_state.json'):
+        """Collect news from RSS feeds, fetching all feeds concurrently"""
+        fetcher = FeedFetcher(feeds or RSS_FEEDS, state_path=state_path)
         
         print("Starting RSS feed collection...")
-        for feed_url in feeds:
-            try:
-                feed = feedparser.parse(feed_url)
-                print(f"Processing {feed_url}...")
-                for entry in feed.entries:
-                    item = NewsItem()
-                    item['title'] = entry.get('title', '')
-                    item['content'] = entry.get('description', '')
-                    item['url'] = entry.get('link', '')
-                    item['source'] = feed_url
-                    item['published_date'] = entry.get('published', '')
-                    item['location'] = self.extract_location(item['content'])
-                    self.store_item(item)
-                print(f"Completed processing {feed_url}")
-            except Exception as e:
-                print(f"Error collecting RSS feed {feed_url}: {str(e)}")
-        print("RSS feed collection completed!")
+        for result in fetcher.run():
+            self.store_feed_result(result)
+        self.flush()
+        print(f"RSS feed collection completed! {self.ingest_stats['inserted']} new, "
+              f"{self.ingest_stats['duplicates']} duplicates, "
+              f"{self.ingest_stats['near_duplicates']} near duplicates, {self.ingest_stats['failed']} failed")
+
+    def store_feed_result(self, result):
+        """Queue the entries of one fetched feed; returns False if the fetch failed"""
+        FEED_FETCH_SECONDS.observe(result.fetch_seconds, result.url)
+        if result.error:
+            FEED_FETCHES.inc(result.url, 'error')
+            print(f"Error collecting RSS feed {result.url}: {result.error}")
+            return False
+        if result.not_modified:
+            FEED_FETCHES.inc(result.url, 'not_modified')
+            print(f"{result.url} not modified ({result.fetch_seconds:.2f}s)")
+            return True
+        FEED_FETCHES.inc(result.url, 'ok')
+        for entry in result.entries:
+            item = NewsItem()
+            item['title'] = entry['title']
+            item['content'] = entry['description']
+            item['url'] = entry['link']
+            item['source'] = result.url
+            item['published_date'] = entry['published']
+            item['location'] = self.extract_location(item['content'])
+            self.store_item(item)
+        print(f"Completed processing {result.url}: {len(result.entries)} entries, "
+              f"fetch {result.fetch_seconds:.2f}s, parse {result.parse_seconds:.2f}s")
+        return True
 
     def run(self):
         """Run the news collection process once"""
         try:
             print("Starting news collection process...")
+            pipelines.use_collector(self)
             process = CrawlerProcess({
                 'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                 'ROBOTSTXT_OBEY': True,
                 'CONCURRENT_REQUESTS': 16,
                 'DOWNLOAD_DELAY': 1,
+                'ITEM_PIPELINES': {'pipelines.DatabaseWriterPipeline': 300},
+                'DOWNLOADER_MIDDLEWARES': {'seen_urls.SeenUrlMiddleware': 50},
             })
             
 
-            process.crawl(RSSFeedSpider)
-            process.crawl(NewsWebSpider)
+            crawl(process, RSSFeedSpider)
+            crawl(process, NewsWebSpider)
+            crawl(process, NDMASpider)
             
  
             process.start()
@@ -232,7 +427,7 @@ class NewsCollector:
         except Exception as e:
             print(f"Error during news collection: {str(e)}")
         finally:
-            self.conn.close()
+            self.close()
     
     def clean_text(self, text):
         if not text:
@@ -243,28 +438,30 @@ class NewsCollector:
         text = ''.join(char for char in text if char.isalnum() or char in ' .,!?-')
         return text.strip()
     
+    def analyze(self, title, content):
+        """Extract location and disaster type with a single scan of the text"""
+        title = title or ''
+        matches = self.matcher.scan(title + ' ' + content)
+        location, confidence = self._location_from(matches, content, len(title) + 1)
+        return location, confidence, matches.best('disaster_type')
+
     def extract_disaster_type(self, text):
         if not text:
             return None
-        text = text.lower()
-        for disaster in self.disaster_types:
-            if disaster in text:
-                return disaster
-        return None
+        return self.matcher.scan(text).best('disaster_type')
 
     def extract_location(self, content):
         if not content:
             return ('Unknown', 0.0)
-        
-        content = content.upper()
-        words = content.split()
-        
+        return self._location_from(self.matcher.scan(content), content)
 
-        for i, word in enumerate(words):
-            if word in self.us_states:
-                return (word, 0.9)
+    def _location_from(self, matches, content, start=0):
+        states = matches.labels('us_state', start)
+        if states:
+            return (states[0], 0.9)
         
 
+        words = content.upper().split()
         for i, word in enumerate(words):
             if word.lower() in self.location_keywords and i + 1 < len(words):
                 next_word = words[i + 1]
@@ -276,16 +473,20 @@ class NewsCollector:
     
     def run_scrapy_spiders(self):
         """Run Scrapy spiders to collect news data"""
+        pipelines.use_collector(self)
         process = CrawlerProcess({
             'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'ROBOTSTXT_OBEY': True,
             'CONCURRENT_REQUESTS': 16,
             'DOWNLOAD_DELAY': 1,
             'COOKIES_ENABLED': False,
+            'ITEM_PIPELINES': {'pipelines.DatabaseWriterPipeline': 300},
+            'DOWNLOADER_MIDDLEWARES': {'seen_urls.SeenUrlMiddleware': 50},
         })
         
-        process.crawl(RSSFeedSpider)
-        process.crawl(NewsWebSpider)
+        crawl(process, RSSFeedSpider)
+        crawl(process, NewsWebSpider)
+        crawl(process, NDMASpider)
         process.start()
     
     def collect_all_news(self):
@@ -299,18 +500,56 @@ class NewsCollector:
         print("News collection completed!")
     
     def close(self):
-        """Close database connection"""
-        self.conn.close()
-
+        """Flush pending items, save the indexes and close idle pooled connections"""
+        with self.lock:
+            try:
+                self.flush()
+                if self.duplicate_mode != 'off':
+                    self.near_duplicates.save(self.index_path)
+                seen_urls.save()
+            finally:
+                self.pool.close_idle()
+
+@profiling.profile_cli('news_scraper')
 def main():
+    if os.environ.get('RTDMS_METRICS_PORT'):
+        # The collector runs outside Flask, so it serves /metrics itself.
+        metrics.serve(int(os.environ['RTDMS_METRICS_PORT']))
     collector = NewsCollector()
     try:
         collector.collect_all_news()
     finally:
         collector.close()
 
-if __name__ == "__main__":
-    main()
+NDMA_DISASTER_TYPES = {
+    'Flood': ['flood', 'flooding', 'inundation'],
+    'Cyclone': ['cyclone', 'hurricane', 'storm'],
+    'Earthquake': ['earthquake', 'seismic'],
+    'Landslide': ['landslide', 'mudslide'],
+    'Drought': ['drought', 'water scarcity'],
+    'Heat Wave': ['heat wave', 'heatwave'],
+    'Cold Wave': ['cold wave', 'coldwave'],
+    'Urban Flood': ['urban flood'],
+}
+
+SEVERITY_INDICATORS = {
+    'High': ['severe', 'extreme', 'major', 'devastating'],
+    'Medium': ['moderate', 'significant'],
+    'Low': ['minor', 'slight', 'small']
+}
+
+INDIAN_STATES = ['Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 
+                 'Chhattisgarh', 'Goa', 'Gujarat', 'Haryana', 'Himachal Pradesh',
+                 'Jharkhand', 'Karnataka', 'Kerala', 'Madhya Pradesh', 'Maharashtra',
+                 'Manipur', 'Meghalaya', 'Mizoram', 'Nagaland', 'Odisha', 'Punjab',
+                 'Rajasthan', 'Sikkim', 'Tamil Nadu', 'Telangana', 'Tripura',
+                 'Uttar Pradesh', 'Uttarakhand', 'West Bengal']
+
+NDMA_MATCHER = (KeywordMatcher()
+                .add_table('disaster_type', NDMA_DISASTER_TYPES, allow_suffix=True)
+                .add_table('severity', SEVERITY_INDICATORS)
+                .add_table('state', {state: [state] for state in INDIAN_STATES})
+                .compile())
 
 class NDMASpider(scrapy.Spider):
     name = 'ndma_spider'
@@ -332,19 +571,20 @@ class NDMASpider(scrapy.Spider):
             date_str = response.css('.entry-date::text, .post-date::text').get()
             date = self.parse_date(date_str) if date_str else datetime.now().strftime('%Y-%m-%d')
             
-            item = {
-                'type': self.extract_disaster_type(title + ' ' + content),
-                'location': self.extract_location(content),
-                'severity': self.determine_severity(content),
+            matches = NDMA_MATCHER.scan(title + ' ' + content)
+            offset = len(title) + 1
+            latitude, longitude = self.extract_coordinates(content)
+            return DisasterItem({
+                'type': matches.best('disaster_type') or 'Other',
+                'location': matches.best('state', offset) or 'India',
+                'severity': matches.best('severity', offset) or 'Medium',
                 'date': date,
                 'description': content,
                 'source': 'NDMA',
                 'url': response.url,
-                'latitude': self.extract_coordinates(content)[0],
-                'longitude': self.extract_coordinates(content)[1]
-            }
-            
-            Database.store_item(item)
+                'latitude': latitude,
+                'longitude': longitude
+            })
             
         except Exception as e:
             print(f"Error parsing page {response.url}: {str(e)}")
@@ -369,18 +609,7 @@ class NDMASpider(scrapy.Spider):
             return datetime.now().strftime('%Y-%m-%d')
 
     def extract_location(self, content):
-        states = ['Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar', 
-                 'Chhattisgarh', 'Goa', 'Gujarat', 'Haryana', 'Himachal Pradesh',
-                 'Jharkhand', 'Karnataka', 'Kerala', 'Madhya Pradesh', 'Maharashtra',
-                 'Manipur', 'Meghalaya', 'Mizoram', 'Nagaland', 'Odisha', 'Punjab',
-                 'Rajasthan', 'Sikkim', 'Tamil Nadu', 'Telangana', 'Tripura',
-                 'Uttar Pradesh', 'Uttarakhand', 'West Bengal']
-        
-        content = content.lower()
-        for state in states:
-            if state.lower() in content:
-                return state
-        return 'India'
+        return NDMA_MATCHER.scan(content).best('state') or 'India'
 
     def extract_coordinates(self, content):
         # Try to find coordinates in the content
@@ -392,78 +621,10 @@ class NDMASpider(scrapy.Spider):
         return None, None
 
     def extract_disaster_type(self, content):
-        disaster_types = {
-            'Flood': ['flood', 'flooding', 'inundation'],
-            'Cyclone': ['cyclone', 'hurricane', 'storm'],
-            'Earthquake': ['earthquake', 'seismic'],
-            'Landslide': ['landslide', 'mudslide'],
-            'Drought': ['drought', 'water scarcity'],
-            'Heat Wave': ['heat wave', 'heatwave'],
-            'Cold Wave': ['cold wave', 'coldwave'],
-            'Urban Flood': ['urban flood'],
-        }
-        
-        content = content.lower()
-        for dtype, keywords in disaster_types.items():
-            if any(keyword in content for keyword in keywords):
-                return dtype
-        return 'Other'
+        return NDMA_MATCHER.scan(content).best('disaster_type') or 'Other'
 
     def determine_severity(self, content):
-        severity_indicators = {
-            'High': ['severe', 'extreme', 'major', 'devastating'],
-            'Medium': ['moderate', 'significant'],
-            'Low': ['minor', 'slight', 'small']
-        }
-        
-        content = content.lower()
-        for severity, indicators in severity_indicators.items():
-            if any(indicator in content for indicator in indicators):
-                return severity
-        return 'Medium'
-
-class Database:
-    @staticmethod
-    def connect():
-        return mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='root',
-            database='disaster'
-        )
-
-    @staticmethod
-    def store_item(item):
-        conn = Database.connect()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                INSERT INTO disasters 
-                (type, location, severity, date, description, source, latitude, longitude) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                item['type'],
-                item['location'],
-                item['severity'],
-                item['date'],
-                item['description'],
-                item['source'],
-                item['latitude'],
-                item['longitude']
-            ))
-            conn.commit()
-        except mysql.connector.Error as e:
-            print(f"Database error: {str(e)}")
-        finally:
-            cursor.close()
-            conn.close()
+        return NDMA_MATCHER.scan(content).best('severity') or 'Medium'
 
 if __name__ == "__main__":
-    process = CrawlerProcess({
-        'USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        'ROBOTSTXT_OBEY': True,
-        'CONCURRENT_REQUESTS': 8,
-        'DOWNLOAD_DELAY': 2,
-    })
-    process.crawl(NDMASpider)
-    process.start()
+    main()
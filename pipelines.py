@@ -0,0 +1,208 @@
+"""Scrapy item pipeline storing scraped items from a background writer thread.
+
+Enable it with ``ITEM_PIPELINES = {'pipelines.DatabaseWriterPipeline': 300}``.
+``DisasterItem``s are inserted into ``disasters`` in batches over the shared
+connection pool; ``NewsItem``s go through a ``NewsCollector`` (see
+``use_collector``), which classifies and batches them itself.
+"""
+from collections import deque
+import logging
+import queue
+import threading
+import time
+
+from twisted.internet import defer, threads
+
+from dashboard_cache import dashboard_cache
+from db_pool import get_pool
+from items import DisasterItem
+import metrics
+import rollups
+from seen_urls import SKIPPED, content_key, seen_urls, url_key
+
+ITEMS_WRITTEN = metrics.registry.counter(
+    'rtdms_pipeline_items_total', 'Items written by the pipeline, by kind and outcome', ('kind', 'outcome'))
+BATCH_SECONDS = metrics.registry.histogram(
+    'rtdms_pipeline_batch_duration_seconds', 'Time to write one batch of items', ('kind',))
+BACKPRESSURE = metrics.registry.counter(
+    'rtdms_pipeline_backpressure_total', 'Items held back because the writer queue was full', ('spider',))
+
+_STOP = object()
+_collector = None
+_collector_lock = threading.Lock()
+
+
+def use_collector(collector):
+    """Store NewsItems through ``collector`` rather than a pipeline-owned NewsCollector"""
+    global _collector
+    with _collector_lock:
+        _collector = collector
+
+
+def get_collector():
+    global _collector
+    with _collector_lock:
+        if _collector is None:
+            # news_scraper enables this pipeline and may itself be running as __main__.
+            from news_scraper import NewsCollector
+            _collector = NewsCollector()
+        return _collector
+
+
+class Database:
+    COLUMNS = ('type', 'location', 'severity', 'date', 'description', 'source', 'latitude', 'longitude')
+
+    @staticmethod
+    def connect():
+        return get_pool().connection()
+
+    @staticmethod
+    def dedup_keys(row):
+        # disasters has no unique key; the page URL and the reported content stand in for one.
+        keys = [content_key(row.get('type'), row.get('location'), row.get('date'), row.get('description'))]
+        if row.get('url'):
+            keys.append(url_key(row['url']))
+        return keys
+
+    @staticmethod
+    def store_items(items):
+        """Insert new disaster rows in one transaction and commit; returns the number stored"""
+        rows, keys = [], set()
+        for item in items:
+            row = dict(item)
+            row_keys = Database.dedup_keys(row)
+            if any(key in keys or key in seen_urls for key in row_keys):
+                SKIPPED.inc('disaster')
+                continue
+            keys.update(row_keys)
+            rows.append(row)
+        if not rows:
+            return 0
+        query = f"""
+            INSERT INTO disasters ({', '.join(Database.COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(Database.COLUMNS))})
+        """
+        with Database.connect() as conn:
+            cursor = conn.cursor()
+            try:
+                # One statement per row: a multi-row INSERT only reports its first id, and the
+                # others are not consecutive under innodb_autoinc_lock_mode=2 or a custom
+                # auto_increment_increment.
+                for row in rows:
+                    cursor.execute(query, [row.get(column) for column in Database.COLUMNS])
+                    row['id'] = cursor.lastrowid
+                rollups.record(cursor, rows)
+                conn.commit()
+            finally:
+                cursor.close()
+        for key in keys:
+            seen_urls.add(key)
+        for row in rows:
+            dashboard_cache.record_insert(row)
+        return len(rows)
+
+
+class DatabaseWriterPipeline:
+    """Queue items for a writer thread so the reactor never waits on MySQL.
+
+    The thread writes whenever ``WRITER_BATCH_SIZE`` items are queued or
+    ``WRITER_FLUSH_INTERVAL`` seconds have passed. Once ``WRITER_MAX_PENDING``
+    items are waiting, ``process_item`` returns an unfired Deferred instead;
+    Scrapy then stops feeding the spider new responses until the writer
+    catches up and the Deferred fires.
+    """
+
+    def __init__(self, batch_size=200, max_pending=2000, flush_interval=2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(__name__)
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.waiting = deque()
+        self.collector = None
+        self.reactor = None
+        self.thread = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        return cls(settings.getint('WRITER_BATCH_SIZE', 200), settings.getint('WRITER_MAX_PENDING', 2000),
+                   settings.getfloat('WRITER_FLUSH_INTERVAL', 2.0))
+
+    def open_spider(self, spider):
+        # Imported late: the crawler installs its reactor after this module is loaded.
+        from twisted.internet import reactor
+        self.reactor = reactor
+        self.collector = get_collector()
+        self.thread = threading.Thread(target=self._run, name=f'item-writer-{spider.name}', daemon=True)
+        self.thread.start()
+
+    def process_item(self, item, spider):
+        if not self.waiting:
+            try:
+                self.queue.put_nowait(item)
+                return item
+            except queue.Full:
+                pass
+        BACKPRESSURE.inc(spider.name)
+        d = defer.Deferred()
+        self.waiting.append((item, d))
+        return d
+
+    def _drain(self):
+        """Move held-back items into the queue as it frees up (reactor thread)"""
+        while self.waiting:
+            item, d = self.waiting[0]
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                return
+            self.waiting.popleft()
+            d.callback(item)
+
+    def _run(self):
+        news, disasters = [], []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if item is not None:
+                (disasters if isinstance(item, DisasterItem) else news).append(item)
+            if self.waiting:
+                self.reactor.callFromThread(self._drain)
+            if len(news) + len(disasters) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(news, disasters)
+                news, disasters = [], []
+                deadline = time.monotonic() + self.flush_interval
+        self._write(news, disasters)
+
+    def _write(self, news, disasters):
+        for kind, batch, write in (('disaster', disasters, Database.store_items),
+                                   ('news', news, self._store_news)):
+            if not batch:
+                continue
+            started = time.perf_counter()
+            try:
+                # Items already stored are dropped on the way and counted by seen_urls.
+                ITEMS_WRITTEN.inc(kind, 'stored', amount=write(batch))
+            except Exception as e:
+                self.logger.error(f'Error writing {len(batch)} {kind} items: {e}')
+                ITEMS_WRITTEN.inc(kind, 'failed', amount=len(batch))
+            BATCH_SECONDS.observe(time.perf_counter() - started, kind)
+
+    def _store_news(self, items):
+        # The collector drops empty, known and near-duplicate items and counts URL duplicates itself.
+        queued = sum(1 for item in items if self.collector.store_item(item))
+        self.collector.flush()
+        return queued
+
+    def _finish(self):
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def close_spider(self, spider):
+        # Waiting for the last batch must not block the reactor.
+        return threads.deferToThread(self._finish)
@@ -0,0 +1,168 @@
+from collections import Counter
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+
+PROFILE_DIR = os.environ.get('RTDMS_PROFILE_DIR', 'profiles')
+TOP_N = int(os.environ.get('RTDMS_PROFILE_TOP_N', 40))
+SAMPLE_INTERVAL = float(os.environ.get('RTDMS_PROFILE_INTERVAL_MS', 2)) / 1000
+
+# cProfile allows one active profiler per thread (and per process from Python 3.12),
+# so concurrent requests are not profiled while another capture is running.
+_active = threading.Lock()
+
+
+def _frame_name(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    # co_qualname is new in Python 3.11; older versions only have the bare name.
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    """Counts the stacks of running threads every ``interval`` seconds, in collapsed form"""
+
+    def __init__(self, thread_ids=None, interval=SAMPLE_INTERVAL):
+        self.thread_ids = thread_ids
+        self.interval = interval
+        self.stacks = Counter()
+        self._names = {}
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _collapse(self, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            name = self._names.get(code)
+            if name is None:
+                name = self._names[code] = _frame_name(code)
+            names.append(name)
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            threads = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.thread_ids is not None and ident not in self.thread_ids):
+                    continue
+                stack = self._collapse(frame)
+                if self.thread_ids is None:
+                    stack = f"{threads.get(ident, ident)};{stack}"
+                self.stacks[stack] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.writelines(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class Profiler:
+    """Capture one run of some code into ``output_dir``.
+
+    Writes ``<name>.collapsed`` (sampled stacks, the input format of
+    flamegraph.pl and speedscope), ``<name>.txt`` (top functions by
+    cumulative and own time) and ``<name>.prof`` (raw cProfile stats).
+    The calling thread is both traced and sampled; with ``all_threads``
+    the other threads are sampled as well.
+    """
+
+    def __init__(self, label, output_dir=PROFILE_DIR, all_threads=False, top_n=TOP_N):
+        self.label = re.sub(r'[^A-Za-z0-9_.-]+', '_', label).strip('_') or 'profile'
+        self.output_dir = output_dir
+        self.all_threads = all_threads
+        self.top_n = top_n
+        self.name = None
+        self.logger = logging.getLogger(__name__)
+        self._profile = None
+        self._sampler = None
+        self._started = None
+        self.running = False
+
+    def start(self) -> bool:
+        """Begin capturing; False when another capture is already running"""
+        if not _active.acquire(blocking=False):
+            return False
+        self.name = f"{time.strftime('%Y%m%d-%H%M%S')}-{self.label}-{uuid.uuid4().hex[:6]}"
+        self._sampler = StackSampler(None if self.all_threads else {threading.get_ident()})
+        self._sampler.start()
+        self._profile = cProfile.Profile()
+        self._started = time.perf_counter()
+        self.running = True
+        self._profile.enable()
+        return True
+
+    def stop(self):
+        """Stop capturing and write the reports; returns the base path written"""
+        self._profile.disable()
+        elapsed = time.perf_counter() - self._started
+        self._sampler.stop()
+        self.running = False
+        _active.release()
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            base = os.path.join(self.output_dir, self.name)
+            self._sampler.write(f'{base}.collapsed')
+            self._profile.dump_stats(f'{base}.prof')
+            with open(f'{base}.txt', 'w', encoding='utf-8') as handle:
+                handle.write(f'{self.label}: {elapsed * 1000:.1f} ms wall, '
+                             f'{sum(self._sampler.stacks.values())} stack samples\n')
+                handle.write(self.top_functions())
+        except OSError as e:
+            self.logger.error(f'Error writing profile {self.name}: {e}')
+            return None
+        self.logger.info(f'Profile written to {base}.*')
+        return base
+
+    def top_functions(self) -> str:
+        out = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=out)
+        for key in ('cumulative', 'tottime'):
+            out.write(f'\n=== top {self.top_n} by {key} ===\n')
+            stats.sort_stats(key).print_stats(self.top_n)
+        return out.getvalue()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.running:
+            self.stop()
+        return False
+
+
+def profile_cli(label):
+    """Profile a command-line ``main`` (all threads) when ``RTDMS_PROFILE`` is set"""
+    def decorate(main):
+        @functools.wraps(main)
+        def wrapper(*args, **kwargs):
+            if not os.environ.get('RTDMS_PROFILE'):
+                return main(*args, **kwargs)
+            profiler = Profiler(label, all_threads=True)
+            if not profiler.start():
+                return main(*args, **kwargs)
+            try:
+                return main(*args, **kwargs)
+            finally:
+                base = profiler.stop()
+                if base:
+                    print(f'Profile written to {base}.collapsed/.txt/.prof', file=sys.stderr)
+        return wrapper
+    return decorate
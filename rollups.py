@@ -0,0 +1,209 @@
+import argparse
+from collections import Counter
+from datetime import date, datetime, timedelta
+import logging
+import mysql.connector
+from db_pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+# Granularity -> (table, SQL expression bucketing disasters.date, bucket length)
+ROLLUPS = {
+    'hour': ('disaster_rollup_hourly', "DATE_FORMAT(date, '%Y-%m-%d %H:00:00')", timedelta(hours=1)),
+    'day': ('disaster_rollup_daily', 'DATE(date)', timedelta(days=1)),
+}
+DIMENSIONS = ('type', 'severity', 'location')
+NO_SUCH_TABLE = 1146
+
+
+def to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    try:
+        return datetime.fromisoformat(str(value)[:19]) if value else None
+    except ValueError:
+        return None
+
+
+def floor_bucket(moment, interval):
+    if interval == 'day':
+        return datetime.combine(moment.date(), datetime.min.time())
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_bucket(moment, interval):
+    floored = floor_bucket(moment, interval)
+    return floored if floored == moment else floored + ROLLUPS[interval][2]
+
+
+def create_tables(cursor):
+    for interval, (table, _, _) in ROLLUPS.items():
+        bucket_type = 'DATE' if interval == 'day' else 'DATETIME'
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket {bucket_type} NOT NULL,
+                type VARCHAR(100) NOT NULL DEFAULT '',
+                severity VARCHAR(50) NOT NULL DEFAULT '',
+                location VARCHAR(255) NOT NULL DEFAULT '',
+                count INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (bucket, type, severity, location)
+            )
+        """)
+
+
+def record(cursor, rows, sign=1):
+    """Add (sign=1) or subtract (sign=-1) disaster rows from every rollup.
+
+    Meant to run on the cursor that wrote the rows, before the commit, so
+    the rollups change in the same transaction. Rows without a parseable
+    date are not counted. Returns False when the rollup tables are missing.
+    """
+    deltas = {interval: Counter() for interval in ROLLUPS}
+    for row in rows:
+        moment = to_datetime(row.get('date'))
+        if moment is None:
+            continue
+        dimensions = tuple(row.get(column) or '' for column in DIMENSIONS)
+        for interval, counts in deltas.items():
+            counts[(floor_bucket(moment, interval),) + dimensions] += sign
+    try:
+        for interval, counts in deltas.items():
+            changes = [key + (count,) for key, count in counts.items() if count]
+            if changes:
+                cursor.executemany(f"""
+                    INSERT INTO {ROLLUPS[interval][0]} (bucket, type, severity, location, count)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE count = count + VALUES(count)
+                """, changes)
+    except mysql.connector.Error as err:
+        # Writers keep working until migration 3 has created the tables.
+        if err.errno == NO_SUCH_TABLE:
+            return False
+        raise
+    return True
+
+
+def lock_row(cursor, disaster_id):
+    """The rollup dimensions of a disaster, locked until the transaction ends"""
+    cursor.execute("""
+        SELECT type, severity, location, date FROM disasters
+        WHERE id = %s FOR UPDATE
+    """, (disaster_id,))
+    row = cursor.fetchone()
+    return dict(zip(DIMENSIONS + ('date',), row)) if row else None
+
+
+def backfill(cursor, min_id=None, max_id=None):
+    """Rebuild the rollups from disasters, or add only the rows in an id range"""
+    clauses, params = ['date IS NOT NULL'], []
+    if min_id is not None:
+        clauses.append('id >= %s')
+        params.append(min_id)
+    if max_id is not None:
+        clauses.append('id <= %s')
+        params.append(max_id)
+    full = min_id is None and max_id is None
+    for table, bucket, _ in ROLLUPS.values():
+        if full:
+            cursor.execute(f'DELETE FROM {table}')
+        cursor.execute(f"""
+            INSERT INTO {table} (bucket, type, severity, location, count)
+            SELECT {bucket}, COALESCE(type, ''), COALESCE(severity, ''), COALESCE(location, ''), COUNT(*)
+            FROM disasters
+            WHERE {' AND '.join(clauses)}
+            GROUP BY 1, 2, 3, 4
+            ON DUPLICATE KEY UPDATE count = count + VALUES(count)
+        """, tuple(params))
+        logger.info(f'Backfilled {table} with {cursor.rowcount} bucket changes')
+
+
+def plan(start, end, interval):
+    """Split [start, end) into (table, bucket expression, lo, hi) rollup reads.
+
+    Hourly series read the hourly table. Daily series read whole days from
+    the daily table and the partial days at either edge from the hourly one,
+    so the rows read depend on the window length, not on the raw table.
+    """
+    hourly = ROLLUPS['hour'][0]
+    if interval == 'hour':
+        return [(hourly, 'bucket', start, end)]
+    first_day, last_day = ceil_bucket(start, 'day'), floor_bucket(end, 'day')
+    if first_day >= last_day:
+        return [(hourly, 'DATE(bucket)', start, end)]
+    parts = [(hourly, 'DATE(bucket)', start, first_day),
+             (ROLLUPS['day'][0], 'bucket', first_day, last_day),
+             (hourly, 'DATE(bucket)', last_day, end)]
+    return [part for part in parts if part[2] < part[3]]
+
+
+def query_trends(cursor, start, end, interval='hour', filters=None):
+    """Counts of disasters dated in [start, end), read from the rollups.
+
+    ``start`` and ``end`` are widened to whole hours. Returns the total, a
+    per-``interval`` series with empty buckets filled in, and per-type,
+    per-severity and per-location counts.
+    """
+    start, end = floor_bucket(start, 'hour'), ceil_bucket(end, 'hour')
+    conditions, filter_params = [], []
+    for column in DIMENSIONS:
+        if (filters or {}).get(column):
+            conditions.append(f'{column} = %s')
+            filter_params.append(filters[column])
+    selects, params = [], []
+    for table, bucket, lo, hi in plan(start, end, interval):
+        where = ' AND '.join(['bucket >= %s', 'bucket < %s'] + conditions)
+        selects.append(f'SELECT {bucket} AS bucket, type, severity, location, count '
+                       f'FROM {table} WHERE {where}')
+        params.extend([lo, hi] + filter_params)
+    source = ' UNION ALL '.join(selects)
+
+    def grouped(column):
+        cursor.execute(f"""
+            SELECT {column}, SUM(count) FROM ({source}) windowed
+            GROUP BY {column} HAVING SUM(count) > 0
+        """, tuple(params))
+        return {key: int(count) for key, count in cursor.fetchall()}
+
+    by_bucket = {to_datetime(bucket): count for bucket, count in grouped('bucket').items()}
+    series, moment = [], floor_bucket(start, interval)
+    while moment < end:
+        series.append({'bucket': moment.isoformat(), 'count': by_bucket.get(moment, 0)})
+        moment += ROLLUPS[interval][2]
+    result = {
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'interval': interval,
+        'total': sum(by_bucket.values()),
+        'series': series,
+    }
+    for column in DIMENSIONS:
+        counts = grouped(column)
+        result[f'by_{column}'] = dict(sorted(counts.items(), key=lambda item: -item[1]))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the disaster trend rollups from history')
+    parser.add_argument('--min-id', type=int, help='only add disasters with this id or above')
+    parser.add_argument('--max-id', type=int, help='only add disasters with this id or below')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    with get_pool().connection() as conn:
+        cursor = conn.cursor()
+        try:
+            create_tables(cursor)
+            backfill(cursor, args.min_id, args.max_id)
+            conn.commit()
+        except mysql.connector.Error as err:
+            logger.error(f'Backfill failed: {err}')
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+if __name__ == '__main__':
+    main()
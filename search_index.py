@@ -0,0 +1,242 @@
+from array import array
+from datetime import date, datetime
+import logging
+import math
+import re
+import threading
+import time
+import numpy as np
+
+WORD_RE = re.compile(r'\w+')
+STOP_WORDS = frozenset("""
+    a an and are as at be been but by for from has have in into is it its of on or
+    over said that the their there they this to was were which while will with
+""".split())
+
+
+def tokenize(text):
+    return [word for word in WORD_RE.findall((text or '').lower())
+            if word not in STOP_WORDS and (len(word) > 1 or word.isdigit())]
+
+
+def to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value)[:10]).date() if value else None
+    except ValueError:
+        return None
+
+
+class SearchIndex:
+    """In-process BM25 inverted index over disasters and news items.
+
+    Documents are keyed by (source, id). Postings are kept in typed arrays
+    and scored with numpy, so a query touches only the postings of its
+    terms. Replaced or removed documents are masked out rather than purged.
+    Only ids, types and dates are held here; callers hydrate the hits from
+    the database.
+
+    Rows written by other processes are pulled by ``refresh()``: each
+    source registered with ``set_source`` is asked for rows above its id
+    watermark at most every ``refresh_interval`` seconds.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, refresh_interval: float = 5.0, batch_size: int = 5000):
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._sources = {}
+        self._watermarks = {}
+        self._keys = []
+        self._docnums = {}
+        self._live = array('b')
+        self._lengths = array('f')
+        self._source_codes = array('b')
+        self._type_codes = array('i')
+        self._days = array('i')
+        self._months = array('i')
+        self._postings = {}
+        self._type_names = []
+        self._type_ids = {}
+        self._source_names = []
+        self._source_ids = {}
+        self._total_length = 0.0
+        self._live_count = 0
+
+    def __len__(self):
+        return self._live_count
+
+    def __contains__(self, key):
+        with self._lock:
+            docnum = self._docnums.get(key)
+            return docnum is not None and bool(self._live[docnum])
+
+    def set_source(self, name, fetch):
+        """Register ``fetch(last_id, limit)`` returning row dicts with ids above ``last_id``.
+
+        Rows need ``id``, ``text`` and optionally ``type`` and ``date``.
+        """
+        with self._lock:
+            self._sources[name] = fetch
+            self._watermarks.setdefault(name, 0)
+            self._code(self._source_names, self._source_ids, name)
+
+    def _code(self, names, ids, value):
+        if value not in ids:
+            ids[value] = len(names)
+            names.append(value)
+        return ids[value]
+
+    def add(self, source, doc_id, text, doc_type=None, doc_date=None):
+        """Index a document, replacing any earlier version with the same key"""
+        key = (source, doc_id)
+        terms = {}
+        for token in tokenize(text):
+            terms[token] = terms.get(token, 0) + 1
+        day = to_date(doc_date)
+        with self._lock:
+            self.remove(source, doc_id)
+            docnum = len(self._keys)
+            self._keys.append(key)
+            self._docnums[key] = docnum
+            self._live.append(1)
+            length = sum(terms.values())
+            self._lengths.append(length)
+            self._source_codes.append(self._code(self._source_names, self._source_ids, source))
+            self._type_codes.append(self._code(self._type_names, self._type_ids, doc_type or 'Unknown'))
+            self._days.append(day.toordinal() if day else 0)
+            self._months.append(day.year * 100 + day.month if day else 0)
+            for term, count in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array('I'), array('H'))
+                postings[0].append(docnum)
+                postings[1].append(min(count, 65535))
+            self._total_length += length
+            self._live_count += 1
+
+    def remove(self, source, doc_id):
+        with self._lock:
+            docnum = self._docnums.pop((source, doc_id), None)
+            if docnum is None or not self._live[docnum]:
+                return False
+            self._live[docnum] = 0
+            self._total_length -= self._lengths[docnum]
+            self._live_count -= 1
+            return True
+
+    def refresh(self, force=False):
+        """Pull rows written since the last refresh from every registered source"""
+        if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return 0
+        if not self._refresh_lock.acquire(blocking=force):
+            return 0
+        try:
+            self._last_refresh = time.monotonic()
+            added = 0
+            for name, fetch in list(self._sources.items()):
+                while True:
+                    rows = fetch(self._watermarks[name], self.batch_size)
+                    for row in rows:
+                        if (name, row['id']) not in self._docnums:
+                            self.add(name, row['id'], row['text'], row.get('type'), row.get('date'))
+                            added += 1
+                        self._watermarks[name] = max(self._watermarks[name], row['id'])
+                    if len(rows) < self.batch_size:
+                        break
+            if added:
+                self.logger.info(f'Search index added {added} documents ({self._live_count} total)')
+            return added
+        finally:
+            self._refresh_lock.release()
+
+    def search(self, query, limit=20, offset=0, types=None, sources=None,
+               date_from=None, date_to=None):
+        """Rank documents matching any query term with BM25.
+
+        Returns ``total``, ``results`` (source, id, score) and ``facets`` with
+        per-type, per-source and per-month counts. Each facet ignores its own
+        filter, so the counts show what selecting another value would return.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        offset, limit = max(offset, 0), max(limit, 0)
+        with self._lock:
+            n_docs = len(self._keys)
+            empty = {'total': 0, 'results': [], 'facets': {'type': {}, 'source': {}, 'month': {}}}
+            if not terms or not self._live_count:
+                return empty
+            scores = np.zeros(n_docs, dtype=np.float32)
+            lengths = np.frombuffer(self._lengths, dtype=np.float32)
+            norm = self.K1 * (1 - self.B + self.B * lengths / (self._total_length / self._live_count))
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    continue
+                docs = np.frombuffer(postings[0], dtype=np.uint32)
+                tfs = np.frombuffer(postings[1], dtype=np.uint16).astype(np.float32)
+                idf = math.log(1 + (self._live_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                scores[docs] += idf * tfs * (self.K1 + 1) / (tfs + norm[docs])
+
+            matched = (scores > 0) & np.frombuffer(self._live, dtype=np.int8).astype(bool)
+            type_codes = np.frombuffer(self._type_codes, dtype=np.int32)
+            source_codes = np.frombuffer(self._source_codes, dtype=np.int8)
+            days = np.frombuffer(self._days, dtype=np.int32)
+            months = np.frombuffer(self._months, dtype=np.int32)
+
+            by_type = np.ones(n_docs, dtype=bool)
+            if types:
+                by_type = np.isin(type_codes, [self._type_ids[t] for t in types if t in self._type_ids])
+            by_source = np.ones(n_docs, dtype=bool)
+            if sources:
+                by_source = np.isin(source_codes, [self._source_ids[s] for s in sources if s in self._source_ids])
+            by_date = np.ones(n_docs, dtype=bool)
+            if date_from:
+                by_date &= days >= to_date(date_from).toordinal()
+            if date_to:
+                by_date &= (days > 0) & (days <= to_date(date_to).toordinal())
+
+            selected = matched & by_type & by_source & by_date
+            hits = np.flatnonzero(selected)
+            wanted = min(len(hits), offset + limit)
+            if wanted:
+                top = hits[np.argpartition(-scores[hits], wanted - 1)[:wanted]]
+                top = top[np.lexsort((top, -scores[top]))][offset:]
+            else:
+                top = hits[:0]
+
+            facets = {
+                'type': self._counts(type_codes[matched & by_source & by_date], self._type_names),
+                'source': self._counts(source_codes[matched & by_type & by_date], self._source_names),
+                'month': {f'{m // 100:04d}-{m % 100:02d}': c for m, c in
+                          self._counts(months[matched & by_type & by_source]).items() if m},
+            }
+            results = [{'source': self._keys[d][0], 'id': self._keys[d][1], 'score': float(scores[d])}
+                       for d in top.tolist()]
+        return {'total': int(len(hits)), 'results': results, 'facets': facets}
+
+    @staticmethod
+    def _counts(codes, names=None):
+        values, counts = np.unique(codes, return_counts=True)
+        return {(names[v] if names is not None else v): c
+                for v, c in zip(values.tolist(), counts.tolist())}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'documents': self._live_count,
+                'slots': len(self._keys),
+                'terms': len(self._postings),
+                'watermarks': dict(self._watermarks),
+            }
+
+
+search_index = SearchIndex()
@@ -0,0 +1,153 @@
+import hashlib
+import os
+import threading
+import numpy as np
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from w3lib.url import canonicalize_url
+import metrics
+
+SKIPPED = metrics.registry.counter(
+    'rtdms_seen_urls_skipped_total', 'Requests and items dropped because they were already stored', ('where',))
+
+
+def url_key(url):
+    # Same canonical form Scrapy fingerprints requests with: sorted query, no fragment.
+    return 'url:' + canonicalize_url(url or '')
+
+
+def content_key(*parts):
+    return 'content:' + '\x1f'.join(str(part or '') for part in parts)
+
+
+def key_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+
+
+class SeenUrls:
+    """Persistent set of stored article URLs and content hashes.
+
+    Keys are kept as 64-bit hashes: a sorted array loaded from ``path`` plus
+    a set of keys added since, merged in on ``save``. A Bloom filter saved
+    next to the array answers most lookups for new keys without searching
+    it; a false positive only costs the binary search. ``catch_up`` adds
+    the URLs of news_data rows written since the last save, so the index
+    also covers rows stored by other processes.
+    """
+
+    def __init__(self, path, bits_per_key=10, hashes=7):
+        self.path = path
+        self.bits_per_key = bits_per_key
+        self.hashes = hashes
+        self.last_id = 0
+        self._lock = threading.Lock()
+        self._added = set()
+        # (sorted hashes, Bloom filter bytes, filter size in bits), swapped as a whole.
+        self._stored = (np.empty(0, dtype=np.uint64), b'', 0)
+
+    def __len__(self):
+        return len(self._stored[0]) + len(self._added)
+
+    def __contains__(self, key):
+        value = key_hash(key)
+        if value in self._added:
+            return True
+        keys, bloom, bits = self._stored
+        if not bits:
+            return False
+        h1, h2 = value & 0xFFFFFFFF, (value >> 32) | 1
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % bits
+            if not bloom[position >> 3] & (1 << (position & 7)):
+                return False
+        index = int(keys.searchsorted(np.uint64(value)))
+        return index < len(keys) and int(keys[index]) == value
+
+    def add(self, key):
+        with self._lock:
+            self._added.add(key_hash(key))
+
+    def build_bloom(self, keys):
+        bits = max(len(keys) * self.bits_per_key, 64) // 8 * 8
+        h1 = keys & np.uint64(0xFFFFFFFF)
+        h2 = (keys >> np.uint64(32)) | np.uint64(1)
+        flags = np.zeros(bits, dtype=bool)
+        for i in range(self.hashes):
+            flags[(h1 + np.uint64(i) * h2) % np.uint64(bits)] = True
+        return np.packbits(flags, bitorder='little').tobytes(), bits
+
+    def load(self):
+        """Read the saved index; returns False when there is none"""
+        try:
+            with np.load(self.path) as data:
+                bits_per_key, hashes, last_id = (int(v) for v in data['params'])
+                keys, bloom = data['keys'], data['bloom'].tobytes()
+        except (OSError, ValueError, KeyError):
+            return False
+        if (bits_per_key, hashes) == (self.bits_per_key, self.hashes):
+            bits = len(bloom) * 8
+        else:
+            bloom, bits = self.build_bloom(keys)
+        self._stored = (keys, bloom, bits)
+        self.last_id = last_id
+        return True
+
+    def catch_up(self, cursor, batch_size=5000):
+        """Add the URLs of news_data rows written since ``last_id``"""
+        cursor.execute('SELECT id, url FROM news_data WHERE id > %s ORDER BY id', (self.last_id,))
+        added = 0
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            with self._lock:
+                self._added.update(key_hash(url_key(row[1])) for row in rows)
+            self.last_id = rows[-1][0]
+            added += len(rows)
+        return added
+
+    def save(self):
+        """Merge the added keys into the file, keeping keys saved meanwhile by other processes"""
+        with self._lock:
+            keys = self._stored[0]
+            try:
+                with np.load(self.path) as data:
+                    keys = np.union1d(keys, data['keys'])
+            except (OSError, ValueError, KeyError):
+                pass
+            if self._added:
+                keys = np.union1d(keys, np.fromiter(self._added, dtype=np.uint64, count=len(self._added)))
+            bloom, bits = self.build_bloom(keys)
+            tmp_path = f'{self.path}.tmp.npz'
+            np.savez(tmp_path, keys=keys, bloom=np.frombuffer(bloom, dtype=np.uint8),
+                     params=np.array([self.bits_per_key, self.hashes, self.last_id]))
+            os.replace(tmp_path, self.path)
+            self._stored = (keys, bloom, bits)
+            self._added = set()
+
+
+class SeenUrlMiddleware:
+    """Downloader middleware dropping requests for pages whose items are already stored.
+
+    Only URLs that produced a stored (or skipped near-duplicate) item are
+    in the index, so listing and feed pages keep being fetched; requests
+    with ``dont_filter`` (start URLs among them) always are.
+    """
+
+    def __init__(self, index):
+        self.index = index
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool('SEEN_URLS_ENABLED', True):
+            raise NotConfigured
+        return cls(seen_urls)
+
+    def process_request(self, request, spider):
+        if not request.dont_filter and url_key(request.url) in self.index:
+            SKIPPED.inc('request')
+            raise IgnoreRequest(f'Already stored: {request.url}')
+        return None
+
+
+seen_urls = SeenUrls(os.environ.get('RTDMS_SEEN_URLS_PATH', 'seen_urls.npz'))
+seen_urls.load()
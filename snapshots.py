@@ -0,0 +1,78 @@
+from collections import OrderedDict
+import gzip
+import hashlib
+import threading
+from metrics import registry
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SNAPSHOT_LOOKUPS = registry.counter(
+    'rtdms_snapshot_cache_lookups_total', 'Encoded response lookups, by hit or miss', ('result',))
+
+
+class Snapshot:
+    """A serialized response body plus its lazily built compressed variants."""
+
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self.body = body
+        self._encoded = {'identity': body}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: str) -> bytes:
+        with self._lock:
+            if encoding not in self._encoded:
+                if encoding == 'br':
+                    self._encoded[encoding] = brotli.compress(self.body)
+                elif encoding == 'gzip':
+                    self._encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+                else:
+                    raise ValueError(f'Unsupported encoding: {encoding}')
+            return self._encoded[encoding]
+
+
+class SnapshotCache:
+    """Keeps one encoded snapshot per (dataset version, request key).
+
+    Snapshots of older versions are dropped as soon as a newer version is
+    requested, so memory is bounded by ``max_entries`` for the current one.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def supported_encodings():
+        return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+    def get(self, version, key, build) -> Snapshot:
+        """Return the snapshot for ``key``, calling ``build()`` for the body on a miss."""
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            snapshot = self._entries.get(key)
+            if snapshot is not None:
+                self._entries.move_to_end(key)
+                SNAPSHOT_LOOKUPS.inc('hit')
+                return snapshot
+        SNAPSHOT_LOOKUPS.inc('miss')
+
+        body = build()
+        # Hashing the body keeps ETags valid across reloads, restarts and workers with the same data.
+        snapshot = Snapshot(hashlib.sha1(body).hexdigest()[:20], body)
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = snapshot
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return snapshot
+
+
+snapshot_cache = SnapshotCache()
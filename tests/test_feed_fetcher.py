@@ -0,0 +1,139 @@
+"""FeedFetcher against a local HTTP stub serving fixture feeds.
+
+Run from the repository root: python -m unittest discover tests
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feed_fetcher import FeedFetcher
+
+ALERTS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Alerts</title>
+<item><title>Flood warning for Assam</title><description>Rivers above danger mark</description>
+<link>https://example.org/alerts/1</link><pubDate>Mon, 06 May 2024 10:00:00 GMT</pubDate></item>
+<item><title>Cyclone nears Odisha coast</title><description>Evacuations under way</description>
+<link>https://example.org/alerts/2</link><pubDate>Mon, 06 May 2024 11:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+BULLETIN = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Bulletin</title>
+<item><title>Earthquake felt in Delhi</title><link>https://example.org/bulletin/1</link></item>
+</channel></rss>"""
+
+ETAG = '"alerts-v1"'
+LAST_MODIFIED = 'Mon, 06 May 2024 12:00:00 GMT'
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, body, **headers):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name.replace('_', '-'), value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        if self.path == '/alerts.xml':
+            if self.headers.get('If-None-Match') == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_body(ALERTS, ETag=ETAG)
+        elif self.path == '/bulletin.xml':
+            if self.headers.get('If-Modified-Since') == LAST_MODIFIED:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_body(gzip.compress(BULLETIN), Content_Encoding='gzip', Last_Modified=LAST_MODIFIED)
+        elif self.path == '/truncated.xml':
+            # Promises more bytes than it sends, so the client raises IncompleteRead.
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(ALERTS)))
+            self.end_headers()
+            self.wfile.write(ALERTS[:100])
+            self.close_connection = True
+        else:
+            self.send_error(404)
+
+
+class FeedFetcherTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), FeedHandler)
+        cls.server.requests = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests.clear()
+        self.workdir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.workdir, 'feed_state.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def fetcher(self, *paths):
+        return FeedFetcher([self.base + path for path in paths], state_path=self.state_path,
+                           timeout=5.0, workers=1)
+
+    def test_parses_fixture_feeds(self):
+        alerts, bulletin = self.fetcher('/alerts.xml', '/bulletin.xml').run()
+        self.assertEqual(alerts.status, 200)
+        self.assertIsNone(alerts.error)
+        self.assertEqual([entry['title'] for entry in alerts.entries],
+                         ['Flood warning for Assam', 'Cyclone nears Odisha coast'])
+        self.assertEqual(alerts.entries[0]['link'], 'https://example.org/alerts/1')
+        self.assertEqual(alerts.entries[0]['description'], 'Rivers above danger mark')
+        self.assertEqual([entry['title'] for entry in bulletin.entries], ['Earthquake felt in Delhi'])
+
+    def test_conditional_requests_after_first_run(self):
+        self.fetcher('/alerts.xml', '/bulletin.xml').run()
+        # A new fetcher reads the validators saved by the previous run.
+        alerts, bulletin = self.fetcher('/alerts.xml', '/bulletin.xml').run()
+        self.assertTrue(alerts.not_modified)
+        self.assertTrue(bulletin.not_modified)
+        self.assertEqual(alerts.entries, [])
+        sent = {path: headers for path, headers in self.server.requests[2:]}
+        self.assertEqual(sent['/alerts.xml'].get('If-None-Match'), ETAG)
+        self.assertEqual(sent['/bulletin.xml'].get('If-Modified-Since'), LAST_MODIFIED)
+
+    def test_failing_feeds_do_not_affect_others(self):
+        results = self.fetcher('/truncated.xml', '/missing.xml', '/alerts.xml').run()
+        truncated, missing, alerts = results
+        self.assertIsNotNone(truncated.error)
+        self.assertEqual(truncated.entries, [])
+        self.assertEqual(missing.status, 404)
+        self.assertIsNotNone(missing.error)
+        self.assertIsNone(alerts.error)
+        self.assertEqual(len(alerts.entries), 2)
+
+    def test_fetch_one_reports_truncated_body(self):
+        fetcher = self.fetcher()
+        result = fetcher.fetch_one(self.base + '/truncated.xml')
+        self.assertIsNotNone(result.error)
+        self.assertEqual(fetcher.fetch_one(self.base + '/alerts.xml').status, 200)
+        self.assertTrue(fetcher.fetch_one(self.base + '/alerts.xml').not_modified)
+
+
+if __name__ == '__main__':
+    unittest.main()